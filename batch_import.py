@@ -0,0 +1,115 @@
+# builtin imports
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+# local imports
+from iMovie.iMovieProj import iMovieProj
+from interfaces.ProjectCache import ProjectCache
+from interfaces.XMLInterface import XMLDict
+
+@dataclass
+class ImportResult:
+    """Compact, picklable summary of importing a single project, so workers never ship clip objects back."""
+    path             : str
+    video_clips      : int = 0
+    audio_clips      : int = 0
+    video_standard   : Optional[str] = None
+    parse_seconds    : float = 0.0
+    build_seconds    : float = 0.0
+    error            : Optional[str] = None
+
+    @property
+    def OK(self) -> bool:
+        return self.error is None
+
+class BatchImporter:
+    """Class to import every iMovieProj under a root folder, spread across a process pool."""
+
+    @staticmethod
+    def FindProjects(root:Path) -> List[Path]:
+        """Find all .iMovieProj files under root, largest first so the big ones don't end up last in the pool."""
+        found = [path for path in Path(root).rglob("*.iMovieProj") if path.is_file()]
+        return sorted(found, key=lambda path: path.stat().st_size, reverse=True)
+
+    @staticmethod
+    def ImportOne(path:Path, backend:str="fast", use_cache:bool=False, validate:bool=False) -> ImportResult:
+        """Import one project, building every clip so broken clip dicts fail here as they did before clips were lazy.
+
+        With validate, the project is also checked against the Schema's stricter type checks first.
+        """
+        result = ImportResult(path=str(path))
+        try:
+            start = time.perf_counter()
+            if use_cache:
+                xmldict = ProjectCache.Default().Load(path, loader=lambda file: XMLDict.LoadXMLDict(file, backend=backend))
+            else:
+                xmldict = XMLDict.LoadXMLDict(path, backend=backend)
+            parsed = time.perf_counter()
+            project = iMovieProj(xmldict=xmldict, validate=validate)
+            if not validate:
+                project.Validate()
+            result.build_seconds  = time.perf_counter() - parsed
+            result.parse_seconds  = parsed - start
+            result.video_clips    = len(project.VideoClips)
+            result.audio_clips    = len(project.AudioClips)
+            result.video_standard = project.VideoStandard
+        except Exception as err: # pylint: disable=broad-except
+            # one broken project shouldn't take down the whole batch
+            result.error = f"{type(err).__name__}: {err}\n{traceback.format_exc()}"
+        return result
+
+    @staticmethod
+    def ImportAll(paths:Iterable[Path], workers:Optional[int]=None, backend:str="fast", use_cache:bool=False,
+                  validate:bool=False) -> List[ImportResult]:
+        paths = list(paths)
+        results : List[ImportResult] = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(BatchImporter.ImportOne, path, backend, use_cache, validate):path for path in paths}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as err: # pylint: disable=broad-except
+                    # worker process died outright, e.g. killed for running out of memory
+                    results.append(ImportResult(path=str(futures[future]), error=f"{type(err).__name__}: {err}"))
+        order = {str(path):i for i, path in enumerate(paths)}
+        return sorted(results, key=lambda result: order[result.path])
+
+    @staticmethod
+    def Summary(results:List[ImportResult], elapsed:Optional[float]=None) -> str:
+        lines = []
+        for result in results:
+            if result.OK:
+                lines.append(f"{result.path}: {result.video_clips} video clips; {result.audio_clips} audio clips; "
+                             f"{result.video_standard} format; parse {result.parse_seconds:.3f}s; build {result.build_seconds:.3f}s")
+            else:
+                lines.append(f"{result.path}: FAILED, {result.error.splitlines()[0]}")
+        failed = sum(1 for result in results if not result.OK)
+        lines.append(f"Imported {len(results) - failed} of {len(results)} projects"
+                     f"; {sum(result.video_clips for result in results)} video clips"
+                     f"; {sum(result.audio_clips for result in results)} audio clips"
+                     + (f"; {elapsed:.2f}s wall time" if elapsed is not None else ""))
+        return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import every .iMovieProj under a folder in parallel.")
+    parser.add_argument("root", type=Path, help="Folder to search for .iMovieProj files")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--backend", choices=XMLDict.BACKENDS, default="fast", help="XMLDict backend used to decode projects")
+    parser.add_argument("--cache", action="store_true", help="Go through the on-disk project cache")
+    parser.add_argument("--validate", action="store_true", help="Check projects against the schema's type checks, counting violations as failures")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the per-file results to this JSON file")
+    args = parser.parse_args()
+
+    start   = time.perf_counter()
+    results = BatchImporter.ImportAll(BatchImporter.FindProjects(args.root), workers=args.workers, backend=args.backend, use_cache=args.cache,
+                                       validate=args.validate)
+    print(BatchImporter.Summary(results, elapsed=time.perf_counter() - start))
+    if args.json is not None:
+        with open(args.json, "w", encoding="UTF-8") as jsonfile:
+            json.dump([asdict(result) for result in results], jsonfile, indent=2)
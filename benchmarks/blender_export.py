@@ -0,0 +1,35 @@
+"""Count the Blender API calls, per clip, that exporting a synthetic project to the sequencer takes, using a stand-in bpy."""
+# builtin imports
+import argparse
+import sys
+import time
+from pathlib import Path
+# local imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from benchmarks.fake_bpy import FakeBpy
+from benchmarks.synthetic_project import SyntheticProject
+from iMovie.iMovieProj import iMovieProj
+from interfaces.Blenderface import Blender
+
+def CountExportCalls(count:int, source_scenes:bool=False):
+    project  = iMovieProj(SyntheticProject(video_clips=count, audio_ratio=1.0).ToDict())
+    fake     = FakeBpy()
+    previous = Blender.UseModule(fake)
+    try:
+        start  = time.perf_counter()
+        strips = Blender.SetupEditFromiMovieProj(project, clips_path=Path("clips"), source_scenes=source_scenes)
+        elapsed = time.perf_counter() - start
+    finally:
+        Blender.UseModule(previous)
+    return fake, len(strips), elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--clips", type=int, default=1_000, help="Number of video clips, and of audio clips, to export")
+    parser.add_argument("--scenes", action="store_true", help="Give each video source a scene, and use scene strips")
+    args = parser.parse_args()
+    fake, strips, elapsed = CountExportCalls(args.clips, source_scenes=args.scenes)
+    print(f"{strips} strips in {elapsed * 1000:.1f} ms; {fake.TotalCalls} API calls, {fake.TotalCalls / strips:.2f} per clip; "
+          f"{len(fake.data.scenes)} scenes, {len(fake.data.movieclips)} movie clips")
+    for name, calls in sorted(fake.calls.items()):
+        print(f"    {name}: {calls}")
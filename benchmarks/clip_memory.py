@@ -0,0 +1,68 @@
+"""
+Measure how many bytes the clip objects of a project take, per top-level clip, on a synthetic project.
+
+The __slots__ clip classes are measured next to DictLayoutClip, which keeps its elements the way the clip classes
+did before they had __slots__, so the saving can be reproduced rather than taken on trust. Nested clips and
+push-pins are built and counted for both.
+"""
+# builtin imports
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+# local imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from benchmarks.synthetic_project import SyntheticProject
+from iMovie.Schema import Schema
+from iMovie.iMovieProj import iMovieProj
+
+class DictLayoutClip:
+    """
+    A clip laid out like the clip classes were before __slots__: the required elements in the instance __dict__,
+    a per-clip copy of every other element in _other_elements, and nested clips and push-pins built into plain lists.
+    """
+    def __init__(self, clip_dict:Dict[str, Any], family:str):
+        schema = Schema.ClassFor(clip_dict, family)
+        for key in schema.required:
+            setattr(self, "_" + key, clip_dict[key])
+        self._other_elements = {key:val for key, val in clip_dict.items() if key not in schema.required}
+        for key, child_family in schema.nested.items():
+            setattr(self, "_" + key, [DictLayoutClip(child, child_family) for child in clip_dict.get(key, [])])
+
+def _builtProject(section:str, clip_dicts:List[Dict[str, Any]]) -> iMovieProj:
+    ret_val = iMovieProj({section:clip_dicts})
+    # Validate builds every clip of the lazy lists, nested ones included
+    ret_val.Validate()
+    return ret_val
+
+def _tracedBytes(build:Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    built = build()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return used
+
+def MeasureBytesPerClip(count:int) -> Dict[str, Dict[str, float]]:
+    """Bytes per top-level clip of each layout, for video and for audio clips."""
+    project = SyntheticProject(video_clips=count, audio_ratio=1.0, trash_clips=0).ToDict()
+    ret_val = {}
+    for kind, key in (("video", "videoClips"), ("audio", "audioClips")):
+        clip_dicts : List[Dict[str, Any]] = project[key]
+        family     = Schema.SECTIONS[key]
+        ret_val[kind] = {
+            "slots":_tracedBytes(lambda: _builtProject(key, clip_dicts)) / len(clip_dicts),
+            "dict":_tracedBytes(lambda: [DictLayoutClip(clip, family) for clip in clip_dicts]) / len(clip_dicts),
+        }
+    return ret_val
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--clips", type=int, default=10_000, help="Number of video clips, and of audio clips, to build")
+    args = parser.parse_args()
+    for kind, layouts in MeasureBytesPerClip(args.clips).items():
+        print(f"{kind}: {layouts['slots']:.0f} bytes per clip with __slots__, {layouts['dict']:.0f} with the dict layout, "
+              f"over {args.clips} clips")
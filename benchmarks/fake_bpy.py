@@ -0,0 +1,167 @@
+"""
+Minimal stand-in for Blender's bpy module, covering what the exporter touches, that counts every API call it gets.
+
+Plug it in with Blender.UseModule(FakeBpy()) to run the exporter without Blender.
+Method calls and property writes are counted separately, by name, in FakeBpy.calls.
+"""
+# builtin imports
+from collections import Counter
+from typing import Any, List
+
+class _Recorder:
+    """Object whose property writes are counted in a shared Counter."""
+    def __init__(self, calls:Counter):
+        object.__setattr__(self, "_calls", calls)
+
+    def __setattr__(self, name:str, value:Any):
+        self._calls[f"set {type(self).__name__}.{name}"] += 1
+        object.__setattr__(self, name, value)
+
+    def _call(self, name:str):
+        self._calls[f"call {type(self).__name__}.{name}"] += 1
+
+class Strip(_Recorder):
+    def __init__(self, calls:Counter, kind:str, name:str, filepath:str, channel:int, frame_start:int):
+        super().__init__(calls)
+        for attr, value in (("type", kind), ("name", name), ("filepath", filepath), ("channel", channel), ("frame_start", frame_start),
+                            ("frame_offset_start", 0), ("frame_final_duration", 0)):
+            object.__setattr__(self, attr, value)
+
+class Sequences(_Recorder):
+    def __init__(self, calls:Counter):
+        super().__init__(calls)
+        object.__setattr__(self, "strips", [])
+
+    def __len__(self) -> int:
+        return len(self.strips)
+
+    def new_movie(self, name:str, filepath:str, channel:int, frame_start:int) -> Strip:
+        self._call("new_movie")
+        self.strips.append(Strip(self._calls, "MOVIE", name, filepath, channel, frame_start))
+        return self.strips[-1]
+
+    def new_scene(self, name:str, scene:"Scene", channel:int, frame_start:int) -> Strip:
+        self._call("new_scene")
+        self.strips.append(Strip(self._calls, "SCENE", name, scene.name, channel, frame_start))
+        return self.strips[-1]
+
+    def new_sound(self, name:str, filepath:str, channel:int, frame_start:int) -> Strip:
+        self._call("new_sound")
+        self.strips.append(Strip(self._calls, "SOUND", name, filepath, channel, frame_start))
+        return self.strips[-1]
+
+class SequenceEditor(_Recorder):
+    def __init__(self, calls:Counter):
+        super().__init__(calls)
+        object.__setattr__(self, "sequences", Sequences(calls))
+
+class Render(_Recorder):
+    def __init__(self, calls:Counter):
+        super().__init__(calls)
+        for attr, value in (("resolution_x", 1920), ("resolution_y", 1080), ("resolution_percentage", 100), ("fps", 24), ("fps_base", 1.0)):
+            object.__setattr__(self, attr, value)
+
+class Node(_Recorder):
+    def __init__(self, calls:Counter, kind:str):
+        super().__init__(calls)
+        for attr, value in (("type", kind), ("inputs", [f"{kind} input"]), ("outputs", [f"{kind} output"])):
+            object.__setattr__(self, attr, value)
+
+class Nodes(_Recorder):
+    def __init__(self, calls:Counter):
+        super().__init__(calls)
+        object.__setattr__(self, "items", [Node(calls, "CompositorNodeRLayers"), Node(calls, "CompositorNodeComposite")])
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def new(self, type:str) -> Node:
+        self._call("new")
+        self.items.append(Node(self._calls, type))
+        return self.items[-1]
+
+    def remove(self, node:Node):
+        self._call("remove")
+        self.items.remove(node)
+
+class Links(_Recorder):
+    def new(self, output:Any, input:Any):
+        self._call("new")
+
+class NodeTree(_Recorder):
+    def __init__(self, calls:Counter):
+        super().__init__(calls)
+        object.__setattr__(self, "nodes", Nodes(calls))
+        object.__setattr__(self, "links", Links(calls))
+
+class Scene(_Recorder):
+    def __init__(self, calls:Counter, name:str="Scene"):
+        super().__init__(calls)
+        for attr, value in (("name", name), ("frame_start", 1), ("frame_end", 250), ("render", Render(calls)), ("sequence_editor", None),
+                            ("use_nodes", False), ("node_tree", NodeTree(calls))):
+            object.__setattr__(self, attr, value)
+
+    def sequence_editor_create(self) -> SequenceEditor:
+        self._call("sequence_editor_create")
+        object.__setattr__(self, "sequence_editor", SequenceEditor(self._calls))
+        return self.sequence_editor
+
+class MovieClip(_Recorder):
+    def __init__(self, calls:Counter, filepath:str):
+        super().__init__(calls)
+        object.__setattr__(self, "filepath", filepath)
+        object.__setattr__(self, "frame_start", 1)
+
+class MovieClips(_Recorder):
+    def __init__(self, calls:Counter):
+        super().__init__(calls)
+        object.__setattr__(self, "items", [])
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def load(self, filepath:str, check_existing:bool=False) -> MovieClip:
+        self._call("load")
+        existing = [clip for clip in self.items if clip.filepath == filepath] if check_existing else []
+        if not existing:
+            self.items.append(MovieClip(self._calls, filepath))
+        return existing[0] if existing else self.items[-1]
+
+class Scenes(_Recorder):
+    def __init__(self, calls:Counter, scene:Scene):
+        super().__init__(calls)
+        object.__setattr__(self, "items", [scene])
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def new(self, name:str) -> Scene:
+        self._call("new")
+        self.items.append(Scene(self._calls, name))
+        return self.items[-1]
+
+class Data:
+    def __init__(self, calls:Counter, scene:Scene):
+        self.movieclips = MovieClips(calls)
+        self.scenes     = Scenes(calls, scene)
+
+class Context:
+    def __init__(self, scene:Scene):
+        self.scene = scene
+
+class FakeBpy:
+    """Takes the place of the bpy module, with a single scene as the context."""
+    def __init__(self):
+        self.calls   : Counter = Counter()
+        scene = Scene(self.calls)
+        self.context : Context = Context(scene)
+        self.data    : Data = Data(self.calls, scene)
+
+    @property
+    def Strips(self) -> List[Strip]:
+        editor = self.context.scene.sequence_editor
+        return editor.sequences.strips if editor is not None else []
+
+    @property
+    def TotalCalls(self) -> int:
+        return sum(self.calls.values())
@@ -0,0 +1,151 @@
+"""
+Benchmark each phase of importing a synthetic project: XML parse, dict decode, object construction, schema
+validation and export.
+
+The pipeline is timed on its own, then run again under tracemalloc for allocations, since tracing skews timing.
+RSS growth is how much the process's resident set grew over the first timed run of each phase, i.e. what the
+phase left resident; its transient peak is the tracemalloc allocation peak.
+Results are written as JSON, so runs on different commits can be compared with --compare.
+"""
+# builtin imports
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+# local imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from benchmarks.fake_bpy import FakeBpy
+from benchmarks.synthetic_project import SyntheticProject
+from iMovie.Schema import Schema
+from iMovie.iMovieProj import iMovieProj
+from interfaces.Blenderface import Blender
+from interfaces.XMLInterface import XMLDict
+
+Map = Dict[str, Any]
+
+def _currentRSS() -> Optional[int]:
+    """Current resident set size of this process in bytes, where /proc reports it."""
+    try:
+        with open("/proc/self/statm", "r", encoding="UTF-8") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def _phases(project_file:Path, backend:str) -> List[Tuple[str, Callable[[Map], Any]]]:
+    """The pipeline phases in order, each taking the state left by the ones before it and returning its own result."""
+    def export(state:Map):
+        previous = Blender.UseModule(FakeBpy())
+        try:
+            return Blender.SetupEditFromiMovieProj(state["construct"], clips_path=Path("clips"))
+        finally:
+            Blender.UseModule(previous)
+    return [
+        ("xml_parse",   lambda state: ET.parse(project_file).getroot()),
+        ("dict_decode", lambda state: XMLDict._parseDict(state["xml_parse"][0])),
+        # the default backend does parse and decode in one go, so it's measured as a whole as well
+        (f"load_{backend}", lambda state: XMLDict.LoadXMLDict(project_file, backend=backend)),
+        # clips are otherwise built lazily on first read, so build them all here to time their construction
+        ("construct",   lambda state: iMovieProj(state[f"load_{backend}"]).Validate()),
+        ("validate",    lambda state: Schema.ValidateProject(state[f"load_{backend}"])),
+        ("export",      export),
+    ]
+
+def RunPipeline(project_file:Path, repeat:int=3, backend:str="fast") -> Dict[str, Map]:
+    """Run and measure each phase in turn, feeding each phase the results of the ones before.
+
+    The whole pipeline is timed first, and only then run under tracemalloc, so tracing overhead doesn't show up
+    in either the timings or the RSS growth.
+    """
+    phases  = _phases(project_file, backend)
+    ret_val : Dict[str, Map] = {}
+    state   : Map = {}
+    for name, run in phases:
+        times = []
+        rss   : List[Optional[int]] = []
+        for _ in range(repeat):
+            gc.collect()
+            rss.append(_currentRSS())
+            start = time.perf_counter()
+            state[name] = run(state)
+            times.append(time.perf_counter() - start)
+            rss.append(_currentRSS())
+        # later runs replace the first run's result rather than adding to it, so only the first says what the phase holds
+        growth = rss[1] - rss[0] if None not in rss[:2] else None
+        ret_val[name] = {"seconds":min(times), "mean_seconds":sum(times) / len(times), "rss_growth_bytes":growth}
+    state.clear()
+    gc.collect()
+    tracemalloc.start()
+    for name, run in phases:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        held, _ = tracemalloc.get_traced_memory()
+        state[name] = run(state)
+        _, peak = tracemalloc.get_traced_memory()
+        after   = tracemalloc.take_snapshot()
+        # only count what the phase allocated on top of what earlier phases left behind
+        ret_val[name]["alloc_peak_bytes"] = peak - held
+        ret_val[name]["alloc_blocks"]     = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    tracemalloc.stop()
+    return ret_val
+
+def _gitCommit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def Compare(current:Map, baseline:Map) -> List[str]:
+    ret_val = [f"{'phase':<14}{'baseline':>12}{'current':>12}{'ratio':>8}"]
+    for phase, stats in current["phases"].items():
+        old = baseline["phases"].get(phase)
+        if old is None:
+            ret_val.append(f"{phase:<14}{'-':>12}{stats['seconds'] * 1000:>10.1f}ms{'-':>8}")
+        else:
+            ret_val.append(f"{phase:<14}{old['seconds'] * 1000:>10.1f}ms{stats['seconds'] * 1000:>10.1f}ms{stats['seconds'] / old['seconds']:>7.2f}x")
+    return ret_val
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--clips", type=int, default=5_000, help="Number of top-level video clips in the synthetic project")
+    parser.add_argument("--vfx-depth", type=int, default=2, help="How deep effects are nested")
+    parser.add_argument("--project", type=Path, default=None, help="Benchmark an existing project file instead of a synthetic one")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Timed runs per phase; the best is reported")
+    parser.add_argument("--backend", choices=XMLDict.BACKENDS, default="fast", help="XMLDict backend for the load phase")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, default=None, help="Compare against the results JSON of an earlier run")
+    args = parser.parse_args()
+
+    config = SyntheticProject(video_clips=args.clips, vfx_depth=args.vfx_depth)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project_file = args.project
+        if project_file is None:
+            # generate the project in a child process, so building it doesn't leave memory resident in ours
+            project_file = Path(tmp_dir) / "synthetic.iMovieProj"
+            subprocess.run([sys.executable, str(Path(__file__).resolve().parent / "synthetic_project.py"), str(project_file),
+                            "--clips", str(args.clips), "--vfx-depth", str(args.vfx_depth)], check=True)
+        results = {
+            "commit":_gitCommit(), "python":platform.python_version(), "platform":platform.platform(),
+            "project":str(args.project) if args.project is not None else config.Config,
+            "file_bytes":project_file.stat().st_size, "repeat":args.repeat,
+            "phases":RunPipeline(project_file, repeat=args.repeat, backend=args.backend),
+        }
+    for phase, stats in results["phases"].items():
+        rss = f"{stats['rss_growth_bytes'] / 2**20:+.0f} MiB" if stats["rss_growth_bytes"] is not None else "n/a"
+        print(f"{phase:<14}{stats['seconds'] * 1000:>10.1f} ms  RSS {rss:>8}  "
+              f"alloc peak {stats['alloc_peak_bytes'] / 2**20:>7.1f} MiB  {stats['alloc_blocks']:>9} blocks")
+    if args.output is not None:
+        with open(args.output, "w", encoding="UTF-8") as outfile:
+            json.dump(results, outfile, indent=2)
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="UTF-8") as basefile:
+            print("\n".join(Compare(results, json.load(basefile))))
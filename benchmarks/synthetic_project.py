@@ -0,0 +1,164 @@
+"""Write synthetic .iMovieProj files, following doc/iMovieHD-format-schema.md, for benchmarking the import pipeline."""
+# builtin imports
+import argparse
+import plistlib
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+Map = Dict[str, Any]
+
+@dataclass
+class SyntheticProject:
+    """
+    Shape of a synthetic project.
+
+    Top-level video clips are splits of a handful of source files, laid back to back on one track.
+    Every transition_every-th clip is a transition replacing its neighbours, and every vfx_every-th clip (that isn't
+    a transition) is an effect nested vfx_depth deep. Audio clips are spread over two tracks, and their push-pins
+    point at the video clips playing at the same time. Generation is deterministic for a given seed.
+    """
+    video_clips      : int   = 1_000
+    audio_ratio      : float = 0.5
+    pins_per_audio   : int   = 3
+    vfx_depth        : int   = 1
+    vfx_every        : int   = 5
+    transition_every : int   = 7
+    trash_clips      : int   = 10
+    source_files     : int   = 20
+    seed             : int   = 0
+
+    def ToDict(self) -> Map:
+        """Build the top-level dict of the project."""
+        return _Generator(self).Project()
+
+    def Write(self, path:Path) -> Path:
+        """Write the project out as plist XML, with keys sorted like iMovie HD writes them."""
+        path = Path(path)
+        with open(path, "wb") as projfile:
+            plistlib.dump(self.ToDict(), projfile, fmt=plistlib.FMT_XML, sort_keys=True)
+        return path
+
+    @property
+    def Config(self) -> Map:
+        return asdict(self)
+
+class _Generator:
+    TIME_SCALE = 2997
+
+    def __init__(self, config:SyntheticProject):
+        self._config = config
+        self._random = random.Random(config.seed)
+        self._uid    = 0
+        # (edit start, edit end, uniqueID) of each top-level video clip, for pointing push-pins at them
+        self._edit   : List[tuple] = []
+
+    def Project(self) -> Map:
+        config = self._config
+        video_clips = self._videoClips()
+        audio_clips = [self._audioClip(i) for i in range(round(config.video_clips * config.audio_ratio))]
+        trash_clips = [self._fileClip(config.video_clips + i, top=True) for i in range(config.trash_clips)]
+        return {
+            "audioClips":audio_clips, "audioTrashClips":[], "lastClipUniqueID":self._uid, "playheadPosition":0,
+            "relativePlayHeadPosition":0.0, "selectionEndFrame":0, "selectionStartFrame":0, "selectionType":0,
+            "timelineZoom":1.0, "version":"4.1", "videoClips":video_clips, "videoStandard":"DV-NTSC",
+            "videoTrashClips":trash_clips, "writingApplicationName":"iMovie", "writingApplicationVersion":"6.0",
+        }
+
+    def _nextUID(self) -> int:
+        self._uid += 1
+        return self._uid
+
+    def _videoClips(self) -> List[Map]:
+        config  = self._config
+        ret_val : List[Map] = []
+        edit_end = 0
+        for i in range(config.video_clips):
+            if config.transition_every and i % config.transition_every == config.transition_every - 1:
+                clip = self._transition(i)
+            elif config.vfx_every and i % config.vfx_every == config.vfx_every - 1:
+                clip = self._vfxClip(i, config.vfx_depth, top=True)
+            else:
+                clip = self._fileClip(i, top=True)
+            ret_val.append(clip)
+            length = clip["out"] - clip["in"]
+            self._edit.append((edit_end, edit_end + length, clip["uniqueID"]))
+            edit_end += length
+        return ret_val
+
+    def _fileClip(self, i:int, top:bool) -> Map:
+        source   = i % max(self._config.source_files, 1)
+        in_frame = self._random.randrange(0, 300)
+        ret_val = {
+            "class":"video", "duration":900, "file":f"Clip {source:02}.mov", "in":in_frame, "isSelected":False,
+            "mediaHandlePost":0, "name":f"Clip {source:02}/{i // max(self._config.source_files, 1) + 1}",
+            "out":in_frame + self._random.randrange(30, 300), "shelfX":0, "shelfY":0, "thumb":0,
+            "timeScale":_Generator.TIME_SCALE, "type":1, "uniqueID":self._nextUID(), "version":"4",
+        }
+        if top:
+            ret_val["track"] = 1
+        return ret_val
+
+    def _vfxClip(self, i:int, depth:int, top:bool) -> Map:
+        inner   = self._vfxClip(i, depth - 1, top=False) if depth > 1 else self._fileClip(i, top=False)
+        ret_val = self._fileClip(i, top)
+        ret_val.update({
+            "clipEatenByFilter":True, "file":f"Effect {self._uid:05}.mov", "filterFadeinFrames":0, "filterFadeoutFrames":0,
+            "filterSliderValues":[0.5, 0.25, 1.0], "filteredClips":[inner], "framesTakenAfter":0, "framesTakenBefore":0,
+            "in":0, "out":inner["out"] - inner["in"], "pluginIndex":3, "pluginName":"Sepia Tone", "pluginType":2,
+            "solidColorClipColor":[0, 0, 0], "startFrame":0,
+        })
+        return ret_val
+
+    def _transition(self, i:int) -> Map:
+        ret_val = self._fileClip(i, top=True)
+        ret_val.update({
+            "class":"transition", "file":f"Transition {self._uid:05}.mov", "framesTakenAfter":15, "framesTakenBefore":15,
+            "in":0, "out":30, "pluginIndex":1, "pluginName":"Cross Dissolve", "pluginType":1,
+            "replacedClips":[self._fileClip(i - 1, top=False), self._fileClip(i + 1, top=False)],
+            "transitionDirection":0, "transitionSpeed":1.0, "type":2,
+        })
+        return ret_val
+
+    def _audioClip(self, i:int) -> Map:
+        edit_length = self._edit[-1][1] if self._edit else 0
+        start    = self._random.randrange(0, max(edit_length, 1))
+        length   = self._random.randrange(30, 600)
+        pins     = []
+        for j in range(self._config.pins_per_audio):
+            audio_frame = length * j // max(self._config.pins_per_audio, 1)
+            video_uid   = self._clipAt(start + audio_frame)
+            pins.append({"audioFrame":audio_frame, "clipUID":video_uid, "originalClipFrame":-1, "originalClipUID":-1,
+                         "videoFrame":start + audio_frame})
+        return {
+            "class":"audio", "duration":length, "file":f"Sound {i % 10:02}.aiff", "imae4cc":0, "imaeFilteredList":[],
+            "imaeVersion":0, "in":0, "isSelected":False, "name":f"Sound {i:02}", "out":length, "pushPins":pins,
+            "startFrame":start, "timeScale":_Generator.TIME_SCALE, "track":2 + i % 2, "trimmedEndFrame":length,
+            "trimmedStartFrame":0, "uniqueID":self._nextUID(), "version":"4",
+        }
+
+    def _clipAt(self, frame:int) -> int:
+        # binary search the back-to-back video clips for the one playing at frame
+        low, high = 0, len(self._edit)
+        while low < high:
+            mid = (low + high) // 2
+            if self._edit[mid][1] <= frame:
+                low = mid + 1
+            else:
+                high = mid
+        return self._edit[low][2] if low < len(self._edit) else -1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", type=Path, help="Path of the .iMovieProj file to write")
+    parser.add_argument("-n", "--clips", type=int, default=1_000, help="Number of top-level video clips")
+    parser.add_argument("--audio-ratio", type=float, default=0.5, help="Audio clips per video clip")
+    parser.add_argument("--pins", type=int, default=3, help="Push-pins per audio clip")
+    parser.add_argument("--vfx-depth", type=int, default=1, help="How deep effects are nested")
+    parser.add_argument("--vfx-every", type=int, default=5, help="Make every Nth video clip an effect (0 for none)")
+    parser.add_argument("--transition-every", type=int, default=7, help="Make every Nth video clip a transition (0 for none)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    SyntheticProject(video_clips=args.clips, audio_ratio=args.audio_ratio, pins_per_audio=args.pins, vfx_depth=args.vfx_depth,
+                     vfx_every=args.vfx_every, transition_every=args.transition_every, seed=args.seed).Write(args.output)
@@ -0,0 +1,203 @@
+# builtin imports
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+# local imports
+from batch_import import BatchImporter
+from iMovie.IntervalIndex import IntervalIndex
+from iMovie.iMovieProj import iMovieProj
+
+class ClipCatalog:
+    """
+    SQLite catalog of the clips of many projects, for answering questions across them without reparsing anything.
+
+    Every clip is a row of the clips table, nested clips included, pointing at its parent and its top-level clip,
+    with push-pins in a table of their own. Projects are only re-ingested when their mtime or size has changed.
+    """
+    SCHEMA_VERSION = 1
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, mtime_ns INTEGER, size INTEGER, video_standard TEXT,
+            version TEXT, edit_length INTEGER, video_clips INTEGER, audio_clips INTEGER, ingested REAL);
+        CREATE TABLE IF NOT EXISTS clips (
+            id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL, parent_id INTEGER, root_id INTEGER NOT NULL,
+            section TEXT NOT NULL, position INTEGER NOT NULL, depth INTEGER NOT NULL, relation TEXT, class TEXT NOT NULL,
+            name TEXT, file TEXT, unique_id INTEGER, track INTEGER, in_frame INTEGER, out_frame INTEGER, duration INTEGER,
+            edit_start INTEGER, time_scale INTEGER, plugin_name TEXT);
+        CREATE TABLE IF NOT EXISTS push_pins (
+            clip_id INTEGER NOT NULL, audio_frame INTEGER, video_frame INTEGER, clip_uid INTEGER, original_clip_uid INTEGER,
+            original_clip_frame INTEGER);
+        CREATE INDEX IF NOT EXISTS clips_file ON clips (file);
+        CREATE INDEX IF NOT EXISTS clips_plugin ON clips (plugin_name);
+        CREATE INDEX IF NOT EXISTS clips_uid ON clips (project_id, unique_id);
+        CREATE INDEX IF NOT EXISTS clips_track ON clips (project_id, track);
+        CREATE INDEX IF NOT EXISTS clips_project ON clips (project_id);
+        CREATE INDEX IF NOT EXISTS clips_parent ON clips (parent_id);
+        CREATE INDEX IF NOT EXISTS pins_clip ON push_pins (clip_id);
+        CREATE INDEX IF NOT EXISTS pins_uid ON push_pins (clip_uid);
+    """
+    # nested clip lists, with how the nested clips relate to the clip holding them
+    _NESTED = (("FilteredClips", "filtered"), ("ReplacedClips", "replaced"), ("imagefilteredlist", "imae"))
+
+    def __init__(self, db_file:Path):
+        self._db = sqlite3.connect(str(db_file))
+        self._db.row_factory = sqlite3.Row
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, ClipCatalog.SCHEMA_VERSION):
+            raise ValueError(f"{db_file} holds a clip catalog of schema version {version}, expected {ClipCatalog.SCHEMA_VERSION}!")
+        with self._db:
+            self._db.executescript(ClipCatalog._SCHEMA)
+            self._db.execute(f"PRAGMA user_version = {ClipCatalog.SCHEMA_VERSION}")
+
+    def __repr__(self) -> str:
+        projects, clips = self._db.execute("SELECT (SELECT COUNT(*) FROM projects), (SELECT COUNT(*) FROM clips)").fetchone()
+        return f"<ClipCatalog object: {projects} projects; {clips} clips>"
+
+    def Close(self):
+        self._db.close()
+
+    #region Ingest
+    def Ingest(self, paths:Iterable[Path], backend:str="fast", force:bool=False) -> Dict[str, str]:
+        """Load each project and replace its rows, skipping those unchanged since they were last ingested.
+
+        Returns what happened to each path: "ingested", "unchanged", or the error that stopped it.
+        """
+        ret_val : Dict[str, str] = {}
+        for path in paths:
+            path = str(Path(path).resolve())
+            try:
+                stat = Path(path).stat()
+                row  = self._db.execute("SELECT id, mtime_ns, size FROM projects WHERE path=?", (path,)).fetchone()
+                if not force and row is not None and (row["mtime_ns"], row["size"]) == (stat.st_mtime_ns, stat.st_size):
+                    ret_val[path] = "unchanged"
+                    continue
+                project = iMovieProj.FromXMLFile(Path(path), backend=backend, use_cache=False)
+                self._ingestProject(path, (stat.st_mtime_ns, stat.st_size), project)
+                ret_val[path] = "ingested"
+            except Exception as err: # pylint: disable=broad-except
+                # one broken project shouldn't stop the rest from being catalogued
+                ret_val[path] = f"{type(err).__name__}: {err}"
+        return ret_val
+
+    def Remove(self, path:Path):
+        with self._db:
+            self._removeProject(str(Path(path).resolve()))
+
+    def _removeProject(self, path:str):
+        row = self._db.execute("SELECT id FROM projects WHERE path=?", (path,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM push_pins WHERE clip_id IN (SELECT id FROM clips WHERE project_id=?)", (row["id"],))
+            self._db.execute("DELETE FROM clips WHERE project_id=?", (row["id"],))
+            self._db.execute("DELETE FROM projects WHERE id=?", (row["id"],))
+
+    def _ingestProject(self, path:str, stat:Tuple[int, int], project:iMovieProj):
+        spans = IntervalIndex.EditSpans(project.VideoClips, project.AudioClips)
+        edit_starts = {id(span.clip):span.start for span in spans}
+        # one transaction per project, so a project is either fully catalogued or not at all
+        with self._db:
+            self._removeProject(path)
+            cursor = self._db.execute("INSERT INTO projects (path, mtime_ns, size, video_standard, version, edit_length, video_clips, "
+                                      "audio_clips, ingested) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                      (path, stat[0], stat[1], project.VideoStandard, project.Version, max((span.end for span in spans), default=0),
+                                       len(project.VideoClips), len(project.AudioClips), time.time()))
+            project_id = cursor.lastrowid
+            # ids are handed out here rather than by SQLite, so parents can be referred to within the same executemany
+            next_id  = (self._db.execute("SELECT MAX(id) FROM clips").fetchone()[0] or 0) + 1
+            clip_rows, pin_rows = [], []
+            for section in ("videoClips", "audioClips", "videoTrashClips", "audioTrashClips"):
+                clips = project._section(section)
+                stack : List[Tuple[Any, Optional[int], Optional[int], int, int, Optional[str]]] = \
+                    [(clip, None, None, position, 0, None) for position, clip in reversed(list(enumerate(clips)))]
+                while stack:
+                    clip, parent_id, root_id, position, depth, relation = stack.pop()
+                    clip_id = next_id
+                    next_id += 1
+                    root_id = root_id if root_id is not None else clip_id
+                    clip_rows.append((clip_id, project_id, parent_id, root_id, section, position, depth, relation, type(clip).__name__,
+                                      clip.Name, getattr(clip, "FileName", None), clip.UniqueID, getattr(clip, "Track", None), clip.InFrame,
+                                      clip.OutFrame, clip.Duration, edit_starts.get(id(clip)) if depth == 0 else None, clip.TimeScale,
+                                      getattr(clip, "PluginName", None)))
+                    for pin in getattr(clip, "PushPins", ()):
+                        pin_rows.append((clip_id, pin.AudioFrame, pin.VideoFrame, pin.ClipUID, pin.OriginalClipUID, pin.OriginalClipFrame))
+                    children = [(child, clip_id, root_id, i, depth + 1, name) for attr, name in ClipCatalog._NESTED
+                                for i, child in enumerate(getattr(clip, attr, ()))]
+                    stack.extend(reversed(children))
+            self._db.executemany(f"INSERT INTO clips VALUES ({', '.join('?' * 19)})", clip_rows)
+            self._db.executemany("INSERT INTO push_pins VALUES (?, ?, ?, ?, ?, ?)", pin_rows)
+    #endregion
+
+    #region Queries
+    def Query(self, sql:str, params:Tuple=()) -> List[Dict[str, Any]]:
+        """Run any query against the catalog, getting rows back as dicts."""
+        return [dict(row) for row in self._db.execute(sql, params)]
+
+    def ProjectsUsingFile(self, file_name:str) -> List[str]:
+        """Paths of the projects with any clip, nested or trashed ones included, using the named file."""
+        return [row["path"] for row in self._db.execute("SELECT DISTINCT projects.path FROM clips JOIN projects ON projects.id = clips.project_id "
+                                                         "WHERE clips.file=? ORDER BY projects.path", (file_name,))]
+
+    def ClipsWithPlugin(self, plugin_name:str, clip_class:Optional[str]=None) -> List[Dict[str, Any]]:
+        """Clips with the given pluginName, optionally only those of one clip class (e.g. "TopVFXClip")."""
+        sql = ("SELECT projects.path AS project, clips.* FROM clips JOIN projects ON projects.id = clips.project_id "
+               "WHERE clips.plugin_name=?")
+        params : Tuple = (plugin_name,)
+        if clip_class is not None:
+            sql    += " AND clips.class=?"
+            params += (clip_class,)
+        return self.Query(sql + " ORDER BY projects.path, clips.id", params)
+
+    def EditLengths(self) -> Dict[str, int]:
+        """Edit length, in frames, of every project."""
+        return {row["path"]:row["edit_length"] for row in self._db.execute("SELECT path, edit_length FROM projects ORDER BY path")}
+
+    def ClipByUniqueID(self, project:Path, unique_id:int) -> Optional[Dict[str, Any]]:
+        rows = self.Query("SELECT clips.* FROM clips JOIN projects ON projects.id = clips.project_id WHERE projects.path=? AND clips.unique_id=?",
+                          (str(Path(project).resolve()), unique_id))
+        return rows[0] if rows else None
+
+    def ClipsOnTrack(self, project:Path, track:int) -> List[Dict[str, Any]]:
+        """Top-level clips on a track of a project, in edit order."""
+        return self.Query("SELECT clips.* FROM clips JOIN projects ON projects.id = clips.project_id "
+                          "WHERE projects.path=? AND clips.track=? AND clips.depth=0 AND clips.section IN ('videoClips', 'audioClips') "
+                          "ORDER BY clips.edit_start", (str(Path(project).resolve()), track))
+
+    def Lineage(self, clip_id:int) -> List[Dict[str, Any]]:
+        """A clip and everything nested under it, parents before children."""
+        return self.Query("WITH RECURSIVE tree(id) AS (SELECT ? UNION ALL SELECT clips.id FROM clips JOIN tree ON clips.parent_id = tree.id) "
+                          "SELECT clips.* FROM clips JOIN tree ON clips.id = tree.id ORDER BY clips.id", (clip_id,))
+    #endregion
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Catalog the clips of every .iMovieProj under a folder in SQLite, and query it.")
+    parser.add_argument("catalog", type=Path, help="SQLite file holding the catalog")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Add or update the projects under a folder")
+    ingest.add_argument("root", type=Path, help="Folder to search for .iMovieProj files")
+    ingest.add_argument("--force", action="store_true", help="Re-ingest projects even if they haven't changed")
+    commands.add_parser("lengths", help="Edit length of every project")
+    uses = commands.add_parser("uses", help="Projects using a file")
+    uses.add_argument("file")
+    plugin = commands.add_parser("plugin", help="Clips with a pluginName")
+    plugin.add_argument("plugin_name")
+    plugin.add_argument("--class", dest="clip_class", default=None, help="Only clips of this class, e.g. TopVFXClip")
+    args = parser.parse_args()
+
+    catalog = ClipCatalog(args.catalog)
+    start   = time.perf_counter()
+    if args.command == "ingest":
+        outcomes = catalog.Ingest(BatchImporter.FindProjects(args.root), force=args.force)
+        for path, outcome in outcomes.items():
+            print(f"{path}: {outcome}")
+    elif args.command == "lengths":
+        for path, length in catalog.EditLengths().items():
+            print(f"{path}: {length} frames")
+    elif args.command == "uses":
+        print("\n".join(catalog.ProjectsUsingFile(args.file)))
+    elif args.command == "plugin":
+        for row in catalog.ClipsWithPlugin(args.plugin_name, clip_class=args.clip_class):
+            print(json.dumps(row))
+    print(f"{catalog}; {time.perf_counter() - start:.3f}s")
+    catalog.Close()
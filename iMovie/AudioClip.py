@@ -1,46 +1,76 @@
 # builtin imports
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Optional, Sequence
+# local imports
+from iMovie.ClipFields import ClipFields
+from iMovie.ClipList import LazyClipList
+from iMovie.Schema import ClipSchema, Schema
 
 class AudioPushPin:
     """Tracking of push-pin properties within a clip"""
-    def __init__(self, pin_dict:Dict[str, Any]):
-        required = {"audioFrame", "originalClipFrame", "videoFrame"}
-        if not set(pin_dict.keys()).issuperset(required):
-            raise ValueError(f"AudioPushPin is missing required elements {required.difference(set(pin_dict.keys()))}!")
+    __slots__ = ("_audio_frame", "_originalClipFrame", "_videoFrame", "_clipUID", "_originalClipUID", "_other_elements", "_project")
+    _OPTIONAL : Dict[str, str] = {"clipUID":"_clipUID", "originalClipUID":"_originalClipUID"}
+    _NESTED   : FrozenSet[str] = frozenset()
+    _SCHEMA   : ClipSchema = Schema.For("AudioPushPin")
+
+    def __init__(self, pin_dict:Dict[str, Any], trusted:bool=False):
+        if not trusted:
+            AudioPushPin._SCHEMA.Require(pin_dict)
         self._audio_frame       = pin_dict['audioFrame']
         self._originalClipFrame = pin_dict['originalClipFrame']
         self._videoFrame        = pin_dict['videoFrame']
-        self._other_elements    = {pin:pin_dict[pin] for pin in pin_dict.keys() if pin not in required}
+        self._other_elements    = ClipFields.FillOptional(self, pin_dict, AudioPushPin._SCHEMA.required)
+        # set by the iMovieProj holding the pin, so clip UIDs can be looked up in its UniqueIDIndex
+        self._project           = None
+
+    def _bind(self, project):
+        self._project = project
+
+    @staticmethod
+    def FromTrustedDict(pin_dict:Dict[str, Any]) -> "AudioPushPin":
+        return AudioPushPin(pin_dict, trusted=True)
 
     @property
     def AudioFrame(self) -> int:
         return self._audio_frame
     @property
+    def Clip(self):
+        """The clip referred to by clipUID, or None if it's unset or the pin isn't part of a project."""
+        return self._project.UniqueIDIndex.Get(self.ClipUID) if self._project is not None else None
+    @property
     def ClipUID(self) -> Optional[int]:
-        return self._other_elements.get('clipUID')
+        return self._clipUID
     @property
     def OriginalClipFrame(self) -> int:
         return self._originalClipFrame
     @property
+    def OriginalClip(self):
+        """The clip referred to by originalClipUID, or None if it's unset or the pin isn't part of a project."""
+        return self._project.UniqueIDIndex.Get(self.OriginalClipUID) if self._project is not None else None
+    @property
     def OriginalClipUID(self) -> Optional[int]:
-        return self._other_elements.get('originalClipUID')
+        return self._originalClipUID
     @property
     def VideoFrame(self) -> int:
         return self._videoFrame
+    @property
+    def OtherElements(self) -> Dict[str, Any]:
+        """Any dict elements the push-pin class doesn't know about."""
+        return self._other_elements or {}
 
 class AudioClip:
     """Tracking of audio clip properties"""
-    def __init__(self, clip_dict:Dict[str, Any]):
-        # Check if class is ok
-        if not clip_dict.get('class') == "audio":
-            raise ValueError(f"AudioClip constructor was given a dict of class {clip_dict.get('class')}!")
-        # Check if clip got all necessary elements
-        required = {"duration","file","name","in","out","startFrame","track","trimmedEndFrame","trimmedStartFrame"}
-        available = set(clip_dict.keys())
-        if not set(clip_dict.keys()).issuperset(required):
-            vals_found = {key:clip_dict[key] for key in available.intersection(required)}
-            msg = f"AudioClip is missing required elements {required.difference(available)}!\n   Found required elements {vals_found}"
-            raise ValueError(msg)
+    __slots__ = ("_duration", "_fileName", "_name", "_inFrame", "_outFrame", "_startFrame", "_track", "_trimmedStart", "_trimmedEnd",
+                 "_filtered_list", "_push_pins", "_class", "_imae4cc", "_imaeVersion", "_isSelected", "_timeScale", "_uniqueID",
+                 "_version", "_other_elements")
+    _OPTIONAL : Dict[str, str] = {"class":"_class", "imae4cc":"_imae4cc", "imaeVersion":"_imaeVersion", "isSelected":"_isSelected",
+                                  "timeScale":"_timeScale", "uniqueID":"_uniqueID", "version":"_version"}
+    _NESTED   : FrozenSet[str] = frozenset({"imaeFilteredList", "pushPins"})
+    _SCHEMA   : ClipSchema = Schema.For("AudioClip")
+
+    def __init__(self, clip_dict:Dict[str, Any], trusted:bool=False):
+        # Check the class is audio and the clip got all necessary elements, unless Schema.ValidateProject already did
+        if not trusted:
+            AudioClip._SCHEMA.Require(clip_dict)
         self._duration     = clip_dict['duration']
         self._fileName     = clip_dict['file']
         self._name         = clip_dict['name']
@@ -51,9 +81,19 @@ class AudioClip:
         self._trimmedStart = clip_dict['trimmedStartFrame']
         self._trimmedEnd   = clip_dict['trimmedEndFrame']
 
-        self._filtered_list  = [AudioClip(clip) for clip in clip_dict.get('imaeFilteredList', [])]
-        self._push_pins      = [AudioPushPin(pin) for pin in clip_dict.get('pushPins', [])]
-        self._other_elements = {clip:clip_dict[clip] for clip in clip_dict.keys() if clip not in required}
+        self._filtered_list  = LazyClipList(clip_dict.get('imaeFilteredList', []), AudioClip.FromTrustedDict if trusted else AudioClip)
+        self._push_pins      = LazyClipList(clip_dict.get('pushPins', []), AudioPushPin.FromTrustedDict if trusted else AudioPushPin)
+        self._other_elements = ClipFields.FillOptional(self, clip_dict, AudioClip._SCHEMA.required)
+
+    def _bind(self, project):
+        """Pass the iMovieProj holding the clip on to its push-pins, including those of nested clips."""
+        self._filtered_list.Bind(project)
+        self._push_pins.Bind(project)
+
+    @staticmethod
+    def FromTrustedDict(clip_dict:Dict[str, Any]) -> "AudioClip":
+        """Build a clip without checking its dict, which must already have passed Schema.ValidateProject."""
+        return AudioClip(clip_dict, trusted=True)
 
     def __repr__(self):
         return f"<AudioClip object: name {self.Name}; file {self.FileName}; in {self.InFrame}; out {self.OutFrame}; start {self.StartFrame}>"
@@ -74,28 +114,28 @@ class AudioClip:
         return self._outFrame
     @property
     def Image4CC(self) -> Optional[int]:
-        return self._other_elements.get('imae4cc')
+        return self._imae4cc
     @property
-    def imagefilteredlist(self) -> list:
+    def imagefilteredlist(self) -> Sequence["AudioClip"]:
         return self._filtered_list
     @property
     def ImageVersion(self) -> Optional[int]:
-        return self._other_elements.get('imaeVersion')
+        return self._imaeVersion
     @property
     def IsSelected(self) -> Optional[bool]:
-        return self._other_elements.get('isSelected')
+        return self._isSelected
     @property
     def Name(self) -> str:
         return self._name
     @property
-    def PushPins(self) -> List[AudioPushPin]:
+    def PushPins(self) -> Sequence[AudioPushPin]:
         return self._push_pins
     @property
     def StartFrame(self) -> int:
         return self._startFrame
     @property
     def TimeScale(self) -> Optional[int]:
-        return self._other_elements.get('timeScale')
+        return self._timeScale
     @property
     def Track(self) -> int:
         return self._track
@@ -107,7 +147,11 @@ class AudioClip:
         return self._trimmedStart
     @property
     def UniqueID(self) -> Optional[bool]:
-        return self._other_elements.get('uniqueID')
+        return self._uniqueID
     @property
     def Version(self) -> Optional[str]:
-        return self._other_elements.get('version')
\ No newline at end of file
+        return self._version
+    @property
+    def OtherElements(self) -> Dict[str, Any]:
+        """Any dict elements the audio clip class doesn't know about."""
+        return self._other_elements or {}
\ No newline at end of file
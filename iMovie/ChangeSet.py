@@ -0,0 +1,34 @@
+# builtin imports
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+@dataclass
+class SectionChanges:
+    """Clips added, removed or changed in one clip list of a project, e.g. videoClips."""
+    added     : List[Any] = field(default_factory=list)
+    removed   : List[Any] = field(default_factory=list)
+    # (old clip, rebuilt clip) pairs sharing a uniqueID
+    changed   : List[Tuple[Any, Any]] = field(default_factory=list)
+    # whether the clips that were kept as-is now come in a different order
+    reordered : bool = False
+
+    @property
+    def IsEmpty(self) -> bool:
+        return not (self.added or self.removed or self.changed or self.reordered)
+
+@dataclass
+class ChangeSet:
+    """Everything iMovieProj.UpdateFrom changed, for consumers that only want to apply the deltas."""
+    sections : Dict[str, SectionChanges] = field(default_factory=dict)
+    # top-level, non-clip elements whose value changed, as key -> (old value, new value)
+    elements : Dict[str, Tuple[Any, Any]] = field(default_factory=dict)
+
+    def __repr__(self) -> str:
+        counts = "; ".join(f"{key}: +{len(changes.added)} -{len(changes.removed)} ~{len(changes.changed)}"
+                           + (" reordered" if changes.reordered else "")
+                           for key, changes in self.sections.items() if not changes.IsEmpty)
+        return f"<ChangeSet object: {counts or 'no clip changes'}; {len(self.elements)} changed elements>"
+
+    @property
+    def IsEmpty(self) -> bool:
+        return not self.elements and all(changes.IsEmpty for changes in self.sections.values())
@@ -0,0 +1,21 @@
+# builtin imports
+from typing import AbstractSet, Any, Dict, Optional
+
+class ClipFields:
+    """
+    Helpers for the __slots__ based clip classes.
+
+    Each clip class lists the optional dict elements it knows about in an _OPTIONAL mapping of element name to slot name,
+    and the elements it turns into child objects in _NESTED.
+    Only elements that are neither required, optional, nor nested get kept around in the overflow mapping.
+    """
+
+    @staticmethod
+    def FillOptional(obj:Any, clip_dict:Dict[str, Any], required:AbstractSet[str]) -> Optional[Dict[str, Any]]:
+        """Set every optional slot of obj from clip_dict (None when missing), returning the unknown elements, or None if there are none."""
+        optional = type(obj)._OPTIONAL
+        for key, slot in optional.items():
+            setattr(obj, slot, clip_dict.get(key))
+        nested = type(obj)._NESTED
+        other  = {key:val for key, val in clip_dict.items() if key not in optional and key not in required and key not in nested}
+        return other or None
@@ -0,0 +1,109 @@
+# builtin imports
+from collections.abc import MutableSequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+class LazyClipList(MutableSequence):
+    """
+    List of clips that holds on to the decoded clip dicts, and only builds each clip object the first time it's read.
+
+    Built clips replace their dicts in place, so each is built once and the dict can be freed. len() never builds anything,
+    and indexing or slicing only builds the clips asked for, so errors in a clip's dict surface when that clip is first read
+    (or all at once, from iMovieProj.Validate). It counts its own modifications in Version, so indexes built over it
+    can tell when they've gone stale.
+    Lists given a project with Bind pass it on to every clip they build, so push-pins can look up clips by uniqueID.
+    Lists of nested clips are given the clip holding them as parent, and set it on every clip they build or are given,
+    so a nested clip can always find the top-level clip it belongs to.
+    """
+    __slots__ = ("_items", "_build", "_version", "_project", "_parent")
+
+    def __init__(self, clip_dicts:Iterable[Any]=(), build:Optional[Callable[[Dict[str, Any]], Any]]=None, parent:Optional[Any]=None):
+        # copied, since built clips are swapped in for their dicts and the caller's list shouldn't change under it
+        self._items   : List[Any] = list(clip_dicts)
+        self._build   = build
+        self._version = 0
+        self._project = None
+        self._parent  = parent
+
+    def __repr__(self) -> str:
+        return f"<LazyClipList object: {len(self._items)} clips, {self.BuiltCount} built>"
+
+    @property
+    def Version(self) -> int:
+        return self._version
+    @property
+    def BuiltCount(self) -> int:
+        return sum(1 for item in self._items if type(item) is not dict)
+
+    def _get(self, index:int) -> Any:
+        item = self._items[index]
+        if type(item) is dict:
+            item = self._items[index] = self._build(item)
+            if self._project is not None:
+                item._bind(self._project)
+            if self._parent is not None:
+                item._parent = self._parent
+        return item
+
+    def _adopt(self, item:Any) -> Any:
+        if self._parent is not None and type(item) is not dict:
+            item._parent = self._parent
+        return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self._items)))]
+        return self._get(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        i = 0
+        while i < len(self._items):
+            yield self._get(i)
+            i += 1
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, LazyClipList)):
+            return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+        return NotImplemented
+
+    def __setitem__(self, index, value):
+        self._version += 1
+        self._items[index] = [self._adopt(item) for item in value] if isinstance(index, slice) else self._adopt(value)
+
+    def __delitem__(self, index):
+        self._version += 1
+        del self._items[index]
+
+    def insert(self, index:int, value:Any):
+        self._version += 1
+        self._items.insert(index, self._adopt(value))
+
+    def sort(self, key=None, reverse:bool=False):
+        self._version += 1
+        self._items = sorted(self, key=key, reverse=reverse)
+
+    def Built(self) -> Iterator[Any]:
+        """The clips that have been built so far, without building any more."""
+        return (item for item in self._items if type(item) is not dict)
+
+    def Materialize(self) -> "LazyClipList":
+        """Build every clip now, raising the first error any clip's dict has."""
+        for i in range(len(self._items)):
+            self._get(i)
+        return self
+
+    def Bind(self, project:Any):
+        """Hand project to every clip built so far, and to every clip built from now on."""
+        self._project = project
+        for item in self.Built():
+            item._bind(project)
+
+    # Raw items, for iMovieProj to diff against a newer revision without building anything
+    def _rawItems(self) -> List[Any]:
+        return list(self._items)
+
+    def _setRawItems(self, items:List[Any]):
+        self._version += 1
+        self._items = list(items)
@@ -0,0 +1,140 @@
+# builtin imports
+from fractions import Fraction
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+# 3rd-party imports
+import numpy as np
+
+class FrameRate:
+    """
+    Exact frame rate of an iMovie timeScale, with conversions of whole frame arrays to seconds, timecode and other rates.
+
+    timeScale is the rate times 100, so 2500 is 25 fps, while the NTSC rates come out as 2997, 5994 and 2398,
+    which are taken to be their exact 30000/1001, 60000/1001 and 24000/1001.
+    All conversions are done in integer arithmetic on the rate's numerator and denominator, rounding only once at
+    the end, so errors don't pile up however long the edit. Rates are built once per timeScale and shared; get them
+    with FrameRate.For.
+    """
+    __slots__ = ("_time_scale", "_rate", "_nominal", "_drop", "_frames_per_minute", "_frames_per_10_minutes")
+    _RATES : Dict[int, "FrameRate"] = {}
+
+    def __init__(self, time_scale:int):
+        if time_scale <= 0:
+            raise ValueError(f"FrameRate was given a non-positive timeScale of {time_scale}!")
+        self._time_scale = time_scale
+        self._nominal    = max(round(time_scale / 100), 1)
+        ntsc             = time_scale % 100 != 0 and abs(self._nominal * 100_000 / 1001 - time_scale) < 1
+        self._rate       : Fraction = Fraction(self._nominal * 1000, 1001) if ntsc else Fraction(time_scale, 100)
+        # SMPTE drop-frame skips 2 frame numbers a minute at 29.97, and 4 at 59.94, except every tenth minute
+        self._drop       : int = self._nominal // 15 if ntsc and self._nominal % 30 == 0 else 0
+        self._frames_per_minute     : int = self._nominal * 60 - self._drop
+        self._frames_per_10_minutes : int = self._frames_per_minute * 10 + self._drop
+
+    def __repr__(self) -> str:
+        return f"<FrameRate object: timeScale {self._time_scale}; {self._rate} fps{'; drop-frame' if self.DropFrame else ''}>"
+
+    def __eq__(self, other:Any) -> bool:
+        return isinstance(other, FrameRate) and self._rate == other._rate
+    def __hash__(self) -> int:
+        return hash(self._rate)
+
+    @staticmethod
+    def For(time_scale:int) -> "FrameRate":
+        """The shared FrameRate of a timeScale."""
+        ret_val = FrameRate._RATES.get(time_scale)
+        if ret_val is None:
+            ret_val = FrameRate._RATES[time_scale] = FrameRate(time_scale)
+        return ret_val
+
+    @staticmethod
+    def InProject(proj:Any) -> Dict[int, "FrameRate"]:
+        """The rates of every timeScale used by the top-level clips of an iMovieProj."""
+        time_scales = {clip.TimeScale for clips in (proj.VideoClips, proj.AudioClips) for clip in clips if clip.TimeScale}
+        return {time_scale:FrameRate.For(time_scale) for time_scale in sorted(time_scales)}
+
+    #region Per-rate constants
+    @property
+    def TimeScale(self) -> int:
+        return self._time_scale
+    @property
+    def Rate(self) -> Fraction:
+        """Frames per second."""
+        return self._rate
+    @property
+    def Period(self) -> Fraction:
+        """Seconds per frame."""
+        return 1 / self._rate
+    @property
+    def Nominal(self) -> int:
+        """Whole frames per second that timecode counts in, e.g. 30 for 29.97."""
+        return self._nominal
+    @property
+    def DropFrame(self) -> bool:
+        return self._drop > 0
+    @property
+    def BlenderRate(self) -> Tuple[int, float]:
+        """Blender's (fps, fps_base) for this rate, e.g. (30, 1.001) for 29.97."""
+        base = self._nominal / self._rate
+        return (self._nominal, float(base))
+    #endregion
+
+    def Seconds(self, frames:Any) -> np.ndarray:
+        """Frame counts to seconds."""
+        frames = np.asarray(frames, dtype=np.int64)
+        return (frames * self._rate.denominator) / self._rate.numerator
+
+    def ExactSeconds(self, frame:int) -> Fraction:
+        """Start of a single frame in seconds, as an exact fraction."""
+        return frame / self._rate
+
+    def FramesAt(self, frames:Any, target:"FrameRate") -> np.ndarray:
+        """Frame counts to the nearest frame count at another rate, rounding halves up."""
+        frames = np.asarray(frames, dtype=np.int64)
+        ratio  = target._rate / self._rate
+        return (2 * frames * ratio.numerator + ratio.denominator) // (2 * ratio.denominator)
+
+    def Timecode(self, frames:Any, drop_frame:Optional[bool]=None) -> List[str]:
+        """Frame counts to SMPTE hh:mm:ss:ff timecode, wrapping at 24 hours.
+
+        Drop-frame timecode, written with a ';' before the frames, is used wherever the rate has one, unless
+        drop_frame says otherwise.
+        """
+        fields, separator = self._timecodeFields(np.asarray(frames, dtype=np.int64), drop_frame)
+        return [f"{hours:02}:{minutes:02}:{seconds:02}{separator}{frame:02}" for hours, minutes, seconds, frame in zip(*(field.tolist() for field in fields))]
+
+    def _timecodeFields(self, frames:np.ndarray, drop_frame:Optional[bool]) -> Tuple[Tuple[np.ndarray, ...], str]:
+        drop = self._drop > 0 and drop_frame is not False
+        if drop:
+            # put back the frame numbers skipped so far, after which the count is plain nominal-rate timecode
+            tens, rest = np.divmod(frames, self._frames_per_10_minutes)
+            skipped = self._drop * (9 * tens + np.maximum(rest - self._drop, 0) // self._frames_per_minute)
+            frames  = frames + skipped
+        nominal = self._nominal
+        return ((frames // (nominal * 3600) % 24, frames // (nominal * 60) % 60, frames // nominal % 60, frames % nominal),
+                ";" if drop else ":")
+
+    def FromTimecode(self, timecodes:Iterable[str]) -> np.ndarray:
+        """SMPTE timecode back to frame counts, drop-frame if written with a ';' (or ',' or '.') before the frames."""
+        fields = []
+        drop   = []
+        for timecode in timecodes:
+            hours, minutes, seconds, frame = (int(part) for part in timecode.replace(";", ":").replace(",", ":").replace(".", ":").split(":"))
+            fields.append((hours, minutes, seconds, frame))
+            drop.append(timecode[-3] in ";,.")
+        parts   = np.array(fields, dtype=np.int64).reshape(-1, 4)
+        minutes = parts[:, 0] * 60 + parts[:, 1]
+        ret_val = (minutes * 60 + parts[:, 2]) * self._nominal + parts[:, 3]
+        if self._drop:
+            ret_val -= np.where(drop, self._drop * (minutes - minutes // 10), 0)
+        return ret_val
+
+    @staticmethod
+    def SecondsOf(frames:Any, time_scales:Any) -> np.ndarray:
+        """Frame counts to seconds, each at its own timeScale, in one go; NaN where the timeScale isn't positive."""
+        frames      = np.asarray(frames, dtype=np.int64)
+        time_scales = np.broadcast_to(np.asarray(time_scales, dtype=np.int64), frames.shape)
+        scales, inverse = np.unique(time_scales.ravel(), return_inverse=True)
+        rates = [FrameRate.For(int(scale)).Rate if scale > 0 else None for scale in scales]
+        nums  = np.array([rate.numerator if rate is not None else 0 for rate in rates], dtype=np.int64)[inverse]
+        dens  = np.array([rate.denominator if rate is not None else 0 for rate in rates], dtype=np.int64)[inverse]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(nums > 0, (frames.ravel() * dens) / np.where(nums > 0, nums, 1), np.nan).reshape(frames.shape)
@@ -0,0 +1,153 @@
+# builtin imports
+import contextlib
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple
+# local imports
+from iMovie.Schema import Schema
+
+class ImportStats:
+    """
+    Opt-in record of where an import spends its time, handed to FromXMLFile, SetupEditFromiMovieProj and friends.
+
+    Each pipeline phase is timed with the Phase context manager; with trace_memory=True the tracemalloc peak of each
+    phase is recorded too, and with profile=True the whole import runs under cProfile.
+    Callbacks added with OnPhase are called with (name, seconds) as each phase ends.
+    Code being instrumented uses ImportStats.Track(stats, name), which costs nothing more than a None check when
+    stats is None.
+    """
+    _NOTHING : ContextManager = contextlib.nullcontext()
+
+    def __init__(self, profile:bool=False, trace_memory:bool=False):
+        self._profile_enabled = profile
+        self._trace_memory    = trace_memory
+        self._phases          : Dict[str, float] = {}
+        self._memory          : Dict[str, int] = {}
+        self._peaks           : List[int] = []
+        self._callbacks       : List[Callable[[str, float], None]] = []
+        self._clip_classes    : Counter = Counter()
+        self._depths          : Counter = Counter()
+        self._profile         : Optional[cProfile.Profile] = None
+
+    def __repr__(self) -> str:
+        phases = "; ".join(f"{name} {seconds:.3f}s" for name, seconds in self._phases.items())
+        return f"<ImportStats object: {phases or 'no phases'}; {sum(self._clip_classes.values())} clips>"
+
+    @staticmethod
+    def Track(stats:Optional["ImportStats"], name:str) -> ContextManager:
+        """Time a phase into stats, or do nothing if stats is None."""
+        return stats.Phase(name) if stats is not None else ImportStats._NOTHING
+
+    @staticmethod
+    def Profiling(stats:Optional["ImportStats"]) -> ContextManager:
+        """Run the enclosed code under cProfile, if stats asked for it."""
+        return stats._profiling() if stats is not None and stats._profile_enabled else ImportStats._NOTHING
+
+    def OnPhase(self, callback:Callable[[str, float], None]):
+        self._callbacks.append(callback)
+
+    @contextlib.contextmanager
+    def Phase(self, name:str):
+        """Time the enclosed code as the named phase, adding to any earlier time recorded under the same name."""
+        tracing = self._trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self._trace_memory:
+            # phases can nest, and each one resets the tracemalloc peak, so keep the enclosing phases' peaks ourselves
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            if self._trace_memory:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                self._memory[name] = max(self._memory.get(name, 0), peak)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+            if tracing:
+                tracemalloc.stop()
+            self._phases[name] = self._phases.get(name, 0.0) + elapsed
+            for callback in self._callbacks:
+                callback(name, elapsed)
+
+    @contextlib.contextmanager
+    def _profiling(self):
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+        self._profile.enable()
+        try:
+            yield self
+        finally:
+            self._profile.disable()
+
+    def CountClips(self, clip_lists:Iterable[Iterable[Any]]):
+        """Count clips by class and nesting depth, top-level clips being depth 0."""
+        stack : List[Tuple[Any, int]] = [(clip, 0) for clips in clip_lists for clip in clips]
+        while stack:
+            clip, depth = stack.pop()
+            self._clip_classes[type(clip).__name__] += 1
+            self._depths[depth] += 1
+            for child in getattr(clip, "FilteredClips", []):
+                stack.append((child, depth + 1))
+            for child in getattr(clip, "ReplacedClips", []):
+                stack.append((child, depth + 1))
+            for child in getattr(clip, "imagefilteredlist", []):
+                stack.append((child, depth + 1))
+
+    def CountClipDicts(self, sections:Dict[str, Iterable[Dict[str, Any]]]):
+        """Count clips by class and nesting depth straight from the decoded clip lists, without building any clips.
+
+        Each dict is counted as the class it would be built as, so the counts match those of CountClips.
+        """
+        stack : List[Tuple[Any, str, int]] = [(clip_dict, Schema.SECTIONS[key], 0) for key, clip_dicts in sections.items() for clip_dict in clip_dicts]
+        while stack:
+            clip_dict, family, depth = stack.pop()
+            if type(clip_dict) is not dict:
+                continue
+            schema = Schema.ClassFor(clip_dict, family)
+            self._clip_classes[schema.name] += 1
+            self._depths[depth] += 1
+            for key, child_family in schema.nested.items():
+                # push-pins aren't clips
+                if child_family != "pin":
+                    stack.extend((child, child_family, depth + 1) for child in clip_dict.get(key, []))
+
+    @property
+    def Phases(self) -> Dict[str, float]:
+        """Seconds spent in each phase, in the order the phases first ran."""
+        return self._phases
+    @property
+    def Memory(self) -> Dict[str, int]:
+        """Peak bytes traced during each phase, if trace_memory was on."""
+        return self._memory
+    @property
+    def ClipClasses(self) -> Counter:
+        return self._clip_classes
+    @property
+    def Depths(self) -> Counter:
+        return self._depths
+    @property
+    def Profile(self) -> Optional[pstats.Stats]:
+        """The cProfile results, if profile was on."""
+        return pstats.Stats(self._profile) if self._profile is not None else None
+
+    def Report(self, top:int=10) -> str:
+        lines = [f"{name}: {seconds:.3f}s" + (f"; peak {self._memory[name] / 2**20:.1f} MiB" if name in self._memory else "")
+                 for name, seconds in self._phases.items()]
+        if self._clip_classes:
+            lines.append("clips by class: " + ", ".join(f"{name} {count}" for name, count in self._clip_classes.most_common()))
+            lines.append("clips by depth: " + ", ".join(f"{depth}: {count}" for depth, count in sorted(self._depths.items())))
+        if self._profile is not None:
+            # pstats only knows how to print to a stream
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(top)
+            lines.append(stream.getvalue())
+        return "\n".join(lines)
@@ -0,0 +1,141 @@
+# builtin imports
+import heapq
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+class ClipSpan(NamedTuple):
+    """Stretch of edit frames [start, end) taken up by a top-level clip."""
+    start : int
+    end   : int
+    track : int
+    audio : bool
+    clip  : Any
+
+class _Node:
+    """Node of a centered interval tree, holding the spans that contain its center frame."""
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center:int, spans:List[ClipSpan]):
+        self.center   : int = center
+        self.by_start : List[ClipSpan] = sorted(spans, key=lambda span: span.start)
+        self.by_end   : List[ClipSpan] = sorted(spans, key=lambda span: span.end, reverse=True)
+        self.left     : Optional[_Node] = None
+        self.right    : Optional[_Node] = None
+
+class IntervalIndex:
+    """
+    Index of which clips are playing at which edit frames, with one centered interval tree per track.
+
+    Point and range queries take O(log n + k) for k matching clips. Audio and video tracks are kept apart, since their
+    track numbers are counted separately.
+    """
+    def __init__(self, spans:Sequence[ClipSpan]):
+        by_track : Dict[Tuple[bool, int], List[ClipSpan]] = {}
+        for span in spans:
+            # zero-length clips can never be playing, and would only get in the way of picking tree centers
+            if span.end > span.start:
+                by_track.setdefault((span.audio, span.track), []).append(span)
+        self._trees    : Dict[Tuple[bool, int], Optional[_Node]] = {key:IntervalIndex._build(track_spans) for key, track_spans in by_track.items()}
+        self._overlaps : Dict[Tuple[bool, int], List[Tuple[ClipSpan, ClipSpan]]] = {}
+        self._spans    : Dict[Tuple[bool, int], List[ClipSpan]] = by_track
+
+    def __repr__(self) -> str:
+        return f"<IntervalIndex object: {sum(len(spans) for spans in self._spans.values())} clips over {len(self._trees)} tracks>"
+
+    @staticmethod
+    def EditSpans(video_clips:Sequence[Any], audio_clips:Sequence[Any]) -> List[ClipSpan]:
+        """Work out where in the edit each top-level clip sits.
+
+        Audio clips carry their own startFrame, while video clips are laid back to back along their track in project order.
+        """
+        ret_val    : List[ClipSpan] = []
+        track_ends : Dict[int, int] = {}
+        for clip in video_clips:
+            track = clip.Track if clip.Track is not None else 0
+            start = track_ends.get(track, 0)
+            end   = track_ends[track] = start + clip.OutFrame - clip.InFrame
+            ret_val.append(ClipSpan(start, end, track, False, clip))
+        for clip in audio_clips:
+            ret_val.append(ClipSpan(clip.StartFrame, clip.StartFrame + clip.OutFrame - clip.InFrame, clip.Track, True, clip))
+        return ret_val
+
+    @property
+    def Tracks(self) -> List[Tuple[bool, int]]:
+        """The (audio, track) pairs with at least one clip on them."""
+        return sorted(self._trees.keys())
+
+    def At(self, frame:int, track:Optional[int]=None, audio:Optional[bool]=None) -> List[ClipSpan]:
+        """Get the clips playing at the given edit frame, sorted by start."""
+        return self.Range(frame, frame + 1, track=track, audio=audio)
+
+    def Range(self, start:int, end:int, track:Optional[int]=None, audio:Optional[bool]=None) -> List[ClipSpan]:
+        """Get the clips playing at any point in the edit frames [start, end), sorted by start."""
+        ret_val = []
+        for node in self._roots(track, audio):
+            ret_val.extend(IntervalIndex._query(node, start, end))
+        return sorted(ret_val, key=lambda span: (span.start, span.audio, span.track))
+
+    def Overlaps(self, track:int, audio:bool=False) -> List[Tuple[ClipSpan, ClipSpan]]:
+        """Get every pair of clips on a track that play at the same time, as (earlier, later) pairs."""
+        key = (audio, track)
+        if key not in self._overlaps:
+            self._overlaps[key] = IntervalIndex._sweep(self._spans.get(key, []))
+        return self._overlaps[key]
+
+    def _roots(self, track:Optional[int], audio:Optional[bool]) -> Iterator[_Node]:
+        for (is_audio, track_num), node in self._trees.items():
+            if (track is None or track == track_num) and (audio is None or audio == is_audio) and node is not None:
+                yield node
+
+    @staticmethod
+    def _build(spans:List[ClipSpan]) -> Optional[_Node]:
+        if not spans:
+            return None
+        # centering on the median start guarantees the clip starting there lands in the node, so every level shrinks
+        starts = sorted(span.start for span in spans)
+        center = starts[len(starts) // 2]
+        left   = [span for span in spans if span.end <= center]
+        right  = [span for span in spans if span.start > center]
+        here   = [span for span in spans if span.start <= center < span.end]
+        node = _Node(center, here)
+        node.left  = IntervalIndex._build(left)
+        node.right = IntervalIndex._build(right)
+        return node
+
+    @staticmethod
+    def _query(root:_Node, start:int, end:int) -> Iterator[ClipSpan]:
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if end <= node.center:
+                # everything here ends after the center, so only the start matters
+                for span in node.by_start:
+                    if span.start >= end:
+                        break
+                    yield span
+                if node.left is not None:
+                    stack.append(node.left)
+            elif start > node.center:
+                # everything here starts at or before the center, so only the end matters
+                for span in node.by_end:
+                    if span.end <= start:
+                        break
+                    yield span
+                if node.right is not None:
+                    stack.append(node.right)
+            else:
+                yield from node.by_start
+                if node.left is not None:
+                    stack.append(node.left)
+                if node.right is not None:
+                    stack.append(node.right)
+
+    @staticmethod
+    def _sweep(spans:List[ClipSpan]) -> List[Tuple[ClipSpan, ClipSpan]]:
+        ret_val : List[Tuple[ClipSpan, ClipSpan]] = []
+        active  : List[Tuple[int, int, ClipSpan]] = []
+        for i, span in enumerate(sorted(spans, key=lambda span: span.start)):
+            while active and active[0][0] <= span.start:
+                heapq.heappop(active)
+            ret_val.extend((other, span) for _, _, other in sorted(active, key=lambda item: item[2].start))
+            heapq.heappush(active, (span.end, i, span))
+        return ret_val
@@ -0,0 +1,91 @@
+# builtin imports
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+class ClipLineage:
+    """
+    Flattened view of where a video clip comes from, worked out once by LineageEngine and cached on the clip.
+
+    base_files follows the existing BaseFileName rules (a transition's base files are those of the clips it replaced,
+    anything else is its own file), while source_files digs all the way down through filtered and replaced clips
+    to the original media.
+    """
+    __slots__ = ("base_files", "source_files", "depth", "parent", "root", "_ancestors")
+
+    def __init__(self, base_files:Tuple[str, ...], source_files:Tuple[str, ...], depth:int, parent:Optional[Any], root:Any):
+        self.base_files   : Tuple[str, ...] = base_files
+        self.source_files : Tuple[str, ...] = source_files
+        self.depth        : int = depth
+        self.parent       : Optional[Any] = parent
+        self.root         : Any = root
+        self._ancestors   : Optional[Tuple[Any, ...]] = None
+
+    @property
+    def Ancestors(self) -> Tuple[Any, ...]:
+        """Clips from the top-level clip down to this clip's parent."""
+        if self._ancestors is None:
+            ret_val = []
+            parent = self.parent
+            while parent is not None:
+                ret_val.append(parent)
+                parent = parent.Lineage.parent
+            self._ancestors = tuple(reversed(ret_val))
+        return self._ancestors
+
+class LineageEngine:
+    """Walks nested filteredClips/replacedClips trees with an explicit stack, so long chains can't hit the recursion limit."""
+
+    @staticmethod
+    def Children(clip:Any) -> List[Any]:
+        return list(getattr(clip, "FilteredClips", [])) + list(getattr(clip, "ReplacedClips", []))
+
+    @staticmethod
+    def Walk(root:Any):
+        """Work out and cache the lineage of root and everything nested under it, treating root as the top-level clip."""
+        stack : List[Tuple[Any, Optional[Any], bool]] = [(root, None, False)]
+        while stack:
+            clip, clip_parent, children_done = stack.pop()
+            children = LineageEngine.Children(clip)
+            if not children_done:
+                stack.append((clip, clip_parent, True))
+                stack.extend((child, clip, False) for child in reversed(children))
+                continue
+            file_name = getattr(clip, "FileName", None)
+            if hasattr(clip, "ReplacedClips"):
+                base_files = tuple(name for child in children for name in child._lineage.base_files)
+            else:
+                base_files = (file_name,) if file_name is not None else ()
+            if children:
+                source_files = tuple(name for child in children for name in child._lineage.source_files)
+            else:
+                source_files = base_files
+            filtered = getattr(clip, "FilteredClips", None)
+            depth    = filtered[0]._lineage.depth + 1 if filtered else 0
+            clip._lineage = ClipLineage(base_files, source_files, depth, clip_parent, root)
+
+class LineageIndex:
+    """Project-wide lineage, with a reverse index from each source file to the clips built from it."""
+
+    def __init__(self, top_clips:Iterable[Any]):
+        self._top_clips : Dict[str, List[Any]] = {}
+        self._all_clips : Dict[str, List[Any]] = {}
+        for top_clip in top_clips:
+            LineageEngine.Walk(top_clip)
+            for source in dict.fromkeys(top_clip.Lineage.source_files):
+                self._top_clips.setdefault(source, []).append(top_clip)
+            stack = [top_clip]
+            while stack:
+                clip = stack.pop()
+                for source in dict.fromkeys(clip.Lineage.source_files):
+                    self._all_clips.setdefault(source, []).append(clip)
+                stack.extend(LineageEngine.Children(clip))
+
+    def __repr__(self) -> str:
+        return f"<LineageIndex object: {len(self._top_clips)} source files>"
+
+    @property
+    def SourceFiles(self) -> List[str]:
+        return list(self._top_clips.keys())
+
+    def ClipsForSource(self, source_file:str, nested:bool=False) -> List[Any]:
+        """Get the top-level clips built from a source file, or with nested=True every clip, nested ones included."""
+        return (self._all_clips if nested else self._top_clips).get(source_file, [])
@@ -0,0 +1,143 @@
+# builtin imports
+import bisect
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+# local imports
+from iMovie.IntervalIndex import ClipSpan, IntervalIndex
+
+class SourceRange(NamedTuple):
+    """Stretch of source frames [source_in, source_out) of an original media file."""
+    file       : str
+    source_in  : int
+    source_out : int
+
+class Segment(NamedTuple):
+    """
+    One entry of the edit decision list: the edit frames [start, end) of a track, and what plays there.
+
+    file, source_in and source_out give the media to play, which for effects and transitions is the file iMovie
+    rendered them to. sources gives the original media beneath, found by following the filtered and replaced clips
+    down, and effects the plugins applied on the way, outermost first.
+    """
+    start      : int
+    end        : int
+    track      : int
+    audio      : bool
+    kind       : str
+    file       : Optional[str]
+    source_in  : int
+    source_out : int
+    effects    : Tuple[str, ...]
+    sources    : Tuple[SourceRange, ...]
+    clip       : Any
+
+    @property
+    def Effect(self) -> Optional[str]:
+        """The outermost effect or transition, if any."""
+        return self.effects[0] if self.effects else None
+
+class RenderPlan:
+    """
+    Flat, time-ordered list of Segments per track, resolved once from the recursive clip graph of a project.
+
+    A VFX clip's frames map onto its filtered clip's frames from that clip's in point on, so its sources are found by
+    offsetting down the filteredClips chain. A transition takes the last framesTakenBefore frames of the clip it
+    replaced going out, and the first framesTakenAfter frames of the one coming in.
+    Building is a sort of the top-level spans plus one walk down each nested chain, so O(n log n) over the clips.
+    """
+    KIND_FILE       = "file"
+    KIND_VFX        = "VFX"
+    KIND_TRANSITION = "transition"
+    KIND_BLANK      = "blank"
+    KIND_AUDIO      = "audio"
+
+    def __init__(self, segments:List[Segment]):
+        self._tracks : Dict[Tuple[bool, int], List[Segment]] = {}
+        for segment in sorted(segments, key=lambda segment: (segment.audio, segment.track, segment.start)):
+            self._tracks.setdefault((segment.audio, segment.track), []).append(segment)
+        self._starts : Dict[Tuple[bool, int], List[int]] = {key:[segment.start for segment in track] for key, track in self._tracks.items()}
+
+    def __repr__(self) -> str:
+        return f"<RenderPlan object: {len(self)} segments over {len(self._tracks)} tracks>"
+
+    def __len__(self) -> int:
+        return sum(len(track) for track in self._tracks.values())
+
+    def __iter__(self) -> Iterator[Segment]:
+        """Every segment, video tracks first, each track in time order."""
+        for track in self._tracks.values():
+            yield from track
+
+    @staticmethod
+    def FromProject(proj:Any) -> "RenderPlan":
+        return RenderPlan([RenderPlan._segment(span) for span in IntervalIndex.EditSpans(proj.VideoClips, proj.AudioClips)])
+
+    @property
+    def Tracks(self) -> List[Tuple[bool, int]]:
+        """The (audio, track) pairs with at least one segment on them."""
+        return list(self._tracks.keys())
+
+    def Track(self, track:int, audio:bool=False) -> List[Segment]:
+        return self._tracks.get((audio, track), [])
+
+    def At(self, frame:int, track:int, audio:bool=False) -> Optional[Segment]:
+        """The segment playing at an edit frame of a track, or None if there's none; the latest to start if several overlap."""
+        segments = self._tracks.get((audio, track), [])
+        i = bisect.bisect_right(self._starts.get((audio, track), []), frame) - 1
+        while i >= 0:
+            if segments[i].end > frame:
+                return segments[i]
+            # audio clips can overlap, so an earlier one may still be playing
+            if not audio:
+                return None
+            i -= 1
+        return None
+
+    @staticmethod
+    def _segment(span:ClipSpan) -> Segment:
+        clip    = span.clip
+        file    = getattr(clip, "FileName", None)
+        effects : Tuple[str, ...] = ()
+        if span.audio:
+            kind    = RenderPlan.KIND_AUDIO
+            sources = (SourceRange(file, clip.InFrame, clip.OutFrame),)
+        elif file is None:
+            kind    = RenderPlan.KIND_BLANK
+            sources = ()
+        else:
+            if hasattr(clip, "ReplacedClips"):
+                kind = RenderPlan.KIND_TRANSITION
+            elif hasattr(clip, "FilteredClips"):
+                kind = RenderPlan.KIND_VFX
+            else:
+                kind = RenderPlan.KIND_FILE
+            effects, sources = RenderPlan._resolve(clip, clip.InFrame, clip.OutFrame)
+        return Segment(span.start, span.end, span.track, span.audio, kind, file, clip.InFrame, clip.OutFrame, effects, tuple(sources), clip)
+
+    @staticmethod
+    def _resolve(clip:Any, source_in:int, source_out:int) -> Tuple[Tuple[str, ...], List[SourceRange]]:
+        """Follow frames [source_in, source_out) of a clip down to the original media, with an explicit stack."""
+        effects : List[str] = []
+        sources : List[SourceRange] = []
+        stack   = [(clip, source_in, source_out)]
+        while stack:
+            clip, source_in, source_out = stack.pop()
+            filtered = getattr(clip, "FilteredClips", None)
+            replaced = getattr(clip, "ReplacedClips", None)
+            if filtered or replaced:
+                if clip.PluginName is not None:
+                    effects.append(clip.PluginName)
+            if filtered:
+                inner = filtered[0]
+                stack.append((inner, inner.InFrame + source_in, inner.InFrame + source_out))
+            elif replaced:
+                # pushed in reverse, so the outgoing clip comes out first
+                if len(replaced) > 1:
+                    incoming = replaced[-1]
+                    stack.append((incoming, incoming.InFrame, incoming.InFrame + clip.FramesTakenAfter))
+                outgoing = replaced[0]
+                stack.append((outgoing, outgoing.OutFrame - clip.FramesTakenBefore, outgoing.OutFrame))
+            else:
+                file = getattr(clip, "FileName", None)
+                if file is not None and source_out > source_in:
+                    sources.append(SourceRange(file, source_in, source_out))
+        return tuple(effects), sources
@@ -0,0 +1,229 @@
+# builtin imports
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+Map   = Dict[str, Any]
+Types = Tuple[type, ...]
+
+# exact types, so a bool doesn't pass for an int
+_INT    : Types = (int,)
+_NUMBER : Types = (int, float)
+_STR    : Types = (str,)
+_BOOL   : Types = (bool,)
+_LIST   : Types = (list,)
+# the schema doc has mediaHandlePost as an int, while VideoClip takes it for a bool, so either is accepted
+_FLAG   : Types = (int, bool)
+
+class Violation(NamedTuple):
+    """One thing wrong with a decoded project, with the path of the element it's in, e.g. videoClips[12].filteredClips[0]."""
+    path    : str
+    message : str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+class SchemaError(ValueError):
+    """Raised when a decoded project doesn't match the schema, holding every violation found."""
+    SHOWN = 20
+
+    def __init__(self, violations:List[Violation]):
+        self.violations : List[Violation] = violations
+        listed = "\n   ".join(str(violation) for violation in violations[:SchemaError.SHOWN])
+        more   = f"\n   ...and {len(violations) - SchemaError.SHOWN} more" if len(violations) > SchemaError.SHOWN else ""
+        super().__init__(f"Project has {len(violations)} schema violation(s):\n   {listed}{more}")
+
+class ClipSchema:
+    """
+    Compiled schema of one clip class: the elements it requires, the types its known elements must have,
+    elements with a fixed value, and the elements holding lists of nested clips (mapped to the family of those clips).
+
+    Whether a dict has its required elements with the right types only depends on its keys and the types of its values,
+    and most clips of a project share a handful of those signatures, so the signatures that passed are remembered.
+    """
+    __slots__ = ("name", "required", "types", "constants", "nested", "_children", "_valid")
+    MAX_SIGNATURES = 4096
+
+    def __init__(self, name:str, required:Iterable[str], types:Dict[str, Types], constants:Optional[Map]=None,
+                 nested:Optional[Dict[str, str]]=None):
+        self.name      : str = name
+        self.required  : FrozenSet[str] = frozenset(required)
+        self.types     : Dict[str, Types] = types
+        self.constants : Map = constants or {}
+        self.nested    : Dict[str, str] = nested or {}
+        # nested elements in reverse, the order they go onto ValidateProject's stack
+        self._children : Tuple[Tuple[str, str], ...] = tuple(reversed(list(self.nested.items())))
+        self._valid    : Set[Tuple[tuple, tuple]] = set()
+
+    def __repr__(self) -> str:
+        return f"<ClipSchema object: {self.name}; {len(self.required)} required elements>"
+
+    def Require(self, clip_dict:Map):
+        """Raise ValueError if clip_dict is missing required elements or has the wrong constant values; types aren't checked."""
+        for key, value in self.constants.items():
+            if clip_dict.get(key) != value:
+                raise ValueError(f"{self.name} constructor was given a dict of {key} {clip_dict.get(key)}!")
+        available = clip_dict.keys()
+        if not self.required <= available:
+            vals_found = {key:clip_dict[key] for key in available & self.required}
+            raise ValueError(f"{self.name} is missing required elements {set(self.required - available)}!\n   Found required elements {vals_found}")
+
+    def IsValid(self, clip_dict:Map) -> bool:
+        """Whether clip_dict itself has no violations, not counting its nested clips."""
+        for key, value in self.constants.items():
+            if clip_dict.get(key) != value:
+                return False
+        signature = (tuple(clip_dict), tuple(map(type, clip_dict.values())))
+        if signature in self._valid:
+            return True
+        if self.required - clip_dict.keys():
+            return False
+        for key, value in clip_dict.items():
+            types = self.types.get(key)
+            if types is not None and type(value) not in types:
+                return False
+        if len(self._valid) < ClipSchema.MAX_SIGNATURES:
+            self._valid.add(signature)
+        return True
+
+    def Check(self, clip_dict:Map, path:str) -> List[Violation]:
+        """Every violation in clip_dict itself, not counting its nested clips."""
+        ret_val : List[Violation] = []
+        if self.IsValid(clip_dict):
+            return ret_val
+        for key, value in self.constants.items():
+            if clip_dict.get(key) != value:
+                ret_val.append(Violation(f"{path}.{key}", f"expected {value!r}, got {clip_dict.get(key)!r}"))
+        missing = self.required - clip_dict.keys()
+        if missing:
+            ret_val.append(Violation(path, f"{self.name} is missing required elements {sorted(missing)}"))
+        for key, value in clip_dict.items():
+            types = self.types.get(key)
+            if types is not None and type(value) not in types:
+                ret_val.append(Violation(f"{path}.{key}", f"expected {' or '.join(t.__name__ for t in types)}, got {type(value).__name__}"))
+        return ret_val
+
+class Schema:
+    """
+    The iMovie HD project schema, compiled from doc/iMovieHD-format-schema.md into one ClipSchema per clip class.
+
+    ValidateProject checks a whole decoded project in a single pass and reports every violation, rather than stopping at
+    the first broken clip. A project that passes can have its clips built with trusted=True, skipping the per-clip checks.
+    """
+    _VIDEO_TYPES : Dict[str, Types] = {
+        "class":_STR, "clipEatenByFilter":_BOOL, "duration":_INT, "file":_STR, "filterFadeinFrames":_INT, "filterFadeoutFrames":_INT,
+        "filterSliderValues":_LIST, "filteredClips":_LIST, "framesTakenAfter":_INT, "framesTakenBefore":_INT, "in":_INT,
+        "isSelected":_BOOL, "mediaHandlePost":_FLAG, "name":_STR, "out":_INT, "pluginIndex":_INT, "pluginName":_STR,
+        "pluginType":_INT, "replacedClips":_LIST, "shelfX":_INT, "shelfY":_INT, "solidColorClipColor":_LIST, "startFrame":_INT,
+        "thumb":_INT, "timeScale":_INT, "track":_INT, "transitionDirection":_INT, "transitionSpeed":_NUMBER, "type":_INT,
+        "uniqueID":_INT, "version":_STR, "volume":_NUMBER,
+    }
+    _AUDIO_TYPES : Dict[str, Types] = {
+        "class":_STR, "duration":_INT, "file":_STR, "imae4cc":_INT, "imaeFilteredList":_LIST, "imaeVersion":_INT, "in":_INT,
+        "isSelected":_BOOL, "name":_STR, "out":_INT, "pushPins":_LIST, "startFrame":_INT, "timeScale":_INT, "track":_INT,
+        "trimmedEndFrame":_INT, "trimmedStartFrame":_INT, "uniqueID":_INT, "version":_STR,
+    }
+    _PIN_TYPES : Dict[str, Types] = {
+        "audioFrame":_INT, "clipUID":_INT, "originalClipFrame":_INT, "originalClipUID":_INT, "videoFrame":_INT,
+    }
+    _PROJECT_TYPES : Dict[str, Types] = {
+        "lastClipUniqueID":_INT, "playheadPosition":_INT, "relativePlayHeadPosition":_NUMBER, "selectionEndFrame":_INT,
+        "selectionStartFrame":_INT, "selectionType":_INT, "timelineZoom":_NUMBER, "version":_STR, "videoStandard":_STR,
+        "writingApplicationName":_STR, "writingApplicationVersion":_STR,
+    }
+    # clip list elements of the project, with the family of clips each holds
+    SECTIONS : Dict[str, str] = {"audioClips":"audio", "audioTrashClips":"audio", "videoClips":"top", "videoTrashClips":"top"}
+
+    _video    = frozenset({"duration", "name", "in", "out", "uniqueID"})
+    _filtered = frozenset({"file", "framesTakenAfter", "framesTakenBefore"})
+    CLASSES : Dict[str, ClipSchema] = {
+        "VideoClip"           : ClipSchema("VideoClip",           _video,                                         _VIDEO_TYPES),
+        "NestedVideoClip"     : ClipSchema("NestedVideoClip",     _video,                                         _VIDEO_TYPES),
+        "NestedVideoFileClip" : ClipSchema("NestedVideoFileClip", _video | {"file"},                              _VIDEO_TYPES),
+        "NestedFilteredClip"  : ClipSchema("NestedFilteredClip",  _video | _filtered,                             _VIDEO_TYPES),
+        "NestedTransition"    : ClipSchema("NestedTransition",    _video | _filtered | {"replacedClips"},         _VIDEO_TYPES, nested={"replacedClips":"nested"}),
+        "NestedVFXClip"       : ClipSchema("NestedVFXClip",       _video | _filtered | {"startFrame"},            _VIDEO_TYPES, nested={"filteredClips":"nested"}),
+        "TopVideoClip"        : ClipSchema("TopVideoClip",        _video | {"track"},                             _VIDEO_TYPES),
+        "TopVideoFileClip"    : ClipSchema("TopVideoFileClip",    _video | {"track", "file"},                     _VIDEO_TYPES),
+        "TopFilteredClip"     : ClipSchema("TopFilteredClip",     _video | _filtered | {"track"},                 _VIDEO_TYPES),
+        "TopTransition"       : ClipSchema("TopTransition",       _video | _filtered | {"track", "replacedClips"}, _VIDEO_TYPES, nested={"replacedClips":"nested"}),
+        "TopVFXClip"          : ClipSchema("TopVFXClip",          _video | _filtered | {"track", "startFrame"},   _VIDEO_TYPES, nested={"filteredClips":"nested"}),
+        "AudioClip"           : ClipSchema("AudioClip", {"duration", "file", "name", "in", "out", "startFrame", "track", "trimmedEndFrame",
+                                                         "trimmedStartFrame"}, _AUDIO_TYPES, constants={"class":"audio"},
+                                           nested={"imaeFilteredList":"audio", "pushPins":"pin"}),
+        "AudioPushPin"        : ClipSchema("AudioPushPin", {"audioFrame", "originalClipFrame", "videoFrame"}, _PIN_TYPES),
+    }
+
+    # per family, the schemas of transitions, VFX clips, file clips and anything else; nested clips are always file clips
+    _FAMILIES : Dict[str, Tuple[ClipSchema, ...]] = {
+        "top"    : (CLASSES["TopTransition"], CLASSES["TopVFXClip"], CLASSES["TopVideoFileClip"], CLASSES["TopVideoClip"]),
+        "nested" : (CLASSES["NestedTransition"], CLASSES["NestedVFXClip"], CLASSES["NestedVideoFileClip"], CLASSES["NestedVideoFileClip"]),
+        "audio"  : (CLASSES["AudioClip"],) * 4,
+        "pin"    : (CLASSES["AudioPushPin"],) * 4,
+    }
+
+    @staticmethod
+    def For(name:str) -> ClipSchema:
+        return Schema.CLASSES[name]
+
+    @staticmethod
+    def ClassFor(clip_dict:Map, family:str) -> ClipSchema:
+        """The schema of the class a clip dict of the given family (top, nested, audio or pin) gets built as.
+
+        Video clips are picked the same way as in TopVideoClipFactory and NestedVideoClipFactory.
+        """
+        transition, vfx, file_clip, plain = Schema._FAMILIES[family]
+        if transition is plain:
+            return plain
+        if clip_dict.get('class') == "transition":
+            return transition
+        elif clip_dict.get('clipEatenByFilter') is True:
+            return vfx
+        elif 'file' in clip_dict:
+            return file_clip
+        else:
+            return plain
+
+    @staticmethod
+    def ValidateProject(xmldict:Map, sections:Optional[Iterable[str]]=None) -> List[Violation]:
+        """Check a decoded project against the schema in one traversal, returning every violation in document order.
+
+        If sections is given, only those clip lists are checked; naming one that isn't a clip list raises ValueError.
+        """
+        checked = list(Schema.SECTIONS if sections is None else sections)
+        unknown = set(checked).difference(Schema.SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown schema sections {sorted(unknown)}, expected some of {list(Schema.SECTIONS)}!")
+        ret_val : List[Violation] = []
+        for key, types in Schema._PROJECT_TYPES.items():
+            if key in xmldict and type(xmldict[key]) not in types:
+                ret_val.append(Violation(key, f"expected {' or '.join(t.__name__ for t in types)}, got {type(xmldict[key]).__name__}"))
+        # each stack entry is (parent entry, element, index, clip dict, family), so paths only get spelled out for violations
+        stack   : List[tuple] = []
+        for key in reversed(checked):
+            clips = xmldict.get(key, [])
+            if type(clips) is not list:
+                ret_val.append(Violation(key, f"expected list, got {type(clips).__name__}"))
+                continue
+            stack.extend((None, key, i, clips[i], Schema.SECTIONS[key]) for i in reversed(range(len(clips))))
+        # explicit stack rather than recursion, since filtered clips can nest deeper than the recursion limit
+        while stack:
+            entry = stack.pop()
+            clip_dict, family = entry[3], entry[4]
+            if type(clip_dict) is not dict:
+                ret_val.append(Violation(Schema._path(entry), f"expected dict, got {type(clip_dict).__name__}"))
+                continue
+            schema = Schema.ClassFor(clip_dict, family)
+            if not schema.IsValid(clip_dict):
+                ret_val.extend(schema.Check(clip_dict, Schema._path(entry)))
+            for key, child_family in schema._children:
+                children = clip_dict.get(key)
+                if type(children) is list:
+                    stack.extend((entry, key, i, children[i], child_family) for i in reversed(range(len(children))))
+        return ret_val
+
+    @staticmethod
+    def _path(entry:tuple) -> str:
+        parts = []
+        while entry is not None:
+            parts.append(f"{entry[1]}[{entry[2]}]")
+            entry = entry[0]
+        return ".".join(reversed(parts))
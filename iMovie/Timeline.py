@@ -0,0 +1,160 @@
+# builtin imports
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+# 3rd-party imports
+import numpy as np
+# local imports
+from iMovie.AudioClip import AudioClip
+from iMovie.FrameRate import FrameRate
+from iMovie.IntervalIndex import IntervalIndex
+from iMovie.TopVideoClip import TopTransition, TopVFXClip, TopVideoClip
+
+Clip = Union[TopVideoClip, AudioClip]
+
+class Timeline:
+    """
+    Columnar view of the clips in an iMovieProj edit, as a NumPy structured array with one row per top-level clip.
+
+    Rows hold the video clips first, in project order, followed by the audio clips.
+    Audio clips are placed at their startFrame, while video clips are laid back to back along their track,
+    since the video dicts don't carry an edit position of their own.
+    """
+    KIND_FILE       = 0
+    KIND_VFX        = 1
+    KIND_TRANSITION = 2
+    KIND_AUDIO      = 3
+    KIND_NAMES      = ("file", "VFX", "transition", "audio")
+    NO_FILE         = -1
+    NO_TIMESCALE    = -1
+    DTYPE = np.dtype([("uniqueID", np.int64), ("track", np.int32), ("in", np.int64), ("out", np.int64), ("startFrame", np.int64),
+                      ("duration", np.int64), ("timeScale", np.int32), ("file", np.int32), ("kind", np.uint8)])
+
+    def __init__(self, video_clips:Sequence[TopVideoClip], audio_clips:Sequence[AudioClip]):
+        self._clips : List[Clip] = list(video_clips) + list(audio_clips)
+        self._files : List[str]  = []
+        file_index  : Dict[str, int] = {}
+
+        rows = []
+        for span in IntervalIndex.EditSpans(video_clips, audio_clips):
+            clip = span.clip
+            if span.audio:
+                kind = Timeline.KIND_AUDIO
+            elif isinstance(clip, TopTransition):
+                kind = Timeline.KIND_TRANSITION
+            elif isinstance(clip, TopVFXClip):
+                kind = Timeline.KIND_VFX
+            else:
+                kind = Timeline.KIND_FILE
+            rows.append(self._row(clip, span.track, span.start, kind, getattr(clip, "FileName", None), file_index))
+        self._table : np.ndarray = np.array(rows, dtype=Timeline.DTYPE)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __repr__(self) -> str:
+        return f"<Timeline object: {len(self)} clips; {len(self.Files)} files; edit length {self.EditLength()}>"
+
+    def _row(self, clip:Clip, track:int, start:int, kind:int, file:Optional[str], file_index:Dict[str, int]) -> Tuple:
+        if file is None:
+            file_id = Timeline.NO_FILE
+        else:
+            file_id = file_index.get(file)
+            if file_id is None:
+                file_id = file_index[file] = len(self._files)
+                self._files.append(file)
+        time_scale = clip.TimeScale if clip.TimeScale is not None else Timeline.NO_TIMESCALE
+        unique_id  = clip.UniqueID if clip.UniqueID is not None else -1
+        return (unique_id, track, clip.InFrame, clip.OutFrame, start, clip.Duration, time_scale, file_id, kind)
+
+    #region Column access
+    @property
+    def Table(self) -> np.ndarray:
+        """The full structured array; treat it as read-only, since it's cached on the project."""
+        return self._table
+    @property
+    def Files(self) -> List[str]:
+        """Interned file names, indexed by the "file" column."""
+        return self._files
+    @property
+    def Starts(self) -> np.ndarray:
+        return self._table["startFrame"]
+    @property
+    def Ends(self) -> np.ndarray:
+        """Edit frame at which each clip ends."""
+        return self._table["startFrame"] + (self._table["out"] - self._table["in"])
+    @property
+    def Lengths(self) -> np.ndarray:
+        """Number of edit frames each clip takes up."""
+        return self._table["out"] - self._table["in"]
+
+    def Seconds(self, column:str="startFrame") -> np.ndarray:
+        """A frame column in seconds, each clip at its own timeScale; NaN for clips without one."""
+        return FrameRate.SecondsOf(self._table[column], self._table["timeScale"])
+
+    def Clip(self, row:int) -> Clip:
+        """Get the clip object behind a row of the table."""
+        return self._clips[row]
+    def Mask(self, kind:Optional[int]=None, track:Optional[int]=None, audio:Optional[bool]=None) -> np.ndarray:
+        """Rows matching every filter given; audio and video track numbers are counted separately, so pass audio along with track."""
+        ret_val = np.ones(len(self._table), dtype=bool)
+        if kind is not None:
+            ret_val &= self._table["kind"] == kind
+        if track is not None:
+            ret_val &= self._table["track"] == track
+        if audio is not None:
+            ret_val &= (self._table["kind"] == Timeline.KIND_AUDIO) == audio
+        return ret_val
+    @property
+    def VideoMask(self) -> np.ndarray:
+        return self._table["kind"] != Timeline.KIND_AUDIO
+    @property
+    def AudioMask(self) -> np.ndarray:
+        return self._table["kind"] == Timeline.KIND_AUDIO
+    #endregion
+
+    #region Aggregate queries
+    def EditLength(self) -> int:
+        """Number of frames from the start of the edit to the end of the last clip."""
+        return int(self.Ends.max()) if len(self._table) > 0 else 0
+
+    def Tracks(self) -> np.ndarray:
+        return np.unique(self._table["track"])
+
+    def ClipsPerFile(self) -> Dict[str, int]:
+        files  = self._table["file"]
+        counts = np.bincount(files[files != Timeline.NO_FILE], minlength=len(self._files))
+        return dict(zip(self._files, counts.tolist()))
+
+    def FramesPerFile(self) -> Dict[str, int]:
+        files  = self._table["file"]
+        used   = files != Timeline.NO_FILE
+        frames = np.bincount(files[used], weights=self.Lengths[used], minlength=len(self._files))
+        return dict(zip(self._files, frames.astype(np.int64).tolist()))
+
+    def ClipsPerKind(self) -> Dict[str, int]:
+        counts = np.bincount(self._table["kind"], minlength=len(Timeline.KIND_NAMES))
+        return dict(zip(Timeline.KIND_NAMES, counts.tolist()))
+
+    def Gaps(self, track:int, audio:bool=False) -> np.ndarray:
+        """Get the (start, end) edit frames of every stretch of the track with no clip on it, as an N x 2 array."""
+        _, starts, ends = self._sortedSpans(track, audio)
+        if len(starts) == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        covered = np.maximum.accumulate(ends)
+        is_gap  = starts[1:] > covered[:-1]
+        return np.stack([covered[:-1][is_gap], starts[1:][is_gap]], axis=1)
+
+    def Overlaps(self, track:int, audio:bool=False) -> np.ndarray:
+        """Get the rows of every clip on the track that starts before the clips ahead of it have ended."""
+        rows, starts, ends = self._sortedSpans(track, audio)
+        if len(starts) == 0:
+            return np.empty(0, dtype=np.int64)
+        covered = np.maximum.accumulate(ends)
+        return rows[1:][starts[1:] < covered[:-1]]
+
+    def _sortedSpans(self, track:int, audio:bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the rows, starts and ends of the clips on an audio or video track, sorted by start."""
+        rows  = np.flatnonzero(self.Mask(track=track, audio=audio))
+        order = np.argsort(self.Starts[rows], kind="stable")
+        rows  = rows[order]
+        return rows, self.Starts[rows], self.Ends[rows]
+    #endregion
@@ -1,14 +1,18 @@
-from typing import Any, Dict, List, Optional, Set, Union
-from VideoClip import VideoClip
-from NestedVideoClip import NestedVideoClipFactory
+from typing import Any, Dict, List, Optional, Sequence, Union
+from iMovie.ClipList import LazyClipList
+from iMovie.Schema import Schema
+from iMovie.VideoClip import VideoClip
+from iMovie.NestedVideoClip import NestedVideoClipFactory
 
 Map = Dict[str, Any]
 
 class TopVideoClip(VideoClip):
     """Class for clips that come from a video file."""
-    def __init__(self, clip_dict:Map, sub_required:Set[str]):
-        required = sub_required.union({"track"})
-        super().__init__(clip_dict, sub_required=required)
+    __slots__ = ()
+    _SCHEMA   = Schema.For("TopVideoClip")
+
+    def __init__(self, clip_dict:Map, trusted:bool=False):
+        super().__init__(clip_dict, trusted=trusted)
         self._track  = clip_dict['track']
 
     def __repr__(self):
@@ -20,9 +24,11 @@ class TopVideoClip(VideoClip):
 
 class TopVideoFileClip(TopVideoClip):
     """Class for clips that come from a video file."""
-    def __init__(self, clip_dict:Map, sub_required:Set[str]):
-        required = sub_required.union({"file"})
-        super().__init__(clip_dict, sub_required=required)
+    __slots__ = ("_fileName",)
+    _SCHEMA   = Schema.For("TopVideoFileClip")
+
+    def __init__(self, clip_dict:Map, trusted:bool=False):
+        super().__init__(clip_dict, trusted=trusted)
         self._fileName  = clip_dict['file']
 
     def __repr__(self):
@@ -38,9 +44,12 @@ class TopVideoFileClip(TopVideoClip):
 
 class TopFilteredClip(TopVideoFileClip):
     """Class for all the things not in VideoClip, but common to VFX and Transitions."""
-    def __init__(self, clip_dict:Map, sub_required:Set[str]):
-        required = sub_required.union({"framesTakenAfter","framesTakenBefore"})
-        super().__init__(clip_dict, sub_required=required)
+    __slots__ = ("_framesBefore", "_framesAfter", "_pluginIndex", "_pluginName", "_pluginType")
+    _OPTIONAL = {**TopVideoFileClip._OPTIONAL, "pluginIndex":"_pluginIndex", "pluginName":"_pluginName", "pluginType":"_pluginType"}
+    _SCHEMA   = Schema.For("TopFilteredClip")
+
+    def __init__(self, clip_dict:Map, trusted:bool=False):
+        super().__init__(clip_dict, trusted=trusted)
         self._framesBefore = clip_dict['framesTakenBefore']
         self._framesAfter  = clip_dict['framesTakenAfter']
 
@@ -60,89 +69,101 @@ class TopFilteredClip(TopVideoFileClip):
         return self._framesBefore
     @property
     def PluginIndex(self) -> Optional[int]:
-        return self._other_elements.get('pluginIndex')
+        return self._pluginIndex
     @property
     def PluginName(self) -> Optional[str]:
-        return self._other_elements.get('pluginName')
+        return self._pluginName
     @property
     def PluginType(self) -> Optional[int]:
-        return self._other_elements.get('pluginType')
+        return self._pluginType
     #endregion
 
 class TopTransition(TopFilteredClip):
     """Subclass of VideoClip to handle info about Transitions"""
-    def __init__(self, clip_dict:Map):
-        required = {"replacedClips"}
-        super().__init__(clip_dict, sub_required=required)
-        self._replaced_clips = [NestedVideoClipFactory.FromDict(clip) for clip in clip_dict.get('replacedClips', [])]
+    __slots__ = ("_replaced_clips", "_transitionDirection", "_transitionSpeed")
+    _OPTIONAL = {**TopFilteredClip._OPTIONAL, "transitionDirection":"_transitionDirection", "transitionSpeed":"_transitionSpeed"}
+    _NESTED   = frozenset({"replacedClips"})
+    _SCHEMA   = Schema.For("TopTransition")
+
+    def __init__(self, clip_dict:Map, trusted:bool=False):
+        super().__init__(clip_dict, trusted=trusted)
+        self._replaced_clips = LazyClipList(clip_dict.get('replacedClips', []), NestedVideoClipFactory.Builder(trusted), parent=self)
 
     def __repr__(self):
         return f"<Transition object: subclass of {super(TopTransition, self).__repr__()}; {len(self.ReplacedClips)} replaced clip(s); Base file(s) of {self.BaseFileName}>"
 
     @property
     def BaseFileName(self) -> Union[str, List[str]]:
-        ret_val = []
-        base_list = [clip.BaseFileName for clip in self.ReplacedClips]
-        for item in base_list:
-            if isinstance(item, str):
-                ret_val.append(item)
-            elif isinstance(item, list):
-                ret_val += item
-        return ret_val
+        return list(self.Lineage.base_files)
 
     @property
-    def ReplacedClips(self) -> List[VideoClip]:
+    def ReplacedClips(self) -> Sequence[VideoClip]:
         return self._replaced_clips
     @property
     def TransitionDirection(self) -> Optional[int]:
-        return self._other_elements.get('transitionDirection')
+        return self._transitionDirection
     @property
     def TransitionSpeed(self) -> Optional[int]:
-        return self._other_elements.get('transitionSpeed')
+        return self._transitionSpeed
 
 class TopVFXClip(TopFilteredClip):
     """Subclass of VideoClip for tracking clips that had filters applied"""
-    def __init__(self, clip_dict:Map):
-        super().__init__(clip_dict, sub_required={"startFrame"})
+    __slots__ = ("_startFrame", "_filtered_clips", "_clipEatenByFilter", "_filterFadeInFrames", "_filterFadeOutFrames",
+                 "_filterSliderValues", "_solidColorClipColor")
+    _OPTIONAL = {**TopFilteredClip._OPTIONAL, "clipEatenByFilter":"_clipEatenByFilter", "filterFadeinFrames":"_filterFadeInFrames",
+                 "filterFadeoutFrames":"_filterFadeOutFrames", "filterSliderValues":"_filterSliderValues",
+                 "solidColorClipColor":"_solidColorClipColor"}
+    _NESTED   = frozenset({"filteredClips"})
+    _SCHEMA   = Schema.For("TopVFXClip")
+
+    def __init__(self, clip_dict:Map, trusted:bool=False):
+        super().__init__(clip_dict, trusted=trusted)
         self._startFrame   = clip_dict['startFrame']
 
-        self._filtered_clips = [NestedVideoClipFactory.FromDict(clip) for clip in clip_dict.get('filteredClips', [])]
+        self._filtered_clips = LazyClipList(clip_dict.get('filteredClips', []), NestedVideoClipFactory.Builder(trusted), parent=self)
 
     def __repr__(self) -> str:
         return f"<VFXClip object: Subclass of {super(TopVFXClip, self).__repr__()}; {len(self.FilteredClips)} filtered clip(s); Base file {self.BaseFileName}>"
 
     @property
     def FilterDepth(self) -> int:
-        return 0 if self.FilteredClips == [] else (self.FilteredClips[0].FilterDepth + 1)
+        return self.Lineage.depth
 
     @property
     def ClipEatenByFilter(self) -> Optional[bool]:
-        return self._other_elements.get('clipEatenByFilter')
+        return self._clipEatenByFilter
     @property
     def FilterFadeInFrames(self) -> Optional[int]:
-        return self._other_elements.get('filterFadeinFrames')
+        return self._filterFadeInFrames
     @property
     def FilterFadeOutFrames(self) -> Optional[int]:
-        return self._other_elements.get('filterFadeoutFrames')
+        return self._filterFadeOutFrames
     @property
     def FilterSliderValues(self) -> Optional[List[float]]:
-        return self._other_elements.get('filterSliderValues')
+        return self._filterSliderValues
     @property
-    def FilteredClips(self) -> List[VideoClip]:
+    def FilteredClips(self) -> Sequence[VideoClip]:
         return self._filtered_clips
     @property
     def StartFrame(self) -> int:
         return self._startFrame
     @property
     def SolidColorClipColor(self) -> Optional[List[int]]:
-        return self._other_elements.get('solidColorClipColor')
+        return self._solidColorClipColor
 
 class TopVideoClipFactory:
     @staticmethod
-    def FromDict(clip_dict) -> TopVideoClip:
+    def FromDict(clip_dict, trusted:bool=False) -> TopVideoClip:
         if clip_dict.get('class') == "transition":
-            return TopTransition(clip_dict=clip_dict)
+            return TopTransition(clip_dict=clip_dict, trusted=trusted)
         elif clip_dict.get('clipEatenByFilter') is True:
-            return TopVFXClip(clip_dict=clip_dict)
+            return TopVFXClip(clip_dict=clip_dict, trusted=trusted)
+        elif 'file' in clip_dict:
+            return TopVideoFileClip(clip_dict=clip_dict, trusted=trusted)
         else:
-            return TopVideoClip(clip_dict=clip_dict, sub_required=set())
\ No newline at end of file
+            return TopVideoClip(clip_dict=clip_dict, trusted=trusted)
+
+    @staticmethod
+    def FromTrustedDict(clip_dict) -> TopVideoClip:
+        """Build a clip without checking its dict, which must already have passed Schema.ValidateProject."""
+        return TopVideoClipFactory.FromDict(clip_dict, trusted=True)
@@ -0,0 +1,58 @@
+# builtin imports
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+class UniqueIDIndex:
+    """
+    Index from uniqueID to clip, over the top-level, trashed and nested clips of a project.
+
+    Built in a single breadth-first traversal, so when IDs collide the top-level clip wins over nested ones.
+    Push-pin clipUID/originalClipUID references that don't match any clip are collected in Dangling.
+    """
+    # push-pins use -1 to mean "no clip"
+    NO_CLIP = -1
+
+    def __init__(self, clip_lists:Iterable[Iterable[Any]]):
+        self._clips      : Dict[int, Any] = {}
+        self._duplicates : Dict[int, List[Any]] = {}
+        self._dangling   : List[Tuple[Any, str, int]] = []
+        pins  : List[Any] = []
+        queue : Deque[Any] = deque(clip for clips in clip_lists for clip in clips)
+        while queue:
+            clip = queue.popleft()
+            unique_id = clip.UniqueID
+            if unique_id is not None:
+                found = self._clips.setdefault(unique_id, clip)
+                if found is not clip:
+                    self._duplicates.setdefault(unique_id, [found]).append(clip)
+            queue.extend(getattr(clip, "FilteredClips", []))
+            queue.extend(getattr(clip, "ReplacedClips", []))
+            queue.extend(getattr(clip, "imagefilteredlist", []))
+            pins.extend(getattr(clip, "PushPins", []))
+        for pin in pins:
+            for field, unique_id in (("clipUID", pin.ClipUID), ("originalClipUID", pin.OriginalClipUID)):
+                if unique_id is not None and unique_id != UniqueIDIndex.NO_CLIP and unique_id not in self._clips:
+                    self._dangling.append((pin, field, unique_id))
+
+    def __repr__(self) -> str:
+        return f"<UniqueIDIndex object: {len(self)} IDs; {len(self.Duplicates)} duplicated; {len(self.Dangling)} dangling push-pin references>"
+
+    def __len__(self) -> int:
+        return len(self._clips)
+
+    def __contains__(self, unique_id:int) -> bool:
+        return unique_id in self._clips
+
+    def Get(self, unique_id:Optional[int]) -> Optional[Any]:
+        if unique_id is None or unique_id == UniqueIDIndex.NO_CLIP:
+            return None
+        return self._clips.get(unique_id)
+
+    @property
+    def Duplicates(self) -> Dict[int, List[Any]]:
+        """Every uniqueID used by more than one clip, with all the clips using it."""
+        return self._duplicates
+    @property
+    def Dangling(self) -> List[Tuple[Any, str, int]]:
+        """Push-pin references to clips that don't exist, as (pin, field name, uniqueID)."""
+        return self._dangling
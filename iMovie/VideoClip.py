@@ -1,21 +1,36 @@
 # builtin imports
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, FrozenSet, List, Optional
+# local imports
+from iMovie.ClipFields import ClipFields
+from iMovie.Lineage import ClipLineage, LineageEngine
+from iMovie.Schema import ClipSchema, Schema
+
 class VideoClip:
     """Tracking of video clip properties"""
-    def __init__(self, clip_dict:Dict[str, Any], sub_required:Set[str]):
-        required = sub_required.union({"duration","name","in","out","uniqueID"})
-        available = set(clip_dict.keys())
-        if not available.issuperset(required):
-            vals_found = {key:clip_dict[key] for key in available.intersection(required)}
-            msg = f"VideoClip is missing required elements {required.difference(available)}!\n   Found required elements {vals_found}"
-            raise ValueError(msg)
+    __slots__ = ("_duration", "_name", "_inFrame", "_outFrame", "_unique_id",
+                 "_class", "_isSelected", "_mediaHandlePost", "_shelfX", "_shelfY", "_thumb",
+                 "_timeScale", "_track", "_type", "_version", "_volume", "_other_elements", "_lineage", "_parent")
+    _OPTIONAL : Dict[str, str] = {"class":"_class", "isSelected":"_isSelected", "mediaHandlePost":"_mediaHandlePost",
+                                  "shelfX":"_shelfX", "shelfY":"_shelfY", "thumb":"_thumb", "timeScale":"_timeScale",
+                                  "track":"_track", "type":"_type", "version":"_version", "volume":"_volume"}
+    _NESTED   : FrozenSet[str] = frozenset()
+    _SCHEMA   : ClipSchema = Schema.For("VideoClip")
+
+    def __init__(self, clip_dict:Dict[str, Any], trusted:bool=False):
+        # each class's required elements are compiled once into its _SCHEMA; trusted dicts were already checked with Schema.ValidateProject
+        schema = type(self)._SCHEMA
+        if not trusted:
+            schema.Require(clip_dict)
         self._duration  = clip_dict['duration']
         self._name      = clip_dict['name']
         self._inFrame   = clip_dict['in']
         self._outFrame  = clip_dict['out']
         self._unique_id = clip_dict['uniqueID']
 
-        self._other_elements = {clip:clip_dict[clip] for clip in clip_dict.keys() if clip not in required}
+        self._other_elements = ClipFields.FillOptional(self, clip_dict, schema.required)
+        self._lineage        : Optional[ClipLineage] = None
+        # the clip this one is nested in, set by the nested clip list holding it; None for top-level clips
+        self._parent         : Optional["VideoClip"] = None
 
     def __repr__(self):
         return f"<VideoClip object: name {self.Name}; start {self.InFrame}; end {self.OutFrame}>"
@@ -30,6 +45,23 @@ class VideoClip:
     def FilterDepth(self) -> int:
         return 0
     @property
+    def Lineage(self) -> ClipLineage:
+        """Flattened base/source files, filter depth and ancestors of the clip, worked out once for the clip's whole tree."""
+        if self._lineage is None:
+            # walk from the top-level clip, so a nested clip read first still gets its real parent, root and ancestors
+            root = self
+            while root._parent is not None:
+                root = root._parent
+            LineageEngine.Walk(root)
+            if self._lineage is None:
+                # taken out of its parent's list since, so it's a root of its own now
+                LineageEngine.Walk(self)
+        return self._lineage
+    @property
+    def SourceFiles(self) -> List[str]:
+        """The original media files the clip is ultimately built from, following any filtered or replaced clips."""
+        return list(self.Lineage.source_files)
+    @property
     def InEdit(self):
         """Method to check if the current clip is part of the edit."""
         if self.Track is None or self.Track == 0:
@@ -42,6 +74,9 @@ class VideoClip:
 
     #region Props for direct access to dict items
     @property
+    def Class(self) -> Optional[str]:
+        return self._class
+    @property
     def Duration(self) -> int:
         return self._duration
     @property
@@ -52,38 +87,42 @@ class VideoClip:
         return self._outFrame
     @property
     def IsSelected(self) -> Optional[bool]:
-        return self._other_elements.get('isSelected')
+        return self._isSelected
     @property
     def MediaHandlePost(self) -> Optional[bool]:
-        return self._other_elements.get('mediaHandlePost')
+        return self._mediaHandlePost
     @property
     def Name(self) -> str:
         return self._name
     @property
     def ShelfX(self) -> Optional[int]:
-        return self._other_elements.get('shelfX')
+        return self._shelfX
     @property
     def ShelfY(self) -> Optional[int]:
-        return self._other_elements.get('shelfY')
+        return self._shelfY
     @property
     def Thumb(self) -> Optional[int]:
-        return self._other_elements.get('thumb')
+        return self._thumb
     @property
     def TimeScale(self) -> Optional[int]:
-        return self._other_elements.get('timeScale')
+        return self._timeScale
     @property
     def Track(self) -> Optional[int]:
-        return self._other_elements.get('track')
+        return self._track
     @property
     def Type(self) -> Optional[int]:
-        return self._other_elements.get('type')
+        return self._type
     @property
     def UniqueID(self) -> Optional[bool]:
         return self._unique_id
     @property
     def Version(self) -> Optional[str]:
-        return self._other_elements.get('version')
+        return self._version
     @property
     def Volume(self) -> float:
-        return self._other_elements.get('volume', 1.0)
+        return 1.0 if self._volume is None else self._volume
+    @property
+    def OtherElements(self) -> Dict[str, Any]:
+        """Any dict elements the clip classes don't know about."""
+        return self._other_elements or {}
     #endregion
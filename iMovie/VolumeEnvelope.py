@@ -0,0 +1,121 @@
+# builtin imports
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+# external imports
+import numpy as np
+
+def LevelFromElement(name:str) -> Callable[[Any], float]:
+    """Level source reading each push-pin's level from the named dict element, raising KeyError for a pin without it.
+
+    None of the push-pin elements in doc/iMovieHD-format-schema.md is known to hold the level set at a pin, so there's
+    no default; this is for project files found to keep it in some element the pin classes don't know about, which
+    ends up in OtherElements.
+    """
+    def _level(pin:Any) -> float:
+        elements = pin.OtherElements
+        if name not in elements:
+            raise KeyError(f"Push-pin at audioFrame {pin.AudioFrame} has no {name} element to take its level from!")
+        return float(elements[name])
+    return _level
+
+class VolumeEnvelopes:
+    """
+    Piecewise-linear volume curves of a set of audio clips, one per clip, with a point at each push-pin.
+
+    The pins of all clips are packed into flat arrays, with clip i owning the points between offsets[i] and offsets[i+1],
+    so curves of every clip are evaluated with a single np.interp call. Pin positions are counted from the start of
+    the clip in the edit (audioFrame), and a curve holds its first and last levels before and after its pins.
+    Clips without pins play at unity gain throughout. The level of each pin comes from the level function given,
+    since the schema doesn't say where iMovie HD keeps it.
+    """
+    def __init__(self, clips:Sequence[Any], level:Callable[[Any], float]):
+        self._clips   : List[Any] = list(clips)
+        counts        = np.fromiter((max(len(clip.PushPins), 1) for clip in self._clips), dtype=np.int64, count=len(self._clips))
+        self._offsets : np.ndarray = np.zeros(len(self._clips) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._offsets[1:])
+        self._frames  : np.ndarray = np.empty(self._offsets[-1], dtype=np.float64)
+        self._levels  : np.ndarray = np.empty(self._offsets[-1], dtype=np.float64)
+        for i, clip in enumerate(self._clips):
+            # np.interp needs its points in order, and iMovie doesn't promise to store pins that way
+            points = sorted((pin.AudioFrame, level(pin)) for pin in clip.PushPins) or [(0, 1.0)]
+            start  = self._offsets[i]
+            self._frames[start:start + len(points)] = [frame for frame, _ in points]
+            self._levels[start:start + len(points)] = [value for _, value in points]
+        self._starts  : np.ndarray = np.fromiter((clip.StartFrame for clip in self._clips), dtype=np.int64, count=len(self._clips))
+        self._lengths : np.ndarray = np.fromiter((clip.OutFrame - clip.InFrame for clip in self._clips), dtype=np.int64, count=len(self._clips))
+        # shift each clip's points into a stretch of its own, so one monotonic x array covers every clip
+        span          = self._frames.max(initial=0) - self._frames.min(initial=0) + 1
+        self._stride  : float = float(max(span, 1))
+        self._global  : np.ndarray = self._frames + np.repeat(np.arange(len(self._clips)), counts) * self._stride
+
+    def __repr__(self) -> str:
+        return f"<VolumeEnvelopes object: {len(self._clips)} clips; {len(self._frames)} points>"
+
+    def __len__(self) -> int:
+        return len(self._clips)
+
+    @staticmethod
+    def FromProject(proj:Any, level:Callable[[Any], float], trash:bool=False) -> "VolumeEnvelopes":
+        """Envelopes of the audio clips of an iMovieProj, in project order, followed by those in the trash if asked."""
+        return VolumeEnvelopes(list(proj.AudioClips) + (list(proj.AudioTrashClips) if trash else []), level)
+
+    @property
+    def Clips(self) -> List[Any]:
+        return self._clips
+
+    def Points(self, index:int) -> Tuple[np.ndarray, np.ndarray]:
+        """The (frames, levels) points of one clip's curve, frames counted from the start of the clip."""
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._frames[start:end], self._levels[start:end]
+
+    def Gain(self, indices:Any, frames:Any) -> np.ndarray:
+        """Gain of clip indices[k] at clip frame frames[k], for every k, with the two broadcast against each other."""
+        indices, frames = np.broadcast_arrays(np.asarray(indices, dtype=np.int64), np.asarray(frames, dtype=np.float64))
+        # clamping to each clip's own first and last points stops np.interp from running on into the next clip
+        low  = self._frames[self._offsets[:-1][indices]]
+        high = self._frames[self._offsets[1:][indices] - 1]
+        return np.interp(np.clip(frames, low, high) + indices * self._stride, self._global, self._levels)
+
+    def Evaluate(self, frames:Any, indices:Optional[Sequence[int]]=None) -> np.ndarray:
+        """Gain of each clip at each of the given edit frames, as a (clips, frames) array.
+
+        Clips are silent, at gain 0, at edit frames where they aren't playing. Gives every clip unless indices picks some.
+        """
+        indices = np.arange(len(self._clips)) if indices is None else np.asarray(indices, dtype=np.int64)
+        frames  = np.asarray(frames, dtype=np.float64)
+        local   = frames[np.newaxis, :] - self._starts[indices][:, np.newaxis]
+        gain    = self.Gain(indices[:, np.newaxis], local)
+        playing = (local >= 0) & (local < self._lengths[indices][:, np.newaxis])
+        return np.where(playing, gain, 0.0)
+
+    def Keyframes(self, index:int, tolerance:float=0.01) -> Tuple[np.ndarray, np.ndarray]:
+        """The fewest points of one clip's curve that stay within tolerance of the full curve, as (frames, levels).
+
+        Points are dropped Ramer-Douglas-Peucker style, measuring the error as the difference in level. The first and
+        last points are always kept.
+        """
+        frames, levels = self.Points(index)
+        if len(frames) <= 2:
+            return frames.copy(), levels.copy()
+        keep  = np.zeros(len(frames), dtype=bool)
+        keep[0] = keep[-1] = True
+        stack = [(0, len(frames) - 1)]
+        while stack:
+            first, last = stack.pop()
+            if last - first < 2:
+                continue
+            inner = slice(first + 1, last)
+            # pins can share a frame, and a jump there has to be kept, so a zero-width segment counts as all error
+            width = frames[last] - frames[first]
+            line  = levels[first] + (levels[last] - levels[first]) * ((frames[inner] - frames[first]) / width if width else 0.0)
+            error = np.abs(levels[inner] - line) if width else np.full(last - first - 1, np.inf)
+            worst = int(np.argmax(error))
+            if error[worst] > tolerance:
+                split = first + 1 + worst
+                keep[split] = True
+                stack.append((first, split))
+                stack.append((split, last))
+        return frames[keep], levels[keep]
+
+    def AllKeyframes(self, tolerance:float=0.01) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Keyframes of every clip, in clip order."""
+        return [self.Keyframes(i, tolerance) for i in range(len(self._clips))]
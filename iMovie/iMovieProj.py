@@ -1,48 +1,343 @@
+import hashlib
+import marshal
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 # local imports
 from iMovie.AudioClip import AudioClip
+from iMovie.ChangeSet import ChangeSet, SectionChanges
+from iMovie.ClipList import LazyClipList
+from iMovie.ImportStats import ImportStats
+from iMovie.IntervalIndex import IntervalIndex
+from iMovie.Lineage import LineageIndex
+from iMovie.RenderPlan import RenderPlan
+from iMovie.Schema import Schema, SchemaError
 from iMovie.TopVideoClip import TopVideoClip, TopVideoClipFactory
+from iMovie.UniqueIDIndex import UniqueIDIndex
+from interfaces.ProjectCache import ProjectCache
+from interfaces.XMLInterface import XMLDict
+
+class SectionNotLoadedError(RuntimeError):
+    """Raised on accessing a clip list that was skipped when the project was loaded, and can't be loaded now."""
 
 class iMovieProj:
     """Class to handle structure of an iMovieHD project
     """
+    # clip list elements, with the attribute holding each list and the function building its clips
+    _SECTIONS : Dict[str, Tuple[str, Callable[[Dict[str, Any]], Any]]] = {
+        "audioClips"      : ("_audioClips",      AudioClip),
+        "audioTrashClips" : ("_audioTrashClips", AudioClip),
+        "videoClips"      : ("_videoClips",      TopVideoClipFactory.FromDict),
+        "videoTrashClips" : ("_videoTrashClips", TopVideoClipFactory.FromDict),
+    }
+    # functions building clips from dicts that already passed Schema.ValidateProject, skipping the per-clip checks
+    _TRUSTED_BUILDS : Dict[str, Callable[[Dict[str, Any]], Any]] = {
+        "audioClips"      : AudioClip.FromTrustedDict,
+        "audioTrashClips" : AudioClip.FromTrustedDict,
+        "videoClips"      : TopVideoClipFactory.FromTrustedDict,
+        "videoTrashClips" : TopVideoClipFactory.FromTrustedDict,
+    }
 
-    def __init__(self, xmldict:Dict[str, Any]):
+    def __init__(self, xmldict:Dict[str, Any], track_changes:bool=False, sections:Optional[Iterable[str]]=None, validate:bool=False):
+        loaded = set(iMovieProj._SECTIONS) if sections is None else set(sections)
+        if not loaded.issubset(iMovieProj._SECTIONS):
+            raise ValueError(f"Unknown iMovieProj sections {sorted(loaded.difference(iMovieProj._SECTIONS))}, expected some of {list(iMovieProj._SECTIONS)}!")
         nested_keys = ["audioClips", "audioTrashClips", "videoClips", "videoTrashClips"]
         self._other_elements  : Dict[str, Any]  = {key:xmldict[key] for key in xmldict.keys() if key not in nested_keys}
-        self._audioClips      : List[AudioClip] = [AudioClip(aclip) for aclip in xmldict.get("audioClips", [])]
-        self._audioTrashClips : List[AudioClip] = [AudioClip(aclip) for aclip in xmldict.get("audioTrashClips", [])]
-        self._videoClips      : List[TopVideoClip] = [TopVideoClipFactory.FromDict(vclip) for vclip in xmldict.get("videoClips", [])]
-        self._videoTrashClips : List[TopVideoClip] = [TopVideoClipFactory.FromDict(vclip) for vclip in xmldict.get("videoClips", [])]
+        # sections that weren't asked for stay empty, and get loaded from _source if they're ever accessed
+        self._loaded          : Set[str] = loaded
+        self._source          : Optional[Tuple[Path, str, Tuple[int, int]]] = None
+        # validate checks the whole dict against the schema in one pass, reporting every violation at once;
+        # the clips can then be built trusted, without each constructor checking its dict again
+        self._trusted         : bool = validate
+        if validate:
+            violations = Schema.ValidateProject(xmldict, sections=[key for key in iMovieProj._SECTIONS if key in loaded])
+            if violations:
+                raise SchemaError(violations)
+        builds = iMovieProj._TRUSTED_BUILDS if validate else {key:build for key, (_, build) in iMovieProj._SECTIONS.items()}
+        # clip objects are only built as they're read, unless validate asks for everything to be built up front
+        self._audioClips      : LazyClipList = LazyClipList(iMovieProj._sectionDicts(xmldict, "audioClips", loaded), builds["audioClips"])
+        self._audioTrashClips : LazyClipList = LazyClipList(iMovieProj._sectionDicts(xmldict, "audioTrashClips", loaded), builds["audioTrashClips"])
+        self._videoClips      : LazyClipList = LazyClipList(iMovieProj._sectionDicts(xmldict, "videoClips", loaded), builds["videoClips"])
+        self._videoTrashClips : LazyClipList = LazyClipList(iMovieProj._sectionDicts(xmldict, "videoTrashClips", loaded), builds["videoTrashClips"])
+        # indexes over the clip lists, each stored along with the _clipsStamp it was built from
+        self._indexes : Dict[str, Tuple[Tuple, Any]] = {}
+        # (uniqueID, content hash) of each clip dict, in list order, so UpdateFrom can tell which clips changed.
+        # Hashing costs about a quarter of the construction time, so only projects that will be updated pay for it.
+        self._fingerprints : Optional[Dict[str, List[Tuple[Optional[int], bytes]]]] = None
+        if track_changes:
+            self._fingerprints = {key:[iMovieProj._fingerprint(clip_dict) for clip_dict in iMovieProj._sectionDicts(xmldict, key, loaded)]
+                                  for key in iMovieProj._SECTIONS}
+        self._bindPushPins()
+        if validate:
+            self.Validate()
+
+    @staticmethod
+    def _sectionDicts(xmldict:Dict[str, Any], key:str, loaded:Set[str]) -> List[Dict[str, Any]]:
+        return xmldict.get(key, []) if key in loaded else []
 
     def __repr__(self) -> str:
-        return f"iMovieProj object: {len(self.VideoClips)} video clips; {len(self.AudioClips)} audio clips; {self.VideoStandard} format"
+        return f"iMovieProj object: {len(self._videoClips)} video clips; {len(self._audioClips)} audio clips; {self.VideoStandard} format"
+
+    @staticmethod
+    def FromXMLFile(file:Path, backend:str="fast", use_cache:bool=True, cache:Optional[ProjectCache]=None, track_changes:bool=False,
+                    stats:Optional[ImportStats]=None, sections:Optional[Iterable[str]]=None, validate:bool=False):
+        """Import a project file, recording per-phase timings and clip counts into stats if one is given.
+
+        If sections is given, only those clip lists (out of audioClips, audioTrashClips, videoClips and videoTrashClips)
+        are decoded and built, and the others are skipped before parsing. A skipped section is loaded from the file
+        the first time it's accessed, provided the file hasn't changed since.
+        Clips are built as they're first read, so a broken clip dict only raises then, unless validate=True,
+        which checks the whole project against the Schema first and raises a SchemaError listing every violation.
+        If stats is given, every clip of the loaded sections is built in the "construct" phase, so its time is that of
+        building the clips rather than of setting up the lazy lists.
+        """
+        skip = set(iMovieProj._SECTIONS).difference(sections) if sections is not None else None
+        stat = iMovieProj._statFile(file)
+        with ImportStats.Profiling(stats):
+            with ImportStats.Track(stats, "load"):
+                xmldict = iMovieProj._loadXMLDict(file, backend=backend, use_cache=use_cache, cache=cache, stats=stats, skip=skip)
+            with ImportStats.Track(stats, "construct"):
+                project : iMovieProj = iMovieProj(xmldict=xmldict, track_changes=track_changes, sections=sections, validate=validate)
+                if stats is not None and not validate:
+                    # clips are otherwise built on first read, after the phase is over, so build them here to time them
+                    project.Validate()
+        project._source = (Path(file), backend, stat)
+        if stats is not None:
+            # counted from the dicts, which is quicker than walking the built clips
+            stats.CountClipDicts({key:xmldict.get(key, []) for key in iMovieProj._SECTIONS if key in project._loaded})
+        return project
 
     @staticmethod
-    def FromXMLFile(file:Path):
-        xmldict = XMLDict.LoadXMLDict(file)
-        project : iMovieProj     = iMovieProj(xmldict=xmldict)
+    def _loadXMLDict(file:Path, backend:str, use_cache:bool, cache:Optional[ProjectCache], stats:Optional[ImportStats]=None,
+                     skip:Optional[Set[str]]=None) -> Dict[str, Any]:
+        if use_cache:
+            cache = cache if cache is not None else ProjectCache.Default()
+            if not skip:
+                return cache.Load(file, loader=lambda path: XMLDict.LoadXMLDict(path, backend=backend, stats=stats))
+            # a cached project is quicker to unmarshal whole than to parse in part, but a partial one mustn't be cached
+            cached = cache.Get(file)
+            if cached is not None:
+                return {key:val for key, val in cached.items() if key not in skip}
+        return XMLDict.LoadXMLDict(file, backend=backend, stats=stats, skip=skip)
 
-        print(f"""
-        ***
-        Results from importing {file}:
-            project: {project}
-            VideoClips: {project.VideoClips}
-            AudioClips: {project.AudioClips}
+    @staticmethod
+    def _statFile(file:Path) -> Tuple[int, int]:
+        stat = Path(file).stat()
+        return (stat.st_mtime_ns, stat.st_size)
 
-        ***
+    def _section(self, key:str) -> List[Any]:
+        """Get a clip list, loading it first if it was skipped."""
+        if key not in self._loaded:
+            self._loadSection(key)
+        return getattr(self, iMovieProj._SECTIONS[key][0])
 
-        """)
+    def _loadSection(self, key:str):
+        if self._source is None:
+            raise SectionNotLoadedError(f"The {key} section of this iMovieProj was skipped, and it wasn't loaded from a file to get it from; "
+                                        f"include {key} in its sections to load it.")
+        file, backend, stat = self._source
+        if iMovieProj._statFile(file) != stat:
+            raise SectionNotLoadedError(f"The {key} section of this iMovieProj was skipped, and {file} has changed since it was loaded; "
+                                        f"re-import it, or include {key} in its sections.")
+        xmldict = XMLDict.LoadXMLDict(file, backend=backend, skip=set(iMovieProj._SECTIONS).difference({key}))
+        attr, build = iMovieProj._SECTIONS[key]
+        clip_dicts  = xmldict.get(key, [])
+        # a validated project builds its clips trusted, so a section loaded later has to pass the schema too
+        if self._trusted:
+            violations = Schema.ValidateProject(xmldict, sections=[key])
+            if violations:
+                raise SchemaError(violations)
+        getattr(self, attr)._setRawItems(clip_dicts)
+        if self._fingerprints is not None:
+            self._fingerprints[key] = [iMovieProj._fingerprint(clip_dict) for clip_dict in clip_dicts]
+        self._loaded.add(key)
+        self._bindPushPins()
 
-        return project
+    @staticmethod
+    def _fingerprint(clip_dict:Dict[str, Any]) -> Tuple[Optional[int], bytes]:
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            # marshal format 2 predates object back-references, so equal dicts always give equal bytes
+            digest.update(marshal.dumps(clip_dict, 2))
+        except ValueError:
+            # nested too deep for marshal; a given dict always takes the same path, so digests still compare
+            iMovieProj._hashNested(digest, clip_dict)
+        return (clip_dict.get("uniqueID"), digest.digest())
+
+    @staticmethod
+    def _hashNested(digest:Any, value:Any):
+        """Feed a decoded value into digest with an explicit stack, tagging containers with their length."""
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            if type(item) is dict:
+                digest.update(b"{%d:" % len(item))
+                for key, val in reversed(list(item.items())):
+                    stack.append(val)
+                    stack.append(key)
+            elif type(item) is list:
+                digest.update(b"[%d:" % len(item))
+                stack.extend(reversed(item))
+            else:
+                digest.update(marshal.dumps(item, 2))
+
+    @staticmethod
+    def _rawUniqueID(item:Any) -> Optional[int]:
+        return item.get("uniqueID") if type(item) is dict else item.UniqueID
+
+    @staticmethod
+    def _built(item:Any, build:Callable[[Dict[str, Any]], Any]) -> Any:
+        """Build a clip that's still a raw dict, for handing out in a ChangeSet."""
+        return build(item) if type(item) is dict else item
+
+    def UpdateFrom(self, file:Path, backend:str="fast", use_cache:bool=True, cache:Optional[ProjectCache]=None) -> ChangeSet:
+        """Re-import a newer revision of the project file in place, only rebuilding clips that changed.
+
+        Sections that were skipped when the project was loaded stay skipped.
+        """
+        skip    = set(iMovieProj._SECTIONS).difference(self._loaded)
+        ret_val = self.UpdateFromDict(iMovieProj._loadXMLDict(file, backend=backend, use_cache=use_cache, cache=cache, skip=skip))
+        self._source = (Path(file), backend, iMovieProj._statFile(file))
+        return ret_val
+
+    def UpdateFromDict(self, xmldict:Dict[str, Any]) -> ChangeSet:
+        """Update the project to match a newly decoded dict, matching clips up by uniqueID.
+
+        Clips whose dict is unchanged keep their existing objects, along with anything cached on them.
+        A clip list is only touched (and the indexes over it rebuilt) if something in it changed.
+        Projects not built with track_changes=True have nothing to compare against, so the first update
+        reports every clip as changed, and later updates are incremental. Skipped sections are left alone.
+        """
+        ret_val = ChangeSet()
+        if self._fingerprints is None:
+            self._fingerprints = {key:[(iMovieProj._rawUniqueID(item), b"") for item in getattr(self, attr)._rawItems()]
+                                  for key, (attr, _) in iMovieProj._SECTIONS.items()}
+        for key, (attr, build) in iMovieProj._SECTIONS.items():
+            if key not in self._loaded:
+                continue
+            # work on the raw items, so clips that were never read don't get built just to be compared
+            old_clips  : LazyClipList = getattr(self, attr)
+            old_items  = old_clips._rawItems()
+            old_prints = self._fingerprints[key]
+            reusable   = {uid:(item, digest) for item, (uid, digest) in zip(old_items, old_prints) if uid is not None}
+            changes    = SectionChanges()
+            new_items, new_prints, kept, replaced = [], [], [], set()
+            for clip_dict in xmldict.get(key, []):
+                uid, digest = iMovieProj._fingerprint(clip_dict)
+                previous = reusable.pop(uid, None) if uid is not None else None
+                if previous is not None and previous[1] == digest:
+                    item = previous[0]
+                    kept.append(id(item))
+                else:
+                    item = build(clip_dict)
+                    if previous is not None:
+                        replaced.add(id(previous[0]))
+                        changes.changed.append((iMovieProj._built(previous[0], build), item))
+                    else:
+                        changes.added.append(item)
+                new_items.append(item)
+                new_prints.append((uid, digest))
+            kept_ids = set(kept)
+            reused   = kept_ids.union(replaced)
+            changes.removed   = [iMovieProj._built(item, build) for item in old_items if id(item) not in reused]
+            changes.reordered = kept != [id(item) for item in old_items if id(item) in kept_ids]
+            if not changes.IsEmpty:
+                old_clips._setRawItems(new_items)
+            self._fingerprints[key] = new_prints
+            ret_val.sections[key] = changes
+
+        new_elements = {key:val for key, val in xmldict.items() if key not in iMovieProj._SECTIONS}
+        for key in set(self._other_elements).union(new_elements):
+            if self._other_elements.get(key) != new_elements.get(key):
+                ret_val.elements[key] = (self._other_elements.get(key), new_elements.get(key))
+        self._other_elements = new_elements
+        self._bindPushPins()
+        return ret_val
+
+    @staticmethod
+    def IterVideoClips(file:Path) -> Iterator[TopVideoClip]:
+        """Stream the top-level video clips of a project file, one clip at a time, without loading the whole project."""
+        for clip_dict in XMLDict.IterArray(file, "videoClips"):
+            yield TopVideoClipFactory.FromDict(clip_dict)
+
+    @staticmethod
+    def IterAudioClips(file:Path) -> Iterator[AudioClip]:
+        """Stream the audio clips of a project file, one clip at a time, without loading the whole project."""
+        for clip_dict in XMLDict.IterArray(file, "audioClips"):
+            yield AudioClip(clip_dict)
+
+    def _clipsStamp(self) -> Tuple:
+        """Identify the current state of the clip lists, so cached indexes can tell when they're stale."""
+        return tuple((id(clips), getattr(clips, "Version", None))
+                     for clips in (self._videoClips, self._audioClips, self._videoTrashClips, self._audioTrashClips))
+
+    def _cachedIndex(self, name:str, build:Callable[[], Any]) -> Any:
+        stamp  = self._clipsStamp()
+        cached = self._indexes.get(name)
+        if cached is None or cached[0] != stamp:
+            cached = self._indexes[name] = (stamp, build())
+        return cached[1]
+
+    def _bindPushPins(self):
+        """Point the push-pins of every audio clip back at this project, so they can resolve their clip UIDs."""
+        # clips not built yet get bound as they're built
+        self._audioClips.Bind(self)
+        self._audioTrashClips.Bind(self)
+
+    def Validate(self) -> "iMovieProj":
+        """Build every clip of the loaded sections now, nested clips and push-pins included.
+
+        Clips are otherwise only built when first read, so this is how to find out up front whether any clip dict is
+        broken; raises ValueError for the first one that is. Schema.ValidateProject on the decoded dict finds them all.
+        """
+        stack : List[Any] = [getattr(self, attr) for key, (attr, _) in iMovieProj._SECTIONS.items() if key in self._loaded]
+        while stack:
+            for clip in stack.pop().Materialize():
+                for attr in ("FilteredClips", "ReplacedClips", "imagefilteredlist", "PushPins"):
+                    nested = getattr(clip, attr, None)
+                    if isinstance(nested, LazyClipList):
+                        stack.append(nested)
+        return self
+
+    def _buildUniqueIDIndex(self) -> UniqueIDIndex:
+        # clips may have been added since construction, so make sure their pins can find us too
+        self._bindPushPins()
+        return UniqueIDIndex([self._videoClips, self._audioClips, self._videoTrashClips, self._audioTrashClips])
+
+    def ClipByUniqueID(self, unique_id:int):
+        return self.UniqueIDIndex.Get(unique_id)
+
+    def VolumeEnvelopes(self, level:Callable[[Any], float]):
+        """Volume curves of the audio clips, with each push-pin's level given by level (e.g. VolumeEnvelope.LevelFromElement).
+
+        Built on the first call for each level function, and rebuilt whenever the clip lists change.
+        """
+        # imported here, so NumPy is only needed by projects that ask for envelopes
+        from iMovie.VolumeEnvelope import VolumeEnvelopes
+        by_level = self._cachedIndex("volume", dict)
+        ret_val  = by_level.get(level)
+        if ret_val is None:
+            ret_val = by_level[level] = VolumeEnvelopes.FromProject(self, level)
+        return ret_val
+
+    def InvalidateIndexes(self):
+        """Throw away every cached index, e.g. after changing a clip in place."""
+        self._indexes.clear()
 
     @property
     def AudioClips(self):
-        return self._audioClips
+        return self._section("audioClips")
     @property
     def AudioTrashClips(self):
-        return self._audioTrashClips
+        return self._section("audioTrashClips")
+    @property
+    def IntervalIndex(self) -> IntervalIndex:
+        """Index of which clips play at which edit frames, built on first access and rebuilt whenever the clip lists change."""
+        return self._cachedIndex("interval", lambda: IntervalIndex(IntervalIndex.EditSpans(self.VideoClips, self.AudioClips)))
+    @property
+    def Lineage(self) -> LineageIndex:
+        """Lineage of every video clip, with a source file to clips reverse index, built on first access."""
+        return self._cachedIndex("lineage", lambda: LineageIndex(self.VideoClips))
     @property
     def LastClipUniqueID(self) -> Optional[int]:
         return self._other_elements.get("lastClipUniqueID")
@@ -53,6 +348,10 @@ class iMovieProj:
     def RelativePlayHeadPosition(self) -> Optional[float]:
         return self._other_elements.get("relativePlayHeadPosition")
     @property
+    def RenderPlan(self) -> RenderPlan:
+        """Flat edit decision list of every track, built on first access and rebuilt whenever the clip lists change."""
+        return self._cachedIndex("render", lambda: RenderPlan.FromProject(self))
+    @property
     def SelectionEndFrame(self) -> Optional[int]:
         return self._other_elements.get("selectionEndFrame")
     @property
@@ -68,14 +367,24 @@ class iMovieProj:
     def Version(self) -> Optional[str]:
         return self._other_elements.get("version")
     @property
+    def Timeline(self):
+        """Columnar NumPy view of the edit, built on first access and cached until the clip lists change."""
+        # numpy is only needed for timeline analyses, so don't require it for a plain import
+        from iMovie.Timeline import Timeline
+        return self._cachedIndex("timeline", lambda: Timeline(self.VideoClips, self.AudioClips))
+    @property
+    def UniqueIDIndex(self) -> UniqueIDIndex:
+        """Index of every clip by uniqueID, nested and trashed ones included, built on first lookup."""
+        return self._cachedIndex("uniqueID", self._buildUniqueIDIndex)
+    @property
     def VideoClips(self) -> List[TopVideoClip]:
-        return self._videoClips
+        return self._section("videoClips")
     @property
     def VideoStandard(self) -> Optional[str]:
         return self._other_elements.get("videoStandard")
     @property
     def VideoTrashClips(self) -> List[TopVideoClip]:
-        return self._videoTrashClips
+        return self._section("videoTrashClips")
     @property
     def WritingApplicationName(self) -> Optional[str]:
         return self._other_elements.get("writingApplicationName")
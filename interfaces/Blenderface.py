@@ -1,45 +1,146 @@
+# builtin imports
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional
 # 3rd-party imports
-import bpy
+try:
+    import bpy
+except ImportError:
+    # outside of Blender, a stand-in module can be plugged in with Blender.UseModule
+    bpy = None
 # local imports
-from importer import iMovieProj, VideoClip, AudioClip
+from iMovie.AudioClip import AudioClip
+from iMovie.FrameRate import FrameRate
+from iMovie.ImportStats import ImportStats
+from iMovie.VideoClip import VideoClip
+from iMovie.iMovieProj import iMovieProj
+from interfaces.ExportPlan import ExportPlan, SourcePlan
 
 class Blender:
-    """Class to handle setting up stuff within Blender"""
-    @staticmethod
-    def SetupEditFromiMovieProj(proj:iMovieProj):
-        bpy.context.scene = main_scene
-
-    @staticmethod
-    def CreateVideoStrip(clip:VideoClip):
-        pass
-
-    @staticmethod
-    def CreateVideoScene(clip:VideoClip):
-        bpy.ops.scene.new(type='NEW')
-        current_scene = bpy.context.scene
-        current_scene.name = clipObj.sceneName
-        current_scene.frame_start = clipObj.inFrame
-        current_scene.frame_end = clipObj.outFrame
-        current_scene.render.resolution_x = x_res
-        current_scene.render.resolution_y = y_res
-        current_scene.render.resolution_percentage = 100
-        current_scene.render.fps = 30
-        current_scene.render.fps = 1.001
-        ### Open Clip and add it to compositor
-        print("in make new: " + clipObj.toString())
-        bl_open_clip(clipObj, path_of_clips)
-        bpy.context.scene.use_nodes = True
-        tree = bpy.context.scene.node_tree
-        links = tree.links
-        #Set up node tree
-        tree.nodes.remove(tree.nodes["Render Layers"])
+    """
+    Class to handle setting up stuff within Blender
+
+    Strips are made through the data API (sequence_editor.sequences.new_movie/new_sound) rather than operators,
+    so nothing depends on the UI context and each clip costs a handful of property writes.
+    The clips are grouped into an ExportPlan first, so anything made per source file is only made once.
+    The bpy module in use can be swapped out with UseModule, e.g. for a stand-in when running outside Blender.
+    """
+    _bpy : Optional[ModuleType] = bpy
+
+    @staticmethod
+    def UseModule(module:Optional[ModuleType]) -> Optional[ModuleType]:
+        """Set the bpy module for the exporter to use, returning the one it used before."""
+        previous, Blender._bpy = Blender._bpy, module
+        return previous
+
+    @staticmethod
+    def SetupEditFromiMovieProj(proj:iMovieProj, scene:Any=None, clips_path:Optional[Path]=None, resolver:Any=None,
+                                x_res:Optional[int]=None, y_res:Optional[int]=None, source_scenes:bool=False,
+                                stats:Optional[ImportStats]=None, duplicates:Optional[Dict[str, str]]=None) -> List[Any]:
+        """Lay out every top-level clip of a project as sequencer strips, in one pass, and return the strips made.
+
+        Clip files are found with resolver (e.g. a MediaResolver) if given, or else looked for directly in clips_path,
+        which defaults to the CLIPS_PATH of the config.
+        Video tracks take the lowest channels, with the audio tracks stacked above them.
+        With source_scenes=True, each video source file gets one movie clip and one scene, with its compositor set up,
+        and each video clip becomes a scene strip of its source's scene.
+        duplicates maps file paths to the canonical copies to use instead, as found by MediaDedup.
+        """
+        if Blender._bpy is None:
+            raise RuntimeError("Blender exporter has no bpy module; run inside Blender, or plug one in with Blender.UseModule")
+        if resolver is None and clips_path is None:
+            from config import CLIPS_PATH
+            clips_path = CLIPS_PATH
+        with ImportStats.Track(stats, "export_plan"):
+            plan = ExportPlan.FromProject(proj, clips_path=clips_path, resolver=resolver, duplicates=duplicates)
+        with ImportStats.Profiling(stats), ImportStats.Track(stats, "export"):
+            return Blender._export(proj, plan, scene, x_res, y_res, source_scenes)
+
+    @staticmethod
+    def _export(proj:iMovieProj, plan:ExportPlan, scene:Any, x_res:Optional[int], y_res:Optional[int], source_scenes:bool) -> List[Any]:
+        scene = scene if scene is not None else Blender._bpy.context.scene
+        Blender._setupScene(scene, proj, plan, x_res=x_res, y_res=y_res)
+        if scene.sequence_editor is None:
+            scene.sequence_editor_create()
+        sequences = scene.sequence_editor.sequences
+        source_scenes_made : Dict[str, Any] = {}
+        if source_scenes:
+            source_scenes_made = {path:Blender.CreateSourceScene(source, scene) for path, source in plan.sources.items()}
+
+        ret_val : List[Any] = []
+        for span, path in plan.strips:
+            frame_start = scene.frame_start + span.start
+            channel     = plan.channels[(span.audio, span.track)]
+            if span.audio:
+                ret_val.append(Blender.CreateAudioStrip(sequences, span.clip, path, frame_start, channel))
+            elif source_scenes:
+                ret_val.append(Blender.CreateSceneStrip(sequences, span.clip, source_scenes_made[path], frame_start, channel))
+            else:
+                ret_val.append(Blender.CreateVideoStrip(sequences, span.clip, path, frame_start, channel))
+        return ret_val
+
+    @staticmethod
+    def CreateSourceScene(source:SourcePlan, edit_scene:Any) -> Any:
+        """Make the one scene and movie clip shared by every clip of a source file, showing the clip through the compositor.
+
+        Scene frames match source frames, so a clip's in/out frames can be used directly as scene strip offsets.
+        """
+        movie_clip = Blender._bpy.data.movieclips.load(source.path, check_existing=True)
+        movie_clip.frame_start = 0
+        source_scene = Blender._bpy.data.scenes.new(source.Name)
+        source_scene.frame_start = 0
+        source_scene.frame_end   = max(source.LastFrame - 1, 0)
+        source_scene.render.resolution_x          = edit_scene.render.resolution_x
+        source_scene.render.resolution_y          = edit_scene.render.resolution_y
+        source_scene.render.resolution_percentage = 100
+        source_scene.render.fps      = edit_scene.render.fps
+        source_scene.render.fps_base = edit_scene.render.fps_base
+        source_scene.use_nodes = True
+        tree = source_scene.node_tree
+        for node in list(tree.nodes):
+            tree.nodes.remove(node)
         clip_node = tree.nodes.new(type="CompositorNodeMovieClip")
-        viewer_node = tree.nodes.new(type="CompositorNodeViewer")
-        #Link them
-        links.new(clip_node.outputs[0], viewer_node.inputs[0])
-        bpy.ops.sequencer.scene_strip_add(frame_start=start_frame, channel=1, scene=clip_name)
-        return
+        clip_node.clip = movie_clip
+        composite_node = tree.nodes.new(type="CompositorNodeComposite")
+        tree.links.new(clip_node.outputs[0], composite_node.inputs[0])
+        return source_scene
+
+    @staticmethod
+    def CreateSceneStrip(sequences:Any, clip:VideoClip, source_scene:Any, frame_start:int, channel:int) -> Any:
+        """Add a scene strip showing frames [InFrame, OutFrame) of a source scene, starting at frame_start of the edit."""
+        strip = sequences.new_scene(clip.Name, source_scene, channel, frame_start - clip.InFrame)
+        Blender._trimStrip(strip, clip)
+        return strip
+
+    @staticmethod
+    def CreateVideoStrip(sequences:Any, clip:VideoClip, filepath:str, frame_start:int, channel:int) -> Any:
+        """Add a movie strip showing frames [InFrame, OutFrame) of a clip's file, starting at frame_start of the edit."""
+        strip = sequences.new_movie(clip.Name, filepath, channel, frame_start - clip.InFrame)
+        Blender._trimStrip(strip, clip)
+        return strip
 
     @staticmethod
-    def CreateAudioStrip(clip:AudioClip):
-        pass
\ No newline at end of file
+    def CreateAudioStrip(sequences:Any, clip:AudioClip, filepath:str, frame_start:int, channel:int) -> Any:
+        """Add a sound strip playing frames [InFrame, OutFrame) of a clip's file, starting at frame_start of the edit."""
+        strip = sequences.new_sound(clip.Name, filepath, channel, frame_start - clip.InFrame)
+        Blender._trimStrip(strip, clip)
+        return strip
+
+    @staticmethod
+    def _trimStrip(strip:Any, clip:Any):
+        # the strip was placed so that, once InFrame is trimmed off the front, it starts at the clip's edit position
+        strip.frame_offset_start   = clip.InFrame
+        strip.frame_final_duration = clip.OutFrame - clip.InFrame
+
+    @staticmethod
+    def _setupScene(scene:Any, proj:iMovieProj, plan:ExportPlan, x_res:Optional[int], y_res:Optional[int]):
+        if x_res is not None:
+            scene.render.resolution_x = x_res
+        if y_res is not None:
+            scene.render.resolution_y = y_res
+        scene.render.resolution_percentage = 100
+        time_scale = next((clip.TimeScale for clip in proj.VideoClips if clip.TimeScale), None)
+        if time_scale is not None:
+            scene.render.fps, scene.render.fps_base = FrameRate.For(time_scale).BlenderRate
+        scene.frame_end = scene.frame_start + max(plan.length, 1) - 1
+
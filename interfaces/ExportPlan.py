@@ -0,0 +1,87 @@
+# builtin imports
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+# local imports
+from iMovie.IntervalIndex import ClipSpan, IntervalIndex
+
+@dataclass
+class SourcePlan:
+    """One media file of an export, with every top-level clip that shows part of it."""
+    path  : str
+    spans : List[ClipSpan] = field(default_factory=list)
+
+    @property
+    def Name(self) -> str:
+        return Path(self.path).name
+    @property
+    def FirstFrame(self) -> int:
+        """Earliest source frame any of the clips use."""
+        return min(span.clip.InFrame for span in self.spans)
+    @property
+    def LastFrame(self) -> int:
+        """Latest source frame any of the clips use, exclusive."""
+        return max(span.clip.OutFrame for span in self.spans)
+
+@dataclass
+class ExportPlan:
+    """
+    What an export of a project will create, worked out up front so each source file is only set up once.
+
+    Splits of one recording (vid/1, vid/2, ...) all share a file, so grouping clips by their resolved file lets an
+    exporter make one datablock per source, with each clip just referencing it through its own in/out frames.
+    """
+    # every top-level clip with a file, sorted by (audio, track, start), along with its resolved path
+    strips   : List[Tuple[ClipSpan, str]] = field(default_factory=list)
+    # the video sources, keyed by resolved path, in order of first use
+    sources  : Dict[str, SourcePlan] = field(default_factory=dict)
+    # Blender channel, counting from 1, for each (audio, track) pair
+    channels : Dict[Tuple[bool, int], int] = field(default_factory=dict)
+    # edit length, in frames
+    length   : int = 0
+
+    def __repr__(self) -> str:
+        return f"<ExportPlan object: {len(self.strips)} strips; {len(self.sources)} video sources; {self.length} frames>"
+
+    @staticmethod
+    def FromProject(proj:Any, clips_path:Optional[Path]=None, resolver:Any=None, duplicates:Optional[Mapping[str, str]]=None) -> "ExportPlan":
+        """Plan out the export of a project's top-level clips.
+
+        Clip files are found with resolver (e.g. a MediaResolver) if given, or else looked for directly in clips_path.
+        If duplicates maps resolved paths to canonical copies (e.g. the canonical dict of a MediaDedup DuplicateMap),
+        clips of a duplicate use the canonical copy, so each distinct file is only brought in once.
+        Video clips with no file of their own have nothing to show, so they're left as gaps.
+        """
+        spans   = sorted(IntervalIndex.EditSpans(proj.VideoClips, proj.AudioClips), key=lambda span: (span.audio, span.track, span.start))
+        ret_val = ExportPlan(length=max((span.end for span in spans), default=0))
+        paths   : Dict[str, str] = {}
+        for span in spans:
+            file_name = getattr(span.clip, "FileName", None)
+            if file_name is None:
+                continue
+            path = paths.get(file_name)
+            if path is None:
+                path = ExportPlan._resolvePath(file_name, clips_path, resolver)
+                path = paths[file_name] = duplicates.get(path, path) if duplicates is not None else path
+            ret_val.strips.append((span, path))
+            if not span.audio:
+                ret_val.sources.setdefault(path, SourcePlan(path)).spans.append(span)
+            if (span.audio, span.track) not in ret_val.channels:
+                # spans are sorted by (audio, track), so channels come out with video below audio
+                ret_val.channels[(span.audio, span.track)] = len(ret_val.channels) + 1
+        return ret_val
+
+    @property
+    def VideoStrips(self) -> int:
+        return sum(1 for span, _ in self.strips if not span.audio)
+    @property
+    def SplitFactor(self) -> float:
+        """Average number of video clips sharing each source."""
+        return self.VideoStrips / len(self.sources) if self.sources else 0.0
+
+    @staticmethod
+    def _resolvePath(file_name:str, clips_path:Optional[Path], resolver:Any) -> str:
+        found = resolver.Resolve(file_name) if resolver is not None else None
+        if found is None and clips_path is not None:
+            found = Path(clips_path) / file_name
+        return str(found if found is not None else file_name)
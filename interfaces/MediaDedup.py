@@ -0,0 +1,182 @@
+# builtin imports
+import hashlib
+import mmap
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+# local imports
+from interfaces.ExportPlan import ExportPlan
+from interfaces.MediaResolver import MediaResolver
+from interfaces.ProjectCache import ProjectCache
+
+@dataclass
+class DuplicateMap:
+    """Files found to have identical content, with each one's canonical copy: the first of its group in path order."""
+    groups    : List[List[str]] = field(default_factory=list)
+    canonical : Dict[str, str] = field(default_factory=dict)
+    sizes     : Dict[str, int] = field(default_factory=dict)
+
+    def __repr__(self) -> str:
+        return f"<DuplicateMap object: {len(self.groups)} groups of duplicates; {self.SavedBytes} bytes duplicated>"
+
+    def Canonical(self, path:str) -> str:
+        """The copy of a file to use in its place, which is the file itself unless it's a duplicate."""
+        return self.canonical.get(path, path)
+
+    @property
+    def SavedBytes(self) -> int:
+        """Bytes taken up by copies other than the canonical ones."""
+        return sum(self.sizes[group[0]] * (len(group) - 1) for group in self.groups)
+
+class MediaDedup:
+    """
+    Finds media files with identical content, under whatever names and folders they're referenced from.
+
+    Only files that could be duplicates get hashed in full: files are first grouped by size, then by a BLAKE2 hash of
+    their head and tail, and only files still sharing a group are hashed through, in mmap'd chunks on a thread pool.
+    Hashes are kept in an SQLite catalog keyed by path, mtime and size, so unchanged files are never re-hashed.
+    """
+    CATALOG_VERSION = 1
+    DEFAULT_CATALOG = ProjectCache.DEFAULT_DIR / "hashes.sqlite"
+    EDGE_BYTES      = 64 * 1024
+    CHUNK_BYTES     = 8 * 1024 * 1024
+
+    def __init__(self, catalog_file:Optional[Path]=DEFAULT_CATALOG, workers:int=8):
+        self._workers = workers
+        self._db      : Optional[sqlite3.Connection] = None
+        if catalog_file is not None:
+            try:
+                Path(catalog_file).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(catalog_file))
+                self._db.execute("CREATE TABLE IF NOT EXISTS hashes (path TEXT, mtime_ns INTEGER, size INTEGER, version INTEGER, "
+                                 "kind TEXT, digest BLOB, PRIMARY KEY (path, kind))")
+            except (OSError, sqlite3.Error):
+                # the catalog only saves re-hashing, so carry on without it
+                self._db = None
+
+    def __repr__(self) -> str:
+        return f"<MediaDedup object: {self._workers} workers; {'catalogued' if self._db is not None else 'uncatalogued'}>"
+
+    def Close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @staticmethod
+    def ProjectPaths(project:Any, clips_path:Optional[Path]=None, resolver:Optional[MediaResolver]=None) -> Set[str]:
+        """Resolved paths of every file a project's clips use, nested and trashed clips included, as the exporter finds them."""
+        return {ExportPlan._resolvePath(name, clips_path, resolver) for name in MediaResolver.ProjectFiles(project)}
+
+    def FindDuplicates(self, paths:Iterable[str]) -> DuplicateMap:
+        """Hash whatever's needed to group the files by content; missing files are left out."""
+        paths = sorted(set(str(path) for path in paths))
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            stats = {path:stat for path, stat in zip(paths, pool.map(MediaDedup._stat, paths)) if stat is not None}
+            # a file of unique size can't have a duplicate, and a size group with one head/tail hash can't either
+            candidates = MediaDedup._grouped(stats, lambda path: stats[path][1])
+            edges      = self._digests(pool, candidates, stats, "edges", MediaDedup._edgeDigest)
+            candidates = MediaDedup._grouped(edges, lambda path: (stats[path][1], edges[path]))
+            full       = self._digests(pool, candidates, stats, "full", MediaDedup._fullDigest)
+            candidates = {path:None for path in candidates if path in full}
+        by_content : Dict[Tuple[int, bytes], List[str]] = {}
+        for path in candidates:
+            by_content.setdefault((stats[path][1], full[path]), []).append(path)
+        ret_val = DuplicateMap(sizes={path:stat[1] for path, stat in stats.items()})
+        for group in by_content.values():
+            if len(group) > 1:
+                ret_val.groups.append(group)
+                for path in group:
+                    ret_val.canonical[path] = group[0]
+        return ret_val
+
+    def FindProjectDuplicates(self, projects:Iterable[Tuple[Any, Optional[Path]]], resolver:Optional[MediaResolver]=None) -> DuplicateMap:
+        """Duplicates among the media of several projects, each given with the clips folder its files are found in."""
+        paths = set()
+        for project, clips_path in projects:
+            paths.update(MediaDedup.ProjectPaths(project, clips_path=clips_path, resolver=resolver))
+        return self.FindDuplicates(paths)
+
+    @staticmethod
+    def _grouped(paths:Iterable[str], key) -> Dict[str, Any]:
+        """The paths sharing their key with at least one other path."""
+        groups : Dict[Any, List[str]] = {}
+        for path in paths:
+            groups.setdefault(key(path), []).append(path)
+        return {path:None for group in groups.values() if len(group) > 1 for path in group}
+
+    #region Hashing
+    @staticmethod
+    def _stat(path:str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _digests(self, pool:ThreadPoolExecutor, paths:Iterable[str], stats:Dict[str, Tuple[int, int]], kind:str, digest) -> Dict[str, bytes]:
+        """Digests of the paths, from the catalog where it has them; files that couldn't be read are left out."""
+        ret_val = self._catalogued(paths, stats, kind)
+        todo    = [path for path in paths if path not in ret_val]
+        fresh   = {path:value for path, value in zip(todo, pool.map(digest, todo)) if value is not None}
+        ret_val.update(fresh)
+        self._catalogue(fresh, stats, kind)
+        return ret_val
+
+    @staticmethod
+    def _edgeDigest(path:str) -> Optional[bytes]:
+        ret_val = hashlib.blake2b(digest_size=16)
+        try:
+            with open(path, "rb") as mediafile:
+                ret_val.update(mediafile.read(MediaDedup.EDGE_BYTES))
+                size = os.fstat(mediafile.fileno()).st_size
+                if size > MediaDedup.EDGE_BYTES:
+                    mediafile.seek(max(size - MediaDedup.EDGE_BYTES, MediaDedup.EDGE_BYTES))
+                    ret_val.update(mediafile.read(MediaDedup.EDGE_BYTES))
+        except OSError:
+            return None
+        return ret_val.digest()
+
+    @staticmethod
+    def _fullDigest(path:str) -> Optional[bytes]:
+        ret_val = hashlib.blake2b(digest_size=32)
+        try:
+            with open(path, "rb") as mediafile:
+                size = os.fstat(mediafile.fileno()).st_size
+                if size > 0:
+                    with mmap.mmap(mediafile.fileno(), 0, access=mmap.ACCESS_READ) as data, memoryview(data) as view:
+                        # hashlib lets go of the GIL for big updates, so the pool's threads really do hash side by side
+                        for start in range(0, size, MediaDedup.CHUNK_BYTES):
+                            ret_val.update(view[start:start + MediaDedup.CHUNK_BYTES])
+        except (OSError, ValueError):
+            return None
+        return ret_val.digest()
+    #endregion
+
+    #region Catalog
+    def _catalogued(self, paths:Iterable[str], stats:Dict[str, Tuple[int, int]], kind:str) -> Dict[str, bytes]:
+        ret_val : Dict[str, bytes] = {}
+        if self._db is None:
+            return ret_val
+        try:
+            for path in paths:
+                row = self._db.execute("SELECT digest FROM hashes WHERE path=? AND kind=? AND mtime_ns=? AND size=? AND version=?",
+                                       (path, kind, stats[path][0], stats[path][1], MediaDedup.CATALOG_VERSION)).fetchone()
+                if row is not None:
+                    ret_val[path] = row[0]
+        except sqlite3.Error:
+            pass
+        return ret_val
+
+    def _catalogue(self, digests:Dict[str, bytes], stats:Dict[str, Tuple[int, int]], kind:str):
+        if self._db is None or not digests:
+            return
+        rows = [(path, stats[path][0], stats[path][1], MediaDedup.CATALOG_VERSION, kind, digest) for path, digest in digests.items()]
+        try:
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error:
+            pass
+    #endregion
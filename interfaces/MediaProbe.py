@@ -0,0 +1,307 @@
+# builtin imports
+import mmap
+import os
+import sqlite3
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+# local imports
+from iMovie.FrameRate import FrameRate
+from interfaces.ExportPlan import ExportPlan
+from interfaces.MediaResolver import MediaResolver
+from interfaces.ProjectCache import ProjectCache
+
+class MediaInfo(NamedTuple):
+    """What a media file's headers say about it: frames is a count of video frames, or of sample frames for audio."""
+    path   : str
+    kind   : str
+    frames : int
+    rate   : Fraction
+    error  : Optional[str] = None
+
+    @property
+    def Seconds(self) -> Optional[float]:
+        return self.frames / self.rate if self.error is None and self.rate else None
+
+    def FramesAt(self, time_scale:int) -> Optional[int]:
+        """Length of the media in frames at an iMovie timeScale, e.g. how many 29.97 fps frames long a sound file is.
+
+        Rounded to the nearest frame, since a file's own rate (29.97 in a QuickTime header, say) can be a hair off
+        the exact rate FrameRate takes the timeScale to be.
+        """
+        if self.error is not None or not self.rate:
+            return None
+        return round(self.frames * FrameRate.For(time_scale).Rate / self.rate)
+
+class ClipIssue(NamedTuple):
+    """A clip that doesn't fit its media, and why."""
+    clip    : Any
+    path    : Optional[str]
+    problem : str
+
+@dataclass
+class ProbeReport:
+    """Clips of a project whose frames don't fit the media they refer to, as far as the media headers tell."""
+    media  : Dict[str, MediaInfo] = field(default_factory=dict)
+    issues : List[ClipIssue] = field(default_factory=list)
+    # clips that were checked against their media
+    checked : int = 0
+
+    def __repr__(self) -> str:
+        return f"<ProbeReport object: {len(self.media)} files; {self.checked} clips checked; {len(self.issues)} issues>"
+
+    @property
+    def Unreadable(self) -> Dict[str, str]:
+        """Files that couldn't be probed, with the reason."""
+        return {path:info.error for path, info in self.media.items() if info.error is not None}
+
+class MediaProbe:
+    """
+    Reads frame counts and rates out of media file headers, without reading the media itself.
+
+    AIFF/AIFC files are read from their COMM chunk, QuickTime files from the mvhd and mdhd atoms under moov (plus
+    the stts sample counts of the video track), and raw DV files from the frame size their first DIF block implies.
+    Files are mapped with mmap, so only the pages holding the headers are read, and probed on a thread pool.
+    Results are kept in an SQLite table keyed by path, mtime and size, so unchanged files are never probed twice.
+    """
+    CACHE_VERSION = 1
+    DEFAULT_CACHE = ProjectCache.DEFAULT_DIR / "probes.sqlite"
+    # QuickTime atoms that hold other atoms, on the way down to the ones we read
+    _CONTAINERS   = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+    _ATOM         = struct.Struct(">I4s")
+    _COMM         = struct.Struct(">hIh10s")
+    # DV frame sizes, for 525/60 and 625/50 systems
+    _DV_FRAMES    = ((120_000, Fraction(30_000, 1001)), (144_000, Fraction(25)))
+
+    def __init__(self, cache_file:Optional[Path]=DEFAULT_CACHE, workers:int=8):
+        self._workers = workers
+        self._db      : Optional[sqlite3.Connection] = None
+        if cache_file is not None:
+            try:
+                Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(cache_file))
+                self._db.execute("CREATE TABLE IF NOT EXISTS probes (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, version INTEGER, "
+                                 "kind TEXT, frames INTEGER, rate_num INTEGER, rate_den INTEGER, error TEXT)")
+            except (OSError, sqlite3.Error):
+                # the cache only saves re-probing, so carry on without it
+                self._db = None
+
+    def __repr__(self) -> str:
+        return f"<MediaProbe object: {self._workers} workers; {'cached' if self._db is not None else 'uncached'}>"
+
+    def Close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def Probe(self, path:Path) -> MediaInfo:
+        return self.ProbeAll([path])[str(path)]
+
+    def ProbeAll(self, paths:Iterable[Path]) -> Dict[str, MediaInfo]:
+        """Probe every file, getting unchanged ones from the cache and the rest from their headers on the thread pool."""
+        paths   = list(dict.fromkeys(str(path) for path in paths))
+        ret_val : Dict[str, MediaInfo] = {}
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            # stat on the pool too, since on network storage that's a round trip per file as well
+            stats = dict(zip(paths, pool.map(MediaProbe._stat, paths)))
+            todo  = []
+            for path in paths:
+                stat = stats[path]
+                cached = self._cached(path, stat) if stat is not None else None
+                if stat is None:
+                    ret_val[path] = MediaInfo(path, "missing", 0, Fraction(0), "file not found")
+                elif cached is not None:
+                    ret_val[path] = cached
+                else:
+                    todo.append(path)
+            probed = list(zip(todo, pool.map(MediaProbe.ProbeFile, todo)))
+        for path, info in probed:
+            ret_val[path] = info
+        self._store((info, stats[path]) for path, info in probed)
+        return ret_val
+
+    def CheckProject(self, project:Any, clips_path:Optional[Path]=None, resolver:Optional[MediaResolver]=None) -> ProbeReport:
+        """Probe every file a project's clips use, nested and trashed clips included, and report the clips that don't fit.
+
+        A clip doesn't fit if its in/out range runs past the end of the media, or its duration is longer than the media,
+        counting the media's length in frames at the clip's own timeScale.
+        """
+        paths   = {name:ExportPlan._resolvePath(name, clips_path, resolver) for name in MediaResolver.ProjectFiles(project)}
+        ret_val = ProbeReport(media=self.ProbeAll(paths.values()))
+        for clip in MediaProbe._allClips(project):
+            file_name = getattr(clip, "FileName", None)
+            if file_name is None:
+                continue
+            path = paths[file_name]
+            info = ret_val.media[path]
+            if info.error is not None:
+                ret_val.issues.append(ClipIssue(clip, path, f"media unreadable: {info.error}"))
+                continue
+            if not clip.TimeScale:
+                continue
+            length = info.FramesAt(clip.TimeScale)
+            if length is None:
+                # the headers were read, but don't give the media a length
+                ret_val.issues.append(ClipIssue(clip, path, "media unreadable: no frame rate"))
+                continue
+            ret_val.checked += 1
+            if clip.InFrame < 0 or clip.OutFrame > length:
+                ret_val.issues.append(ClipIssue(clip, path, f"frames {clip.InFrame}-{clip.OutFrame} fall outside the media's {length} frames"))
+            elif clip.Duration > length:
+                ret_val.issues.append(ClipIssue(clip, path, f"duration of {clip.Duration} frames is longer than the media's {length} frames"))
+        return ret_val
+
+    @staticmethod
+    def _allClips(project:Any) -> Iterator[Any]:
+        stack = list(project.VideoClips) + list(project.VideoTrashClips) + list(project.AudioClips) + list(project.AudioTrashClips)
+        while stack:
+            clip = stack.pop()
+            yield clip
+            stack.extend(getattr(clip, "FilteredClips", []))
+            stack.extend(getattr(clip, "ReplacedClips", []))
+            stack.extend(getattr(clip, "imagefilteredlist", []))
+
+    #region Header parsing
+    @staticmethod
+    def ProbeFile(path:str) -> MediaInfo:
+        """Read a single file's headers; problems are reported in the MediaInfo's error rather than raised."""
+        try:
+            with open(path, "rb") as mediafile:
+                if os.fstat(mediafile.fileno()).st_size == 0:
+                    return MediaInfo(path, "unknown", 0, Fraction(0), "empty file")
+                with mmap.mmap(mediafile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if data[:4] == b"FORM":
+                        return MediaProbe._aiff(path, data)
+                    if data[4:8] in (b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"):
+                        return MediaProbe._quickTime(path, data)
+                    if Path(path).suffix.casefold() == ".dv":
+                        return MediaProbe._dv(path, data)
+                    return MediaInfo(path, "unknown", 0, Fraction(0), "not an AIFF, QuickTime or DV file")
+        except (OSError, ValueError, IndexError, struct.error) as err:
+            # truncated or garbled headers make the file unprobeable, not the whole run
+            return MediaInfo(path, "unknown", 0, Fraction(0), str(err) or type(err).__name__)
+
+    @staticmethod
+    def _aiff(path:str, data:mmap.mmap) -> MediaInfo:
+        offset = 12
+        while offset + 8 <= len(data):
+            chunk_id, size = struct.unpack_from(">4sI", data, offset)
+            if chunk_id == b"COMM":
+                _, frames, _, rate = MediaProbe._COMM.unpack_from(data, offset + 8)
+                rate = MediaProbe._extended(rate)
+                if rate <= 0:
+                    return MediaInfo(path, "aiff", frames, Fraction(0), f"sample rate of {rate}")
+                return MediaInfo(path, "aiff", frames, rate)
+            # chunks are padded to an even length
+            offset += 8 + size + (size & 1)
+        return MediaInfo(path, "aiff", 0, Fraction(0), "no COMM chunk")
+
+    @staticmethod
+    def _extended(raw:bytes) -> Fraction:
+        """Decode the 80-bit IEEE extended float AIFF stores its sample rate in."""
+        exponent, mantissa = struct.unpack(">HQ", raw)
+        sign     = -1 if exponent & 0x8000 else 1
+        exponent = (exponent & 0x7FFF) - 16383 - 63
+        return sign * (Fraction(mantissa) * 2 ** exponent if exponent >= 0 else Fraction(mantissa, 2 ** -exponent))
+
+    @staticmethod
+    def _atoms(data:mmap.mmap, start:int, end:int) -> Iterator[Tuple[bytes, int, int]]:
+        """(type, body start, body end) of each atom between start and end."""
+        offset = start
+        while offset + 8 <= end:
+            size, kind = MediaProbe._ATOM.unpack_from(data, offset)
+            header = 8
+            if size == 1:
+                size   = struct.unpack_from(">Q", data, offset + 8)[0]
+                header = 16
+            elif size == 0:
+                size = end - offset
+            if size < header:
+                raise ValueError(f"bad {kind!r} atom size {size} at {offset}")
+            yield kind, offset + header, min(offset + size, end)
+            offset += size
+
+    @staticmethod
+    def _quickTime(path:str, data:mmap.mmap) -> MediaInfo:
+        movie   : Optional[Tuple[int, int]] = None
+        tracks  : List[Dict[str, Any]] = []
+        # walk down through the container atoms, one dict per trak to collect its handler, timescale and frames
+        stack = [(kind, start, end, None) for kind, start, end in MediaProbe._atoms(data, 0, len(data)) if kind == b"moov"]
+        if not stack:
+            return MediaInfo(path, "quicktime", 0, Fraction(0), "no moov atom")
+        while stack:
+            kind, start, end, track = stack.pop()
+            if kind == b"trak":
+                track = {}
+                tracks.append(track)
+            if kind in MediaProbe._CONTAINERS:
+                stack.extend((child, child_start, child_end, track) for child, child_start, child_end in MediaProbe._atoms(data, start, end))
+            elif kind in (b"mvhd", b"mdhd"):
+                # version 1 headers have 64-bit times
+                if data[start] == 1:
+                    time_scale, duration = struct.unpack_from(">IQ", data, start + 20)
+                else:
+                    time_scale, duration = struct.unpack_from(">II", data, start + 12)
+                if kind == b"mvhd":
+                    movie = (time_scale, duration)
+                elif track is not None:
+                    track["time_scale"], track["duration"] = time_scale, duration
+            elif kind == b"hdlr" and track is not None:
+                track["handler"] = bytes(data[start + 8:start + 12])
+            elif kind == b"stts" and track is not None:
+                count = struct.unpack_from(">I", data, start + 4)[0]
+                track["samples"] = sum(struct.unpack_from(">I", data, start + 8 + 8 * i)[0] for i in range(count))
+        for track in tracks:
+            if track.get("handler") == b"vide" and track.get("duration") and track.get("samples") and track.get("time_scale"):
+                return MediaInfo(path, "quicktime", track["samples"], Fraction(track["samples"] * track["time_scale"], track["duration"]))
+        for track in tracks:
+            if track.get("handler") == b"soun" and track.get("time_scale"):
+                # sound tracks run at their sample rate, so the duration is already a count of sample frames
+                return MediaInfo(path, "quicktime", track["duration"], Fraction(track["time_scale"]))
+        if movie is not None and movie[0]:
+            return MediaInfo(path, "quicktime", movie[1], Fraction(movie[0]))
+        return MediaInfo(path, "quicktime", 0, Fraction(0), "no mvhd or mdhd atom")
+
+    @staticmethod
+    def _dv(path:str, data:mmap.mmap) -> MediaInfo:
+        # the DSF bit of the header DIF block tells 625/50 from 525/60
+        frame_size, rate = MediaProbe._DV_FRAMES[1 if data[3] & 0x80 else 0] if len(data) > 3 else MediaProbe._DV_FRAMES[0]
+        return MediaInfo(path, "dv", len(data) // frame_size, rate)
+    #endregion
+
+    #region Cache
+    @staticmethod
+    def _stat(path:str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _cached(self, path:str, stat:Tuple[int, int]) -> Optional[MediaInfo]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT kind, frames, rate_num, rate_den, error FROM probes WHERE path=? AND mtime_ns=? AND size=? AND version=?",
+                                   (path, stat[0], stat[1], MediaProbe.CACHE_VERSION)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        kind, frames, rate_num, rate_den, error = row
+        return MediaInfo(path, kind, frames, Fraction(rate_num, rate_den or 1), error)
+
+    def _store(self, probed:Iterable[Tuple[MediaInfo, Optional[Tuple[int, int]]]]):
+        if self._db is None:
+            return
+        rows = [(info.path, stat[0], stat[1], MediaProbe.CACHE_VERSION, info.kind, info.frames, info.rate.numerator, info.rate.denominator, info.error)
+                for info, stat in probed if stat is not None]
+        try:
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error:
+            pass
+    #endregion
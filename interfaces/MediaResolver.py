@@ -0,0 +1,173 @@
+# builtin imports
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+# local imports
+from interfaces.ProjectCache import ProjectCache
+
+class MediaResolver:
+    """
+    Index of the media files under the clips folder, for resolving the file names referenced by an iMovieProj.
+
+    The folder tree is scanned once with os.scandir, and the listing is persisted along with each directory's mtime;
+    later runs only rescan directories whose mtime has changed.
+    Lookups try the exact name, then the name ignoring case, then treating aliased extensions as equal
+    (e.g. "Sound 01.aif" finds "sound 01.aiff"), and finally ignoring the extension altogether.
+    The last two also drop any split suffix, such as the "/1" of "vid/1".
+    """
+    INDEX_VERSION = 1
+    # extensions iMovie HD uses interchangeably for the same kind of media
+    EXTENSION_ALIASES = {".aif":".aiff", ".aifc":".aiff"}
+    _SPLIT_SUFFIX = re.compile(r"/\d+$")
+
+    def __init__(self, clips_path:Path, index_file:Optional[Path]=None, persist:bool=True):
+        self._root       = Path(clips_path)
+        self._index_file = Path(index_file) if index_file is not None else MediaResolver._defaultIndexFile(self._root)
+        self._persist    = persist
+        # relative dir path -> {"mtime":..., "files":[...], "dirs":[...]}
+        self._dirs       : Dict[str, Dict[str, Any]] = {}
+        self._exact      : Dict[str, Path] = {}
+        self._folded     : Dict[str, Path] = {}
+        self._aliased    : Dict[str, Path] = {}
+        self._stems      : Dict[str, Path] = {}
+        self._loadIndex()
+        self.Refresh()
+
+    def __repr__(self) -> str:
+        return f"<MediaResolver object: {len(self._exact)} files under {self._root}>"
+
+    @staticmethod
+    def FromConfig() -> "MediaResolver":
+        from config import CLIPS_PATH
+        return MediaResolver(CLIPS_PATH)
+
+    @property
+    def Root(self) -> Path:
+        return self._root
+
+    def Refresh(self):
+        """Rescan any directories that changed since the index was last built, and rebuild the lookup tables if needed."""
+        changed = self._scan("")
+        if changed or not self._exact:
+            self._buildLookups()
+        if changed and self._persist:
+            self._saveIndex()
+
+    def Resolve(self, name:str) -> Optional[Path]:
+        found = self._exact.get(name)
+        if found is None:
+            found = self._folded.get(name.casefold())
+        if found is None:
+            found = self._aliased.get(MediaResolver._aliasKey(name))
+        if found is None:
+            found = self._stems.get(MediaResolver._stemKey(name))
+        return found
+
+    def ResolveAll(self, names:Iterable[str]) -> Dict[str, Optional[Path]]:
+        return {name:self.Resolve(name) for name in set(names)}
+
+    def ResolveProject(self, project) -> Dict[str, Optional[Path]]:
+        """Resolve, in one batch, every file name referenced by the clips of a project, including nested and trashed clips."""
+        return self.ResolveAll(MediaResolver.ProjectFiles(project))
+
+    @staticmethod
+    def ProjectFiles(project) -> Set[str]:
+        ret_val : Set[str] = set()
+        stack = list(project.VideoClips) + list(project.VideoTrashClips) + list(project.AudioClips) + list(project.AudioTrashClips)
+        while stack:
+            clip = stack.pop()
+            file_name = getattr(clip, "FileName", None)
+            if file_name is not None:
+                ret_val.add(file_name)
+            stack.extend(getattr(clip, "FilteredClips", []))
+            stack.extend(getattr(clip, "ReplacedClips", []))
+            stack.extend(getattr(clip, "imagefilteredlist", []))
+        return ret_val
+
+    #region Scanning and lookup tables
+    def _scan(self, rel_dir:str) -> bool:
+        """Rescan rel_dir if its mtime changed, then recurse into its subdirectories. Returns whether anything changed."""
+        full = self._root / rel_dir
+        try:
+            mtime = full.stat().st_mtime_ns
+        except FileNotFoundError:
+            return self._forget(rel_dir)
+        changed = False
+        entry   = self._dirs.get(rel_dir)
+        if entry is None or entry["mtime"] != mtime:
+            files, dirs = [], []
+            with os.scandir(full) as listing:
+                for item in listing:
+                    if item.is_dir(follow_symlinks=False):
+                        dirs.append(item.name)
+                    elif item.is_file():
+                        files.append(item.name)
+            # drop subdirectories that are gone
+            old_dirs = set(entry["dirs"]) if entry is not None else set()
+            for gone in old_dirs.difference(dirs):
+                self._forget(os.path.join(rel_dir, gone))
+            entry   = self._dirs[rel_dir] = {"mtime":mtime, "files":sorted(files), "dirs":sorted(dirs)}
+            changed = True
+        for sub_dir in entry["dirs"]:
+            changed = self._scan(os.path.join(rel_dir, sub_dir)) or changed
+        return changed
+
+    def _forget(self, rel_dir:str) -> bool:
+        entry = self._dirs.pop(rel_dir, None)
+        if entry is not None:
+            for sub_dir in entry["dirs"]:
+                self._forget(os.path.join(rel_dir, sub_dir))
+        return entry is not None
+
+    def _buildLookups(self):
+        self._exact, self._folded, self._aliased, self._stems = {}, {}, {}, {}
+        # shallower files win when names collide, so iterate from the top of the tree down
+        for rel_dir in sorted(self._dirs.keys(), key=lambda rel: (rel.count(os.sep), rel)):
+            for name in self._dirs[rel_dir]["files"]:
+                path = self._root / rel_dir / name
+                self._exact.setdefault(name, path)
+                self._folded.setdefault(name.casefold(), path)
+                self._aliased.setdefault(MediaResolver._aliasKey(name), path)
+                self._stems.setdefault(MediaResolver._stemKey(name), path)
+
+    @staticmethod
+    def _aliasKey(name:str) -> str:
+        stem, ext = os.path.splitext(MediaResolver._SPLIT_SUFFIX.sub("", name).casefold())
+        return stem + MediaResolver.EXTENSION_ALIASES.get(ext, ext)
+
+    @staticmethod
+    def _stemKey(name:str) -> str:
+        return os.path.splitext(MediaResolver._SPLIT_SUFFIX.sub("", name).casefold())[0]
+    #endregion
+
+    #region Persistence
+    @staticmethod
+    def _defaultIndexFile(root:Path) -> Path:
+        name = hashlib.blake2b(str(root.resolve()).encode("UTF-8"), digest_size=16).hexdigest()
+        return ProjectCache.DEFAULT_DIR / f"media-{name}.json"
+
+    def _loadIndex(self):
+        if not self._persist:
+            return
+        try:
+            with open(self._index_file, "r", encoding="UTF-8") as indexfile:
+                saved = json.load(indexfile)
+        except (OSError, ValueError):
+            return
+        if saved.get("version") == MediaResolver.INDEX_VERSION and saved.get("root") == str(self._root.resolve()):
+            self._dirs = saved["dirs"]
+
+    def _saveIndex(self):
+        try:
+            self._index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self._index_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="UTF-8") as indexfile:
+                json.dump({"version":MediaResolver.INDEX_VERSION, "root":str(self._root.resolve()), "dirs":self._dirs}, indexfile)
+            os.replace(tmp_file, self._index_file)
+        except OSError:
+            # the saved index only saves a rescan, so failing to write it isn't fatal
+            pass
+    #endregion
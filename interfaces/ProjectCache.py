@@ -0,0 +1,124 @@
+# builtin imports
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Map = Dict[str, Any]
+
+class ProjectCache:
+    """
+    Persistent on-disk cache of decoded iMovieProj dicts.
+
+    Each project gets one entry file, holding a length-prefixed key (path, mtime, size and content hash of the project file)
+    followed by the marshalled dict. Entries whose key or format version don't match are rejected, and the least
+    recently used entries are evicted once the cache grows past max_bytes.
+    """
+    # bump whenever the decoded dict layout changes; marshal output is only stable per Python version.
+    FORMAT_VERSION = 1
+    DEFAULT_DIR    = Path.home() / ".cache" / "iMHD-import"
+    DEFAULT_SIZE   = 256 * 1024 * 1024
+    _HEADER  = struct.Struct("<I")
+    _default : Optional["ProjectCache"] = None
+
+    def __init__(self, cache_dir:Path=DEFAULT_DIR, max_bytes:int=DEFAULT_SIZE):
+        self._cache_dir = Path(cache_dir)
+        self._max_bytes = max_bytes
+
+    @staticmethod
+    def Default() -> "ProjectCache":
+        if ProjectCache._default is None:
+            ProjectCache._default = ProjectCache()
+        return ProjectCache._default
+
+    @property
+    def CacheDir(self) -> Path:
+        return self._cache_dir
+    @property
+    def MaxBytes(self) -> int:
+        return self._max_bytes
+
+    def Load(self, file:Path, loader:Callable[[Path], Map]) -> Map:
+        """Get the decoded dict for a project file from the cache, or decode it with loader and store the result."""
+        content = Path(file).read_bytes()
+        key     = self._makeKey(file, content)
+        ret_val = self.Get(file, key=key)
+        if ret_val is None:
+            ret_val = loader(file)
+            self.Put(file, ret_val, key=key)
+        return ret_val
+
+    def Get(self, file:Path, key:Optional[Tuple]=None) -> Optional[Map]:
+        key   = key if key is not None else self._makeKey(file, Path(file).read_bytes())
+        entry = self._entryPath(file)
+        try:
+            data = entry.read_bytes()
+            key_len = ProjectCache._HEADER.unpack_from(data)[0]
+            key_end = ProjectCache._HEADER.size + key_len
+            if marshal.loads(data[ProjectCache._HEADER.size:key_end]) != key:
+                return None
+            ret_val = marshal.loads(memoryview(data)[key_end:])
+            # touch the entry so eviction sees it as recently used
+            os.utime(entry)
+        except FileNotFoundError:
+            # evicted by another process, before the read or between the read and the touch
+            return None
+        except (EOFError, ValueError, TypeError, struct.error):
+            # truncated or corrupt entry, get rid of it so it gets rebuilt
+            entry.unlink(missing_ok=True)
+            return None
+        return ret_val
+
+    def Put(self, file:Path, xmldict:Map, key:Optional[Tuple]=None):
+        key   = key if key is not None else self._makeKey(file, Path(file).read_bytes())
+        entry = self._entryPath(file)
+        tmp_name = None
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+            key_data = marshal.dumps(key)
+            with os.fdopen(fd, "wb") as cachefile:
+                cachefile.write(ProjectCache._HEADER.pack(len(key_data)))
+                cachefile.write(key_data)
+                marshal.dump(xmldict, cachefile)
+            os.replace(tmp_name, entry)
+        except (OSError, ValueError):
+            # the cache is only an optimization, so an unwritable cache dir, or a dict nested too deep for marshal,
+            # shouldn't stop an import
+            if tmp_name is not None:
+                Path(tmp_name).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def Clear(self):
+        for entry in self._cache_dir.glob("*.cache"):
+            entry.unlink(missing_ok=True)
+
+    def _entryPath(self, file:Path) -> Path:
+        name = hashlib.blake2b(str(Path(file).resolve()).encode("UTF-8"), digest_size=16).hexdigest()
+        return self._cache_dir / f"{name}.cache"
+
+    @staticmethod
+    def _makeKey(file:Path, content:bytes) -> Tuple:
+        stat = Path(file).stat()
+        return (ProjectCache.FORMAT_VERSION, sys.version_info[:2], str(Path(file).resolve()),
+                stat.st_mtime_ns, stat.st_size, hashlib.blake2b(content, digest_size=32).digest())
+
+    def _evict(self):
+        entries = []
+        for entry in self._cache_dir.glob("*.cache"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self._max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,102 @@
+# builtin imports
+import itertools
+import json
+import socket
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+# 3rd-party imports
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+Map = Dict[str, Any]
+
+class ProjectServerError(RuntimeError):
+    """Raised when the project server couldn't answer a request, with the server's reason."""
+
+class ProjectClient:
+    """
+    Thin client for a ProjectServer, using nothing outside the standard library, so it runs in Blender's bundled Python.
+
+    Messages are length-prefixed, and are JSON unless msgpack is installed and asked for with encoding="msgpack";
+    the server answers in whichever encoding it was asked in.
+    """
+    _LENGTH = struct.Struct(">I")
+
+    def __init__(self, socket_path:Path, encoding:str="json", timeout:Optional[float]=None):
+        if encoding == "msgpack" and msgpack is None:
+            raise ValueError("ProjectClient was asked for msgpack encoding, but msgpack isn't installed!")
+        if encoding not in ("json", "msgpack"):
+            raise ValueError(f"ProjectClient was given unknown encoding {encoding}, expected json or msgpack!")
+        self._encoding = encoding
+        self._socket   = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(str(socket_path))
+        self._ids      = itertools.count(1)
+
+    def __repr__(self) -> str:
+        return f"<ProjectClient object: {self._encoding} over {self._socket.getpeername()}>"
+
+    def __enter__(self) -> "ProjectClient":
+        return self
+    def __exit__(self, *exc_info):
+        self.Close()
+
+    def Close(self):
+        self._socket.close()
+
+    def Request(self, op:str, **args) -> Any:
+        """Send one request and wait for its answer, raising ProjectServerError if the server reports a failure."""
+        message = {"id":next(self._ids), "op":op, **args}
+        payload = msgpack.packb(message) if self._encoding == "msgpack" else json.dumps(message, separators=(",", ":")).encode("UTF-8")
+        self._socket.sendall(ProjectClient._LENGTH.pack(len(payload)) + payload)
+        length  = ProjectClient._LENGTH.unpack(self._receive(ProjectClient._LENGTH.size))[0]
+        data    = self._receive(length)
+        reply   = msgpack.unpackb(data) if self._encoding == "msgpack" else json.loads(data)
+        if not reply.get("ok"):
+            raise ProjectServerError(reply.get("error", "unknown error"))
+        return reply.get("result")
+
+    def _receive(self, count:int) -> bytes:
+        chunks, remaining = [], count
+        while remaining:
+            chunk = self._socket.recv(min(remaining, 1 << 20))
+            if not chunk:
+                raise ConnectionError("Project server closed the connection")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    #region Queries
+    def Ping(self) -> str:
+        return self.Request("ping")
+
+    def Info(self, path:Path) -> Map:
+        """Summary of a project: format, clip counts and edit length."""
+        return self.Request("info", path=str(path))
+
+    def Clips(self, path:Path, section:str="videoClips", start:int=0, stop:Optional[int]=None) -> List[Map]:
+        """Clips start to stop of one of a project's clip lists, as dicts."""
+        return self.Request("clips", path=str(path), section=section, start=start, stop=stop)
+
+    def Range(self, path:Path, start:int, end:int, track:Optional[int]=None, audio:Optional[bool]=None) -> List[Map]:
+        """Top-level clips playing at any point in the edit frames [start, end)."""
+        return self.Request("range", path=str(path), start=start, end=end, track=track, audio=audio)
+
+    def Lineage(self, path:Path, unique_id:int) -> Map:
+        """Base and source files, depth and ancestors of the clip with a uniqueID."""
+        return self.Request("lineage", path=str(path), unique_id=unique_id)
+
+    def ClipsForSource(self, path:Path, source_file:str, nested:bool=False) -> List[Map]:
+        return self.Request("source", path=str(path), source_file=source_file, nested=nested)
+
+    def Stats(self) -> Map:
+        """What the server has cached, and how much of its memory budget that takes."""
+        return self.Request("stats")
+
+    def Evict(self, path:Optional[Path]=None) -> int:
+        """Drop a project, or every project, from the server's cache; returns how many were dropped."""
+        return self.Request("evict", path=str(path) if path is not None else None)
+    #endregion
@@ -0,0 +1,281 @@
+# builtin imports
+import argparse
+import asyncio
+import json
+import os
+import signal
+import struct
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+# 3rd-party imports
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+# local imports
+from iMovie.iMovieProj import iMovieProj
+from interfaces.ProjectCache import ProjectCache
+from interfaces.XMLInterface import XMLDict
+
+Map = Dict[str, Any]
+
+class _Entry:
+    __slots__ = ("project", "stat", "cost", "loaded")
+
+    def __init__(self, project:iMovieProj, stat:Tuple[int, int], cost:int):
+        self.project : iMovieProj = project
+        self.stat    : Tuple[int, int] = stat
+        self.cost    : int = cost
+        self.loaded  : float = time.time()
+
+class _Loading:
+    """The lock serialising imports of one project, and how many requests are holding or waiting on it."""
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock  = asyncio.Lock()
+        self.users = 0
+
+class ProjectServer:
+    """
+    Long-lived asyncio server on a Unix socket, keeping imported projects in memory between requests.
+
+    Projects are kept in an LRU cache, evicting the least recently used once their estimated memory goes over
+    max_bytes. The estimate is only that: a multiple of the project's file size for the decoded dicts, plus a fixed
+    amount per clip built and per clip in each index built, re-estimated after every request that may build more.
+    Each request stats the project file, and a project whose mtime or size has changed is imported again.
+    Stats, imports, and the first build of a project's Timeline, IntervalIndex or Lineage, run on a worker thread,
+    so a big project or slow storage doesn't hold up answers about the others.
+    Requests and answers are length-prefixed JSON, or msgpack if it's installed and the client sent msgpack.
+    """
+    DEFAULT_BUDGET = 512 * 1024 * 1024
+    # decoded projects take up a few times their XML size, going by ImportStats' memory tracing
+    MEMORY_FACTOR  = 3
+    # bytes per built clip, nested clips and push-pins included, going by benchmarks/clip_memory.py
+    CLIP_BYTES     = 600
+    # bytes per clip in each index, e.g. a span in the IntervalIndex or an entry in the UniqueIDIndex
+    INDEX_BYTES    = 200
+    _LENGTH = struct.Struct(">I")
+
+    def __init__(self, socket_path:Path, max_bytes:int=DEFAULT_BUDGET, backend:str="fast", use_cache:bool=True,
+                 cache:Optional[ProjectCache]=None):
+        self._socket_path = Path(socket_path)
+        self._max_bytes   = max_bytes
+        self._backend     = backend
+        self._use_cache   = use_cache
+        self._cache       = cache
+        self._projects    : "OrderedDict[str, _Entry]" = OrderedDict()
+        self._loading     : Dict[str, _Loading] = {}
+        # lazy clip lists and index caches aren't thread-safe, so work on any one project takes turns
+        self._working     : "weakref.WeakKeyDictionary[iMovieProj, threading.Lock]" = weakref.WeakKeyDictionary()
+        self._hits        = 0
+        self._loads       = 0
+        self._handlers    = {"ping":self._ping, "info":self._info, "clips":self._clips, "range":self._range, "lineage":self._lineage,
+                             "source":self._source, "stats":self._stats, "evict":self._evict}
+
+    def __repr__(self) -> str:
+        return f"<ProjectServer object: {len(self._projects)} projects cached on {self._socket_path}; {self.CachedBytes} of {self._max_bytes} bytes>"
+
+    @property
+    def CachedBytes(self) -> int:
+        return sum(entry.cost for entry in self._projects.values())
+
+    async def Serve(self, ready:Optional[asyncio.Event]=None):
+        """Listen on the socket until cancelled, replacing any stale socket file left by an earlier server."""
+        if self._socket_path.exists():
+            self._socket_path.unlink()
+        server = await asyncio.start_unix_server(self._connection, path=str(self._socket_path))
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._socket_path.unlink(missing_ok=True)
+
+    async def _connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    length = ProjectServer._LENGTH.unpack(await reader.readexactly(ProjectServer._LENGTH.size))[0]
+                    data   = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    break
+                # JSON requests are objects, so start with '{'; anything else is taken for msgpack
+                packed  = data[:1] != b"{"
+                reply   = await self._answer(data, packed)
+                payload = msgpack.packb(reply, default=str) if packed else json.dumps(reply, separators=(",", ":"), default=str).encode("UTF-8")
+                writer.write(ProjectServer._LENGTH.pack(len(payload)) + payload)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _answer(self, data:bytes, packed:bool) -> Map:
+        request : Map = {}
+        try:
+            if packed and msgpack is None:
+                raise ValueError("request isn't JSON, and msgpack isn't installed to decode it")
+            request = msgpack.unpackb(data) if packed else json.loads(data)
+            handler = self._handlers.get(request.get("op"))
+            if handler is None:
+                raise ValueError(f"unknown op {request.get('op')}, expected one of {sorted(self._handlers)}")
+            return {"id":request.get("id"), "ok":True, "result":await handler(request)}
+        except Exception as err: # pylint: disable=broad-except
+            # a bad request or a broken project shouldn't bring the server down
+            return {"id":request.get("id"), "ok":False, "error":f"{type(err).__name__}: {err}"}
+
+    #region Project cache
+    async def Project(self, path:str) -> iMovieProj:
+        """Get a project from the cache, importing it first if it isn't cached or its file has changed."""
+        path    = str(Path(path).resolve())
+        loading = self._loading.get(path)
+        if loading is None:
+            loading = self._loading[path] = _Loading()
+        loading.users += 1
+        try:
+            # one import per project at a time; whoever waited on it then finds it cached
+            async with loading.lock:
+                return await self._getOrLoad(path)
+        finally:
+            # drop the lock once nobody holds or waits on it, so the dict doesn't grow with every path ever asked for
+            loading.users -= 1
+            if not loading.users:
+                del self._loading[path]
+
+    async def _getOrLoad(self, path:str) -> iMovieProj:
+        loop  = asyncio.get_running_loop()
+        stat  = await loop.run_in_executor(None, os.stat, path)
+        key   = (stat.st_mtime_ns, stat.st_size)
+        entry = self._projects.get(path)
+        if entry is not None and entry.stat == key:
+            self._projects.move_to_end(path)
+            self._hits += 1
+            return entry.project
+        project = await loop.run_in_executor(None, self._load, path)
+        self._loads += 1
+        self._projects.pop(path, None)
+        self._projects[path] = _Entry(project, key, ProjectServer.EstimateBytes(project, stat.st_size))
+        self._evictOverBudget(keep=path)
+        return project
+
+    def _load(self, path:str) -> iMovieProj:
+        return iMovieProj.FromXMLFile(Path(path), backend=self._backend, use_cache=self._use_cache, cache=self._cache)
+
+    @staticmethod
+    def EstimateBytes(project:iMovieProj, file_size:int) -> int:
+        """Rough memory taken by a project: its decoded dicts, plus its clips and indexes built so far."""
+        clip_lists = (project._videoClips, project._audioClips, project._videoTrashClips, project._audioTrashClips)
+        built      = sum(clips.BuiltCount for clips in clip_lists)
+        total      = sum(len(clips) for clips in clip_lists)
+        return (file_size * ProjectServer.MEMORY_FACTOR + built * ProjectServer.CLIP_BYTES
+                + len(project._indexes) * total * ProjectServer.INDEX_BYTES)
+
+    async def _offThread(self, project:iMovieProj, func:Callable[[], Any]) -> Any:
+        """Run a blocking call on a project, like the first build of its Timeline, on a worker thread, one call per project at a time."""
+        lock = self._working.setdefault(project, threading.Lock())
+        def _locked() -> Any:
+            with lock:
+                return func()
+        ret_val = await asyncio.get_running_loop().run_in_executor(None, _locked)
+        # the call may have built clips or an index, so the project may now be over budget
+        for path, entry in self._projects.items():
+            if entry.project is project:
+                entry.cost = ProjectServer.EstimateBytes(project, entry.stat[1])
+                self._evictOverBudget(keep=path)
+                break
+        return ret_val
+
+    def _evictOverBudget(self, keep:str):
+        total = self.CachedBytes
+        for path in list(self._projects):
+            if total <= self._max_bytes:
+                break
+            # the project just asked for stays, even if it's over budget on its own
+            if path != keep:
+                total -= self._projects.pop(path).cost
+    #endregion
+
+    #region Handlers
+    @staticmethod
+    def ClipJSON(clip:Any) -> Map:
+        """The fields of a clip worth sending over the wire."""
+        ret_val = {"class":type(clip).__name__, "uniqueID":clip.UniqueID, "name":clip.Name, "file":getattr(clip, "FileName", None),
+                   "in":clip.InFrame, "out":clip.OutFrame, "duration":clip.Duration, "timeScale":clip.TimeScale}
+        for key, attr in (("track", "Track"), ("startFrame", "StartFrame"), ("pluginName", "PluginName")):
+            value = getattr(clip, attr, None)
+            if value is not None:
+                ret_val[key] = value
+        return ret_val
+
+    async def _ping(self, request:Map) -> str:
+        return "pong"
+
+    async def _info(self, request:Map) -> Map:
+        project = await self.Project(request["path"])
+        return {"videoStandard":project.VideoStandard, "version":project.Version, "videoClips":len(project.VideoClips),
+                "audioClips":len(project.AudioClips), "videoTrashClips":len(project.VideoTrashClips),
+                "audioTrashClips":len(project.AudioTrashClips), "editLength":await self._offThread(project, lambda: project.Timeline.EditLength())}
+
+    async def _clips(self, request:Map) -> List[Map]:
+        project = await self.Project(request["path"])
+        section = request.get("section", "videoClips")
+        if section not in iMovieProj._SECTIONS:
+            raise ValueError(f"unknown section {section}, expected one of {list(iMovieProj._SECTIONS)}")
+        # slicing a clip list only builds the clips asked for
+        clips = await self._offThread(project, lambda: project._section(section)[request.get("start") or 0:request.get("stop")])
+        return [ProjectServer.ClipJSON(clip) for clip in clips]
+
+    async def _range(self, request:Map) -> List[Map]:
+        project = await self.Project(request["path"])
+        # the first query of a project builds its IntervalIndex, so it goes on a worker thread like the import
+        spans   = await self._offThread(project, lambda: project.IntervalIndex.Range(request["start"], request["end"], track=request.get("track"),
+                                                                                  audio=request.get("audio")))
+        return [{"start":span.start, "end":span.end, "track":span.track, "audio":span.audio, "clip":ProjectServer.ClipJSON(span.clip)}
+                for span in spans]
+
+    async def _lineage(self, request:Map) -> Map:
+        project = await self.Project(request["path"])
+        clip    = await self._offThread(project, lambda: project.ClipByUniqueID(request["unique_id"]))
+        if clip is None or not hasattr(clip, "Lineage"):
+            raise KeyError(f"no video clip with uniqueID {request['unique_id']}")
+        lineage = await self._offThread(project, lambda: clip.Lineage)
+        return {"clip":ProjectServer.ClipJSON(clip), "baseFiles":list(lineage.base_files), "sourceFiles":list(lineage.source_files),
+                "depth":lineage.depth, "ancestors":[ancestor.UniqueID for ancestor in lineage.Ancestors]}
+
+    async def _source(self, request:Map) -> List[Map]:
+        project = await self.Project(request["path"])
+        clips   = await self._offThread(project, lambda: project.Lineage.ClipsForSource(request["source_file"], nested=bool(request.get("nested"))))
+        return [ProjectServer.ClipJSON(clip) for clip in clips]
+
+    async def _stats(self, request:Map) -> Map:
+        return {"projects":{path:{"bytes":entry.cost, "loaded":entry.loaded} for path, entry in self._projects.items()},
+                "cachedBytes":self.CachedBytes, "maxBytes":self._max_bytes, "hits":self._hits, "loads":self._loads}
+
+    async def _evict(self, request:Map) -> int:
+        if request.get("path") is None:
+            count = len(self._projects)
+            self._projects.clear()
+            return count
+        return 1 if self._projects.pop(str(Path(request["path"]).resolve()), None) is not None else 0
+    #endregion
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve imported iMovie HD projects from memory over a Unix socket.")
+    parser.add_argument("socket", type=Path, help="Path of the Unix socket to listen on")
+    parser.add_argument("--max-mb", type=int, default=ProjectServer.DEFAULT_BUDGET // 2**20, help="Memory budget for cached projects, in MiB")
+    parser.add_argument("--backend", choices=XMLDict.BACKENDS, default="fast", help="XMLDict backend used to decode projects")
+    parser.add_argument("--no-cache", action="store_true", help="Don't go through the on-disk project cache")
+    args = parser.parse_args()
+
+    async def _serve():
+        # stop cleanly on SIGTERM as well as Ctrl-C, so the socket file gets removed
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        await ProjectServer(args.socket, max_bytes=args.max_mb * 2**20, backend=args.backend, use_cache=not args.no_cache).Serve()
+    try:
+        asyncio.run(_serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -0,0 +1,63 @@
+# builtin imports
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from xml.parsers.expat import ExpatError
+# local imports
+from iMovie.ChangeSet import ChangeSet
+from iMovie.iMovieProj import iMovieProj
+
+class ProjectWatcher:
+    """
+    Keeps an iMovieProj in step with its project file, re-importing incrementally whenever the file changes.
+
+    Changes are spotted by polling the file's mtime and size, since the standard library has no portable
+    file-change notification. A stat call per interval is cheap next to even an incremental re-import.
+    """
+    def __init__(self, file:Path, project:Optional[iMovieProj]=None, interval:float=2.0,
+                 callback:Optional[Callable[[ChangeSet], None]]=None, backend:str="fast", use_cache:bool=True):
+        self._file      = Path(file)
+        self._interval  = interval
+        self._callback  = callback
+        self._backend   = backend
+        self._use_cache = use_cache
+        self._stat      : Optional[Tuple[int, int]] = self._statFile()
+        self._project   : iMovieProj = project if project is not None else \
+                          iMovieProj.FromXMLFile(self._file, backend=backend, use_cache=use_cache, track_changes=True)
+
+    def __repr__(self) -> str:
+        return f"<ProjectWatcher object: {self._file} every {self._interval}s>"
+
+    @property
+    def Project(self) -> iMovieProj:
+        return self._project
+
+    def Poll(self) -> Optional[ChangeSet]:
+        """Check the file once, and if it changed, update the project and return what changed."""
+        stat = self._statFile()
+        if stat is None or stat == self._stat:
+            return None
+        try:
+            changes = self._project.UpdateFrom(self._file, backend=self._backend, use_cache=self._use_cache)
+        except (OSError, ValueError, SyntaxError, ExpatError):
+            # iMovie may still be partway through saving, so the file can be missing, truncated or malformed;
+            # leave the stat alone and try again next time. Anything else is a bug, and is left to propagate.
+            return None
+        self._stat = stat
+        if self._callback is not None and not changes.IsEmpty:
+            self._callback(changes)
+        return changes
+
+    def Run(self, stop:Optional[threading.Event]=None):
+        """Poll until stop is set (or forever, if no event is given)."""
+        stop = stop if stop is not None else threading.Event()
+        while not stop.wait(self._interval):
+            self.Poll()
+
+    def _statFile(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
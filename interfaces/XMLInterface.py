@@ -1,19 +1,60 @@
 # builtin imports
+import html
+import json
+import re
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from xml.parsers import expat
 from xml.etree.ElementTree import ElementTree, Element
 from xml.etree import ElementTree as ET
+# local imports
+from iMovie.ImportStats import ImportStats
 
 class XMLDict:
     """
     Class to take an XML ElementTree from iMovieProj file and turn it into a dictionary-like format.
     """
+    BACKENDS = ("fast", "expat", "etree")
 
     @staticmethod
-    def LoadXMLDict(file:Path) -> Dict[str, Any]:
+    def LoadXMLDict(file:Path, backend:str="fast", stats:Optional[ImportStats]=None, skip:Optional[Set[str]]=None) -> Dict[str, Any]:
+        """Load the top-level dict of an iMovieProj file.
+
+        The "expat" backend decodes straight from parse events, while "etree" builds the full ElementTree first.
+        The "fast" backend transcodes the plist to JSON, and falls back to "expat" for anything it can't handle,
+        so malformed files still raise the same errors.
+        Top-level keys listed in skip are cut out of the text before any backend parses it, and left out of the result.
+        Only the "etree" backend has separate parse and decode steps to record into stats.
+        """
+        if backend not in XMLDict.BACKENDS:
+            raise ValueError(f"Unknown XMLDict backend {backend}, expected one of {XMLDict.BACKENDS}!")
+        text = None
+        if skip:
+            with open(file, "r", encoding='UTF-8') as xmlfile:
+                text = _SectionFilter.Strip(xmlfile.read(), skip)
+        if backend == "fast":
+            ret_val = _TranscodeDecoder.DecodeText(text) if text is not None else _TranscodeDecoder.Decode(file)
+            if ret_val is None:
+                ret_val = _ExpatDecoder().DecodeText(text) if text is not None else _ExpatDecoder().Decode(file)
+        elif backend == "expat":
+            ret_val = _ExpatDecoder().DecodeText(text) if text is not None else _ExpatDecoder().Decode(file)
+        else:
+            ret_val = XMLDict._loadETree(file, text, stats)
+        if skip:
+            # the filter leaves anything it can't make sense of for the parser to deal with, so make sure it's gone
+            for key in skip:
+                ret_val.pop(key, None)
+        return ret_val
+
+    @staticmethod
+    def _loadETree(file:Path, text:Optional[str], stats:Optional[ImportStats]) -> Dict[str, Any]:
         xmltree : ElementTree = ElementTree()
-        with open(file, "r", encoding='UTF-8') as xmlfile:
-            xmltree = ET.parse(xmlfile)
+        with ImportStats.Track(stats, "xml_parse"):
+            if text is not None:
+                xmltree = ElementTree(ET.fromstring(text))
+            else:
+                with open(file, "r", encoding='UTF-8') as xmlfile:
+                    xmltree = ET.parse(xmlfile)
         root = xmltree.getroot()
         if len(root) > 1:
             # file should have only one dict
@@ -21,7 +62,41 @@ class XMLDict:
         xmldict = root[0]
         if xmldict.tag != "dict":
             raise ValueError(f"Expected a dict under iMovieProj XML root, found {xmldict.tag}!")
-        return XMLDict._parseDict(xmldict)
+        with ImportStats.Track(stats, "dict_decode"):
+            return XMLDict._parseDict(xmldict)
+
+    @staticmethod
+    def IterArray(file:Path, key:str) -> Iterator[Any]:
+        """Incrementally parse the array under the given top-level key, yielding one decoded element at a time.
+
+        Each element is cleared from the tree once it has been decoded, so memory use stays around the size of a single element.
+        """
+        stack    : List[Element] = []
+        last_key : Optional[str] = None
+        in_array : bool          = False
+        with open(file, "rb") as xmlfile:
+            for event, elem in ET.iterparse(xmlfile, events=("start", "end")):
+                if event == "start":
+                    if len(stack) == 1 and elem.tag != "dict":
+                        raise ValueError(f"Expected a dict under iMovieProj XML root, found {elem.tag}!")
+                    elif len(stack) == 2 and elem.tag != "key":
+                        in_array = last_key == key and elem.tag == "array"
+                    stack.append(elem)
+                    continue
+                stack.pop()
+                if len(stack) == 3 and in_array:
+                    yield XMLDict._parse(elem)
+                    stack[-1].clear()
+                elif len(stack) == 3:
+                    # element of an array we aren't interested in, throw it away
+                    stack[-1].clear()
+                elif len(stack) == 2:
+                    if elem.tag == "key":
+                        last_key = elem.text
+                    in_array = False
+                    stack[-1].clear()
+                elif len(stack) == 1 and len(stack[0]) > 1:
+                    raise ValueError(f"Expected only one element (a dict) under iMovieProj XML root, found {len(stack[0])}!")
 
     @staticmethod
     def _parseDict(xmldict:Element):
@@ -61,3 +136,207 @@ class XMLDict:
                 return float(xmlvalue.text)
             elif xmlvalue.tag == "dict":
                 return XMLDict._parseDict(xmlvalue)
+
+
+class _TranscodeDecoder:
+    """
+    Decoder that rewrites plist markup into JSON with plain string replacements, then hands it to the C json parser.
+
+    Every tag XMLDict understands maps onto a fixed piece of JSON, so anything else (comments, attributes, empty values, odd dicts)
+    is left as markup and makes json reject the document, in which case Decode returns None. So does anything an XML
+    parser would read differently from its markup, such as CDATA sections and \r line ends.
+    """
+    # XML forbids NUL characters, so it can safely mark container ends while we drop the trailing comma before them.
+    _END = "\0"
+    _REPLACEMENTS = (
+        ("\\", "\\\\"), ('"', '\\"'),
+        ("<key>", '"'), ("</key>", '":'),
+        # XMLDict._parse turns strings without text into "None"
+        ("<string></string>", '"None",'), ("<string/>", '"None",'), ("<string>", '"'), ("</string>", '",'),
+        ("<integer>", ""), ("</integer>", ","),
+        # the exponent forces json to give a float even for integral reals
+        ("<real>", ""), ("</real>", "e0,"),
+        ("<true/>", "true,"), ("<false/>", "false,"),
+        ("<dict>", "{"), ("</dict>", _END + "},"),
+        ("<array>", "["), ("</array>", _END + "],"), ("<array/>", "[],"),
+    )
+    _BAD_INTEGER = re.compile(r"<integer>[^<]*[^-\d\s<]")
+    _TRAILING_COMMA = re.compile(r",(?=\s*\0)")
+    _ENTITY = re.compile(r"&(?:#\d+|#x[0-9a-fA-F]+|amp|lt|gt|quot|apos);")
+    _BAD_ENTITY = re.compile(r"&(?!(?:#\d+|#x[0-9a-fA-F]+|amp|lt|gt|quot|apos);)")
+
+    @staticmethod
+    def Decode(file:Path) -> Optional[Dict[str, Any]]:
+        with open(file, "r", encoding='UTF-8') as xmlfile:
+            return _TranscodeDecoder.DecodeText(xmlfile.read())
+
+    @staticmethod
+    def DecodeText(text:str) -> Optional[Dict[str, Any]]:
+        start = text.find(">", text.find("<plist")) + 1
+        end   = text.rfind("</plist>")
+        if start == 0 or end == -1:
+            return None
+        body = text[start:end]
+        # json would happily take floats or NaN here, where int() would fail, and can't represent a None key
+        if _TranscodeDecoder._BAD_INTEGER.search(body) or "<key></key>" in body:
+            return None
+        # an XML parser unwraps CDATA sections and turns \r\n line ends into \n, which plain replacements can't match
+        if "<![CDATA[" in body or "\r" in body:
+            return None
+        for old, new in _TranscodeDecoder._REPLACEMENTS:
+            body = body.replace(old, new)
+        body = _TranscodeDecoder._TRAILING_COMMA.sub("", body).replace(_TranscodeDecoder._END, "")
+        if "&" in body:
+            if _TranscodeDecoder._BAD_ENTITY.search(body):
+                return None
+            body = _TranscodeDecoder._ENTITY.sub(lambda match: json.dumps(html.unescape(match.group(0)))[1:-1], body)
+        try:
+            ret_val = json.loads(body.strip().rstrip(","), strict=False)
+        except (json.JSONDecodeError, RecursionError, ValueError):
+            # json's C decoder recurses, so a deep enough chain of nested clips overflows it; expat copes, so fall back
+            return None
+        return ret_val if isinstance(ret_val, dict) else None
+
+class _SectionFilter:
+    """
+    Cuts whole top-level entries out of plist text with plain string searches, so no parser ever sees them.
+
+    Only the top-level dict is walked: each value is skipped over by counting its opening and closing tags,
+    and plist text can't contain a literal "<" anywhere else but in CDATA sections, which leave the text as it was,
+    as does anything else unexpected.
+    """
+    @staticmethod
+    def Strip(text:str, skip:Set[str]) -> str:
+        if "<![CDATA[" in text:
+            return text
+        plist = text.find("<plist")
+        pos   = text.find("<dict>", plist) + len("<dict>") if plist != -1 else -1
+        if pos < len("<dict>"):
+            return text
+        pieces : List[str] = []
+        kept_from = 0
+        while True:
+            key_start = text.find("<key>", pos)
+            if key_start == -1:
+                break
+            key_end     = text.find("</key>", key_start)
+            value_start = text.find("<", key_end + len("</key>")) if key_end != -1 else -1
+            value_end   = _SectionFilter._valueEnd(text, value_start) if value_start != -1 else -1
+            if value_end == -1:
+                return text
+            if text[key_start + len("<key>"):key_end] in skip:
+                pieces.append(text[kept_from:key_start])
+                kept_from = value_end
+            pos = value_end
+        pieces.append(text[kept_from:])
+        return "".join(pieces)
+
+    @staticmethod
+    def _valueEnd(text:str, start:int) -> int:
+        """Find where the element starting at start ends, or -1 if it doesn't."""
+        tag_end = text.find(">", start)
+        if tag_end == -1:
+            return -1
+        tag = text[start + 1:tag_end]
+        if tag.endswith("/"):
+            return tag_end + 1
+        close = f"</{tag}>"
+        if tag not in ("array", "dict"):
+            end = text.find(close, tag_end)
+            return end + len(close) if end != -1 else -1
+        # containers nest, so count the opening tags between here and each closing tag
+        opening = f"<{tag}>"
+        depth, pos = 1, tag_end + 1
+        while depth:
+            end = text.find(close, pos)
+            if end == -1:
+                return -1
+            depth += text.count(opening, pos, end) - 1
+            pos = end + len(close)
+        return pos
+
+class _ExpatDecoder:
+    """
+    Decoder that builds the same values as XMLDict._parse directly from expat callbacks, without any Element objects.
+    """
+    _CONTAINERS = {"array", "dict", "plist"}
+
+    def __init__(self):
+        # each open container keeps the values of its children, along with their tags for validating dicts
+        self._stack : List[Tuple[List[Any], List[str]]] = []
+        self._text  : List[str] = []
+        self._root  : List[Any] = []
+        self._rootTag : Optional[str] = None
+
+    def Decode(self, file:Path) -> Dict[str, Any]:
+        parser = self._parser()
+        with open(file, "rb") as xmlfile:
+            parser.ParseFile(xmlfile)
+        return self._result()
+
+    def DecodeText(self, text:str) -> Dict[str, Any]:
+        parser = self._parser()
+        parser.Parse(text, True)
+        return self._result()
+
+    def _parser(self):
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler  = self._start
+        parser.EndElementHandler    = self._end
+        parser.CharacterDataHandler = self._text_append
+        return parser
+
+    def _result(self) -> Dict[str, Any]:
+        if len(self._root) > 1:
+            # file should have only one dict
+            raise ValueError(f"Expected only one element (a dict) under iMovieProj XML root, found {len(self._root)}!")
+        if not isinstance(self._root[0], dict):
+            raise ValueError(f"Expected a dict under iMovieProj XML root, found {self._rootTag}!")
+        return self._root[0]
+
+    def _start(self, tag:str, attrs:Dict[str, str]):
+        if tag in _ExpatDecoder._CONTAINERS:
+            self._stack.append(([], []))
+        else:
+            self._text = []
+
+    def _text_append(self, data:str):
+        self._text.append(data)
+
+    def _end(self, tag:str):
+        if tag == "dict":
+            values, tags = self._stack.pop()
+            if len(values) % 2 != 0:
+                raise ValueError(f"Expected the XML dictionary to have an even number of elements, found {len(values)} elements!")
+            for i in range(0, len(tags), 2):
+                if tags[i] != "key":
+                    raise ValueError(f"Expected the even keys under XML dict to be keys, found element {i} with tag {tags[i]}!")
+            value = dict(zip(values[::2], values[1::2]))
+        elif tag == "array":
+            value = self._stack.pop()[0]
+        elif tag == "plist":
+            values, tags = self._stack.pop()
+            self._root, self._rootTag = values, tags[0] if tags else None
+            return
+        elif tag == "true":
+            value = True
+        elif tag == "false":
+            value = False
+        else:
+            text = "".join(self._text) if self._text else None
+            if tag == "key":
+                value = text
+            elif tag == "string":
+                value = str(text)
+            elif text is None:
+                raise ValueError(f"Expected XML Element with tag {tag} to have a value, but found a value of None!")
+            elif tag == "integer":
+                value = int(text)
+            elif tag == "real":
+                value = float(text)
+            else:
+                value = None
+        values, tags = self._stack[-1]
+        values.append(value)
+        tags.append(tag)
@@ -0,0 +1,90 @@
+# builtin imports
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+from xml.sax.saxutils import escape
+# 3rd-party imports
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+Map = Dict[str, Any]
+
+def PlistText(value:Any) -> str:
+    """Write a value out as plist XML, one element per line with sorted keys like iMovie HD; iterative, so chains of any depth can be written."""
+    parts : List[str] = []
+    stack : List[Any] = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, tuple):
+            # a closing tag, pushed after a container's children
+            parts.append(item[0])
+        elif isinstance(item, dict):
+            parts.append("<dict>")
+            stack.append(("</dict>",))
+            for key in sorted(item, reverse=True):
+                stack.append(item[key])
+                stack.append(("<key>" + escape(key) + "</key>",))
+        elif isinstance(item, list):
+            parts.append("<array>")
+            stack.append(("</array>",))
+            stack.extend(reversed(item))
+        elif isinstance(item, bool):
+            parts.append("<true/>" if item else "<false/>")
+        elif isinstance(item, int):
+            parts.append(f"<integer>{item}</integer>")
+        elif isinstance(item, float):
+            parts.append(f"<real>{item!r}</real>")
+        else:
+            parts.append(f"<string>{escape(str(item))}</string>")
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" '
+            '"http://www.apple.com/DTDs/PropertyList-1.0.dtd">\n<plist version="1.0">\n' + "\n".join(parts) + "\n</plist>\n")
+
+def FileClip(uid:int, file:str="Clip 01.mov", in_frame:int=0, out_frame:int=100, track:Any=1, **extra) -> Map:
+    """A video file clip dict; track=None leaves the track out, as nested clips do."""
+    ret_val = {"class":"video", "duration":900, "file":file, "in":in_frame, "isSelected":False, "mediaHandlePost":0,
+               "name":f"Clip {uid}", "out":out_frame, "shelfX":0, "shelfY":0, "thumb":0, "timeScale":2997, "type":1,
+               "uniqueID":uid, "version":"4"}
+    if track is not None:
+        ret_val["track"] = track
+    ret_val.update(extra)
+    return ret_val
+
+def VFXClip(uid:int, inner:Map, file:str="Effect.mov", track:Any=1, **extra) -> Map:
+    ret_val = FileClip(uid, file=file, in_frame=0, out_frame=inner["out"] - inner["in"], track=track)
+    ret_val.update({"clipEatenByFilter":True, "filterFadeinFrames":0, "filterFadeoutFrames":0, "filterSliderValues":[0.5, 0.25, 1.0],
+                    "filteredClips":[inner], "framesTakenAfter":0, "framesTakenBefore":0, "pluginIndex":3,
+                    "pluginName":"Sepia Tone", "pluginType":2, "solidColorClipColor":[0, 0, 0], "startFrame":0})
+    ret_val.update(extra)
+    return ret_val
+
+def AudioClip(uid:int, start:int=0, length:int=90, track:int=2, pins:Any=(), **extra) -> Map:
+    ret_val = {"class":"audio", "duration":length, "file":"Sound 01.aiff", "imae4cc":0, "imaeFilteredList":[], "imaeVersion":0,
+               "in":0, "isSelected":False, "name":f"Sound {uid}", "out":length, "pushPins":list(pins), "startFrame":start,
+               "timeScale":2997, "track":track, "trimmedEndFrame":length, "trimmedStartFrame":0, "uniqueID":uid, "version":"4"}
+    ret_val.update(extra)
+    return ret_val
+
+def Project(video:Any=(), audio:Any=(), video_trash:Any=(), **extra) -> Map:
+    ret_val = {"audioClips":list(audio), "audioTrashClips":[], "lastClipUniqueID":0, "playheadPosition":0,
+               "relativePlayHeadPosition":0.0, "selectionEndFrame":0, "selectionStartFrame":0, "selectionType":0,
+               "timelineZoom":1.0, "version":"4.1", "videoClips":list(video), "videoStandard":"DV-NTSC",
+               "videoTrashClips":list(video_trash), "writingApplicationName":"iMovie", "writingApplicationVersion":"6.0"}
+    ret_val.update(extra)
+    return ret_val
+
+def DeepVFXProject(depth:int) -> Map:
+    """A project whose one video clip is an effect nested depth levels deep, uniqueIDs counting up from the innermost file clip."""
+    clip = FileClip(1, file="Base.mov", track=None)
+    for level in range(1, depth + 1):
+        clip = VFXClip(level + 1, clip, file=f"Effect {level}.mov", track=1 if level == depth else None)
+    return Project(video=[clip])
+
+@pytest.fixture
+def write_project(tmp_path:Path):
+    """Write a project dict to a .iMovieProj file in tmp_path, returning its path."""
+    def _write(project:Map, name:str="test.iMovieProj") -> Path:
+        path = tmp_path / name
+        path.write_text(PlistText(project), encoding="UTF-8")
+        return path
+    return _write
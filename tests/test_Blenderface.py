@@ -0,0 +1,64 @@
+# builtin imports
+from pathlib import Path
+# 3rd-party imports
+import pytest
+# local imports
+from benchmarks.fake_bpy import FakeBpy
+from conftest import AudioClip, FileClip, Project, VFXClip
+from iMovie.iMovieProj import iMovieProj
+from interfaces.Blenderface import Blender
+
+@pytest.fixture
+def fake_bpy():
+    module   = FakeBpy()
+    previous = Blender.UseModule(module)
+    yield module
+    Blender.UseModule(previous)
+
+def _project() -> iMovieProj:
+    return iMovieProj(Project(
+        video=[FileClip(1, file="A.mov", in_frame=10, out_frame=100), FileClip(2, file="B.mov", in_frame=0, out_frame=50),
+               VFXClip(4, FileClip(3, file="A.mov", in_frame=200, out_frame=260, track=None), file="Effect.mov"),
+               FileClip(5, file="A.mov", in_frame=300, out_frame=330, track=2)],
+        audio=[AudioClip(10, start=30, length=90, track=2), AudioClip(11, start=0, length=40, track=3)]))
+
+def _layout(strips):
+    return [(strip.type, strip.filepath, strip.channel, strip.frame_start, strip.frame_offset_start, strip.frame_final_duration)
+            for strip in strips]
+
+def test_strips_channels_positions_and_trims(fake_bpy):
+    strips = Blender.SetupEditFromiMovieProj(_project(), clips_path=Path("clips"))
+    assert len(strips) == len(fake_bpy.Strips) == 6
+    # scene frames start at 1, and each strip is placed InFrame early so trimming InFrame off lines it up with its edit position
+    assert _layout(strips) == [
+        ("MOVIE", str(Path("clips/A.mov")),      1, 1 + 0 - 10,   10, 90),
+        ("MOVIE", str(Path("clips/B.mov")),      1, 1 + 90 - 0,   0,  50),
+        ("MOVIE", str(Path("clips/Effect.mov")), 1, 1 + 140 - 0,  0,  60),
+        ("MOVIE", str(Path("clips/A.mov")),      2, 1 + 0 - 300,  300, 30),
+        ("SOUND", str(Path("clips/Sound 01.aiff")), 3, 1 + 30, 0, 90),
+        ("SOUND", str(Path("clips/Sound 01.aiff")), 4, 1 + 0,  0, 40),
+    ]
+    scene = fake_bpy.context.scene
+    assert scene.frame_end == 200
+    assert scene.render.fps / scene.render.fps_base == pytest.approx(29.97, abs=0.01)
+
+def test_source_scenes_shared_per_file(fake_bpy):
+    strips = Blender.SetupEditFromiMovieProj(_project(), clips_path=Path("clips"), source_scenes=True)
+    video  = [strip for strip in strips if strip.type != "SOUND"]
+    assert {strip.type for strip in video} == {"SCENE"}
+    # three video files, so three source scenes and movie clips besides the edit scene, however many clips use them
+    assert len(fake_bpy.data.scenes) == 4 and len(fake_bpy.data.movieclips) == 3
+    assert [strip.filepath for strip in video] == ["A.mov", "B.mov", "Effect.mov", "A.mov"]
+
+def test_duplicates_use_canonical_copy(fake_bpy):
+    duplicates = {str(Path("clips/B.mov")):str(Path("clips/A.mov"))}
+    strips = Blender.SetupEditFromiMovieProj(_project(), clips_path=Path("clips"), duplicates=duplicates)
+    assert [strip.filepath for strip in strips[:2]] == [str(Path("clips/A.mov"))] * 2
+
+def test_needs_a_bpy_module():
+    previous = Blender.UseModule(None)
+    try:
+        with pytest.raises(RuntimeError):
+            Blender.SetupEditFromiMovieProj(_project(), clips_path=Path("clips"))
+    finally:
+        Blender.UseModule(previous)
@@ -0,0 +1,32 @@
+# builtin imports
+import copy
+# local imports
+from conftest import AudioClip, DeepVFXProject, FileClip, Project
+from iMovie.iMovieProj import iMovieProj
+
+def test_update_reports_changes_and_keeps_unchanged_clips():
+    original = Project(video=[FileClip(1), FileClip(2), FileClip(3)], audio=[AudioClip(10)])
+    project  = iMovieProj(copy.deepcopy(original), track_changes=True)
+    kept     = project.VideoClips[0]
+    revised  = copy.deepcopy(original)
+    revised["videoClips"][1]["out"] = 150
+    del revised["videoClips"][2]
+    revised["videoClips"].append(FileClip(4))
+    revised["timelineZoom"] = 2.0
+    changes  = project.UpdateFromDict(revised)
+    video    = changes.sections["videoClips"]
+    assert [clip.UniqueID for clip in video.added] == [4]
+    assert [clip.UniqueID for clip in video.removed] == [3]
+    assert [(old.OutFrame, new.OutFrame) for old, new in video.changed] == [(100, 150)]
+    assert changes.sections["audioClips"].IsEmpty
+    assert changes.elements == {"timelineZoom":(1.0, 2.0)}
+    assert project.VideoClips[0] is kept
+    assert project.UpdateFromDict(copy.deepcopy(revised)).IsEmpty
+
+def test_track_changes_on_deep_project(write_project):
+    path    = write_project(DeepVFXProject(1200))
+    project = iMovieProj.FromXMLFile(path, backend="expat", use_cache=False, track_changes=True)
+    assert project.UpdateFrom(path, backend="expat", use_cache=False).IsEmpty
+    deeper  = write_project(DeepVFXProject(1201), name="deeper.iMovieProj")
+    changes = project.UpdateFrom(deeper, backend="expat", use_cache=False)
+    assert [clip.UniqueID for clip in changes.sections["videoClips"].added] == [1202]
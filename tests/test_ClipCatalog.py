@@ -0,0 +1,49 @@
+# builtin imports
+import os
+# local imports
+from clip_catalog import ClipCatalog
+from conftest import AudioClip, FileClip, Project, VFXClip
+
+def _pin(frame):
+    return {"audioFrame":frame, "clipUID":1, "originalClipFrame":0, "originalClipUID":-1, "videoFrame":frame}
+
+def _projects(write_project):
+    nested = VFXClip(3, VFXClip(2, FileClip(4, file="Base.mov", track=None), track=None))
+    first  = write_project(Project(video=[FileClip(1, file="Shared.mov", out_frame=40), nested],
+                                   audio=[AudioClip(5, start=10, pins=[_pin(0), _pin(20)])]), name="first.iMovieProj")
+    second = write_project(Project(video=[FileClip(1, file="Shared.mov")], video_trash=[FileClip(2, file="Trashed.mov")]), name="second.iMovieProj")
+    broken = write_project(Project(video=[{"class":"video"}]), name="broken.iMovieProj")
+    return first.resolve(), second.resolve(), broken.resolve()
+
+def test_ingest_and_query(write_project, tmp_path):
+    first, second, broken = _projects(write_project)
+    catalog  = ClipCatalog(tmp_path / "catalog.sqlite")
+    outcomes = catalog.Ingest([first, second, broken])
+    assert outcomes[str(first)] == outcomes[str(second)] == "ingested" and outcomes[str(broken)].startswith("ValueError")
+    assert catalog.Ingest([first, second]) == {str(first):"unchanged", str(second):"unchanged"}
+    assert catalog.EditLengths() == {str(first):140, str(second):100}
+    assert catalog.ProjectsUsingFile("Shared.mov") == [str(first), str(second)]
+    # nested and trashed clips count too
+    assert catalog.ProjectsUsingFile("Base.mov") == [str(first)] and catalog.ProjectsUsingFile("Trashed.mov") == [str(second)]
+    assert [row["unique_id"] for row in catalog.ClipsWithPlugin("Sepia Tone")] == [3, 2]
+    assert [row["unique_id"] for row in catalog.ClipsOnTrack(first, 1)] == [1, 3]
+    top     = catalog.ClipByUniqueID(first, 3)
+    lineage = catalog.Lineage(top["id"])
+    assert [(row["unique_id"], row["depth"], row["relation"], row["root_id"]) for row in lineage] == \
+           [(3, 0, None, top["id"]), (2, 1, "filtered", top["id"]), (4, 2, "filtered", top["id"])]
+    pins = catalog.Query("SELECT push_pins.audio_frame FROM push_pins JOIN clips ON clips.id = push_pins.clip_id WHERE clips.unique_id=5")
+    assert [row["audio_frame"] for row in pins] == [0, 20]
+    catalog.Close()
+
+def test_reingest_replaces_rows(write_project, tmp_path):
+    first, second, _ = _projects(write_project)
+    catalog = ClipCatalog(tmp_path / "catalog.sqlite")
+    catalog.Ingest([first, second])
+    write_project(Project(video=[FileClip(7, file="Other.mov")]), name="first.iMovieProj")
+    stat = first.stat()
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert catalog.Ingest([first]) == {str(first):"ingested"}
+    assert catalog.ProjectsUsingFile("Shared.mov") == [str(second)] and catalog.Query("SELECT COUNT(*) AS pins FROM push_pins") == [{"pins":0}]
+    catalog.Remove(second)
+    assert catalog.Query("SELECT COUNT(*) AS clips FROM clips") == [{"clips":1}] and list(catalog.EditLengths()) == [str(first)]
+    catalog.Close()
@@ -0,0 +1,43 @@
+# 3rd-party imports
+import pytest
+# local imports
+from conftest import AudioClip, FileClip, VFXClip
+from iMovie.AudioClip import AudioClip as AudioClipObj
+from iMovie.TopVideoClip import TopTransition, TopVideoClipFactory
+
+def _transition():
+    """A transition with every element doc/iMovieHD-format-schema.md lists for one, including its lowercase timescale."""
+    return {"class":"transition", "duration":30, "file":"Cross Dissolve.mov", "framesTakenAfter":15, "framesTakenBefore":15, "in":0,
+            "isSelected":False, "mediaHandlePost":0, "name":"Cross Dissolve", "out":30, "pluginIndex":1, "pluginName":"Cross Dissolve",
+            "pluginType":1, "replacedClips":[FileClip(1, track=None), FileClip(2, track=None)], "thumb":0, "timescale":2997, "track":1,
+            "transitionDirection":0, "transitionSpeed":1.0, "type":2, "uniqueID":3, "version":"4"}
+
+def test_slots_hold_every_known_element():
+    clip = TopVideoClipFactory.FromDict(VFXClip(2, FileClip(1, track=None)))
+    assert not hasattr(clip, "__dict__") and not hasattr(clip.FilteredClips[0], "__dict__")
+    assert (clip.Track, clip.Volume, clip.PluginName, clip.TimeScale) == (1, 1.0, "Sepia Tone", 2997)
+    # filteredClips becomes child clips, so it isn't left over either
+    assert clip.OtherElements == {} and clip._other_elements is None
+    nested = clip.FilteredClips[0]
+    assert nested.OtherElements == {} and nested._other_elements is None and nested.Track is None
+
+def test_unknown_elements_are_left_over():
+    clip = TopVideoClipFactory.FromDict(_transition())
+    assert type(clip) is TopTransition and not hasattr(clip, "__dict__")
+    # only timeScale has a slot, so the transition's timescale is kept as an other element
+    assert clip.OtherElements == {"timescale":2997} and clip.TimeScale is None
+    assert [nested.UniqueID for nested in clip.ReplacedClips] == [1, 2] and clip.TransitionSpeed == 1.0
+
+def test_audio_clips_and_pins():
+    pins = [{"audioFrame":0, "clipUID":1, "originalClipFrame":-1, "originalClipUID":-1, "videoFrame":12},
+            {"audioFrame":40, "originalClipFrame":-1, "videoFrame":52}]
+    clip = AudioClipObj(AudioClip(1, pins=pins))
+    assert not hasattr(clip, "__dict__") and not hasattr(clip.PushPins[0], "__dict__")
+    assert clip.OtherElements == {} and [pin.OtherElements for pin in clip.PushPins] == [{}, {}]
+    assert [(pin.ClipUID, pin.OriginalClipUID) for pin in clip.PushPins] == [(1, -1), (None, None)]
+
+def test_missing_required_elements():
+    clip_dict = FileClip(1)
+    del clip_dict["out"]
+    with pytest.raises(ValueError, match="missing required elements"):
+        TopVideoClipFactory.FromDict(clip_dict)
@@ -0,0 +1,31 @@
+# builtin imports
+from pathlib import Path
+# local imports
+from conftest import AudioClip, FileClip, Project
+from iMovie.iMovieProj import iMovieProj
+from interfaces.ExportPlan import ExportPlan
+
+class _Resolver:
+    """Resolves the splits of a recording to the one file they share."""
+    def Resolve(self, name):
+        return Path("/media") / (name.split("/")[0] + ".mov") if "/" in name else None
+
+def _project():
+    return iMovieProj(Project(video=[FileClip(1, file="vid/1", in_frame=0, out_frame=50), FileClip(2, file="Other.mov"),
+                                     FileClip(3, file="vid/2", in_frame=200, out_frame=260), FileClip(4, file="Copy.mov", track=2)],
+                              audio=[AudioClip(5, track=3), AudioClip(6, start=100, track=2)]))
+
+def test_sources_group_splits_of_a_file():
+    plan = ExportPlan.FromProject(_project(), clips_path=Path("/clips"), resolver=_Resolver())
+    assert list(plan.sources) == ["/media/vid.mov", str(Path("/clips/Other.mov")), str(Path("/clips/Copy.mov"))]
+    source = plan.sources["/media/vid.mov"]
+    assert [span.clip.UniqueID for span in source.spans] == [1, 3] and (source.FirstFrame, source.LastFrame) == (0, 260)
+    assert plan.VideoStrips == 4 and plan.SplitFactor == 4 / 3 and plan.length == 210
+    # video channels come below audio ones, each in track order
+    assert plan.channels == {(False, 1):1, (False, 2):2, (True, 2):3, (True, 3):4}
+    assert [path for span, path in plan.strips if span.audio] == [str(Path("/clips/Sound 01.aiff"))] * 2
+
+def test_duplicates_share_a_source():
+    copy = str(Path("/clips/Copy.mov"))
+    plan = ExportPlan.FromProject(_project(), clips_path=Path("/clips"), duplicates={copy:str(Path("/clips/Other.mov"))})
+    assert copy not in plan.sources and [span.clip.UniqueID for span in plan.sources[str(Path("/clips/Other.mov"))].spans] == [2, 4]
@@ -0,0 +1,37 @@
+# builtin imports
+from fractions import Fraction
+# 3rd-party imports
+import numpy as np
+import pytest
+# local imports
+from iMovie.FrameRate import FrameRate
+
+def test_rates():
+    ntsc = FrameRate.For(2997)
+    assert ntsc is FrameRate.For(2997)
+    assert (ntsc.Rate, ntsc.Nominal, ntsc.DropFrame, ntsc.BlenderRate) == (Fraction(30_000, 1001), 30, True, (30, 1.001))
+    assert (FrameRate.For(2500).Rate, FrameRate.For(2500).DropFrame) == (Fraction(25), False)
+    assert FrameRate.For(2398).Rate == Fraction(24_000, 1001) and not FrameRate.For(2398).DropFrame
+    with pytest.raises(ValueError):
+        FrameRate(0)
+
+def test_drop_frame_timecode():
+    ntsc = FrameRate.For(2997)
+    # frame numbers 00 and 01 are skipped at the start of every minute but each tenth
+    assert ntsc.Timecode([0, 1799, 1800, 17_982, 17_982 * 6]) == ["00:00:00;00", "00:00:59;29", "00:01:00;02", "00:10:00;00", "01:00:00;00"]
+    assert ntsc.Timecode([1800], drop_frame=False) == ["00:01:00:00"]
+    assert FrameRate.For(5994).Timecode([3600]) == ["00:01:00;04"]
+
+@pytest.mark.parametrize("time_scale", [2997, 5994, 2500, 2398])
+def test_timecode_round_trip(time_scale):
+    rate   = FrameRate.For(time_scale)
+    frames = np.arange(0, 24 * 3600 * rate.Nominal - 200_000, 997)
+    assert np.array_equal(rate.FromTimecode(rate.Timecode(frames)), frames)
+
+def test_conversions_stay_exact():
+    ntsc = FrameRate.For(2997)
+    # an hour of drop-frame timecode is 107892 frames, 3.6 ms short of an hour
+    assert ntsc.ExactSeconds(107_892) == Fraction(35_999_964, 10_000) and ntsc.Seconds([107_892])[0] == pytest.approx(3599.9964)
+    assert ntsc.FramesAt([30, 107_892], FrameRate.For(2500)).tolist() == [25, 90_000]
+    seconds = FrameRate.SecondsOf([30, 25, 10], [2997, 2500, 0])
+    assert seconds[0] == pytest.approx(1.001) and seconds[1] == 1 and np.isnan(seconds[2])
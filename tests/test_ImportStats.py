@@ -0,0 +1,49 @@
+# local imports
+from conftest import AudioClip, FileClip, Project, VFXClip
+from iMovie.ImportStats import ImportStats
+from iMovie.iMovieProj import iMovieProj
+
+def _project():
+    return Project(video=[FileClip(1), VFXClip(3, VFXClip(2, FileClip(1, track=None), track=None)), FileClip(4, track=2)],
+                   audio=[AudioClip(10, imaeFilteredList=[AudioClip(11)])], video_trash=[FileClip(5)])
+
+def test_construct_phase_builds_the_clips(write_project):
+    stats   = ImportStats()
+    project = iMovieProj.FromXMLFile(write_project(_project()), use_cache=False, stats=stats)
+    assert list(stats.Phases) == ["load", "construct"]
+    assert stats.ClipClasses == {"TopVideoFileClip":3, "TopVFXClip":1, "NestedVFXClip":1, "NestedVideoFileClip":1, "AudioClip":2}
+    assert stats.Depths == {0:5, 1:2, 2:1}
+    # the clips were built in the construct phase rather than left for first access
+    assert all(clips.BuiltCount == len(clips) for clips in (project._videoClips, project._audioClips, project._videoTrashClips))
+    assert project.VideoClips[1].FilteredClips.BuiltCount == 1
+    assert iMovieProj.FromXMLFile(write_project(_project()), use_cache=False)._videoClips.BuiltCount == 0
+
+def test_dict_counts_match_built_counts():
+    from_dicts, from_clips = ImportStats(), ImportStats()
+    project = iMovieProj(_project())
+    from_dicts.CountClipDicts({key:_project()[key] for key in iMovieProj._SECTIONS})
+    from_clips.CountClips([project.VideoClips, project.AudioClips, project.VideoTrashClips, project.AudioTrashClips])
+    assert from_dicts.ClipClasses == from_clips.ClipClasses and from_dicts.Depths == from_clips.Depths
+
+def test_skipped_sections_not_counted(write_project):
+    stats = ImportStats()
+    iMovieProj.FromXMLFile(write_project(_project()), use_cache=False, stats=stats, sections=["audioClips"])
+    assert stats.ClipClasses == {"AudioClip":2}
+
+def test_phase_timing_memory_and_profile(write_project):
+    stats = ImportStats(profile=True, trace_memory=True)
+    ended = []
+    stats.OnPhase(lambda name, seconds: ended.append(name))
+    with stats.Phase("outer"):
+        with stats.Phase("inner"):
+            block = bytearray(4 * 2**20)
+        del block
+    with stats.Phase("inner"):
+        pass
+    assert ended == ["inner", "outer", "inner"] and list(stats.Phases) == ["inner", "outer"]
+    # a nested phase's peak counts towards the phase around it
+    assert stats.Memory["inner"] >= 4 * 2**20 and stats.Memory["outer"] >= stats.Memory["inner"]
+    with ImportStats.Track(None, "ignored"), ImportStats.Profiling(None):
+        pass
+    iMovieProj.FromXMLFile(write_project(_project()), use_cache=False, stats=stats)
+    assert stats.Profile is not None and "(LoadXMLDict)" in stats.Report() and "clips by depth: 0: 5, 1: 2, 2: 1" in stats.Report()
@@ -0,0 +1,53 @@
+# builtin imports
+import random
+# local imports
+from conftest import AudioClip, FileClip, Project
+from iMovie.ClipList import LazyClipList
+from iMovie.IntervalIndex import ClipSpan, IntervalIndex
+from iMovie.iMovieProj import iMovieProj
+
+def _brute(spans, start, end, track=None, audio=None):
+    return sorted(((span.start, span.end, span.track, span.audio) for span in spans if span.start < end and start < span.end and span.end > span.start
+                   and (track is None or span.track == track) and (audio is None or span.audio == audio)))
+
+def test_range_matches_brute_force():
+    rng   = random.Random(1)
+    spans = []
+    for i in range(500):
+        start = rng.randrange(0, 5000)
+        spans.append(ClipSpan(start, start + rng.randrange(0, 200), rng.randrange(1, 4), rng.random() < 0.5, i))
+    index = IntervalIndex(spans)
+    for _ in range(200):
+        start = rng.randrange(-50, 5300)
+        end   = start + rng.randrange(1, 300)
+        track, audio = rng.choice([None, 1, 2, 3]), rng.choice([None, True, False])
+        got = sorted((span.start, span.end, span.track, span.audio) for span in index.Range(start, end, track=track, audio=audio))
+        assert got == _brute(spans, start, end, track, audio)
+
+def test_project_index_and_overlaps():
+    project = iMovieProj(Project(video=[FileClip(1, out_frame=100), FileClip(2, out_frame=50)],
+                                 audio=[AudioClip(10, start=40, length=30, track=1), AudioClip(11, start=60, length=30, track=1)]))
+    assert [span.clip.UniqueID for span in project.IntervalIndex.At(95)] == [1]
+    assert [span.clip.UniqueID for span in project.IntervalIndex.At(100)] == [2]
+    assert [span.clip.UniqueID for span in project.IntervalIndex.At(65, audio=True)] == [10, 11]
+    # audio and video track 1 are separate lanes, so only the two audio clips overlap
+    assert project.IntervalIndex.Overlaps(1) == []
+    assert [(a.clip.UniqueID, b.clip.UniqueID) for a, b in project.IntervalIndex.Overlaps(1, audio=True)] == [(10, 11)]
+
+def test_index_rebuilt_after_list_changes():
+    project = iMovieProj(Project(video=[FileClip(1, out_frame=100)]))
+    before  = project.IntervalIndex
+    assert project.IntervalIndex is before
+    project.VideoClips.insert(0, project.VideoClips[0])
+    assert project.IntervalIndex is not before
+    assert len(project.IntervalIndex.At(150)) == 1
+
+def test_lazy_list_builds_on_read():
+    built = []
+    clips = LazyClipList([FileClip(1), FileClip(2), FileClip(3)], lambda clip_dict: built.append(clip_dict["uniqueID"]) or clip_dict["uniqueID"] * 10)
+    assert len(clips) == 3 and clips.BuiltCount == 0
+    assert clips[1] == 20 and built == [2]
+    assert clips[:] == [10, 20, 30] and built == [2, 1, 3]
+    version = clips.Version
+    del clips[0]
+    assert clips.Version == version + 1 and list(clips) == [20, 30]
@@ -0,0 +1,41 @@
+# local imports
+from conftest import DeepVFXProject, FileClip, Project, VFXClip
+from iMovie.iMovieProj import iMovieProj
+
+def _chain(project:iMovieProj):
+    """The top-level clip of a DeepVFXProject and its nested clips, outermost first, without reading any lineage."""
+    ret_val = [project.VideoClips[0]]
+    while getattr(ret_val[-1], "FilteredClips", None):
+        ret_val.append(ret_val[-1].FilteredClips[0])
+    return ret_val
+
+def test_lineage_of_chain():
+    top, middle, inner, base = _chain(iMovieProj(DeepVFXProject(3)))
+    assert top.FilterDepth == 3 and inner.FilterDepth == 1
+    assert base.Lineage.source_files == ("Base.mov",)
+    assert top.SourceFiles == ["Base.mov"] and top.BaseFileName == "Effect 3.mov"
+    assert [clip.UniqueID for clip in base.Lineage.Ancestors] == [4, 3, 2]
+    assert base.Lineage.root is top and top.Lineage.parent is None
+
+def test_nested_lineage_read_first_walks_from_root():
+    top, middle, inner, base = _chain(iMovieProj(DeepVFXProject(3)))
+    # nothing has walked the tree yet, so the nested clip has to find its own way to the top-level clip
+    assert inner.Lineage.root is top
+    assert [clip.UniqueID for clip in inner.Lineage.Ancestors] == [4, 3]
+    assert inner.Lineage.depth == 1
+    assert top.Lineage.root is top and middle.Lineage.parent is top
+
+def test_lineage_same_whatever_is_read_first():
+    first  = iMovieProj(DeepVFXProject(5))
+    second = iMovieProj(DeepVFXProject(5))
+    # a nested clip read before its top-level clip, against the top-level clip read first
+    early = _chain(first)[3].Lineage
+    _chain(second)[0].Lineage
+    late  = _chain(second)[3].Lineage
+    assert [clip.UniqueID for clip in early.Ancestors] == [clip.UniqueID for clip in late.Ancestors] == [6, 5, 4]
+    assert early.root.UniqueID == late.root.UniqueID == 6
+
+def test_lineage_index_by_source():
+    project = iMovieProj(Project(video=[FileClip(1, file="A.mov"), VFXClip(3, FileClip(2, file="A.mov", track=None)), FileClip(4, file="B.mov")]))
+    assert [clip.UniqueID for clip in project.Lineage.ClipsForSource("A.mov")] == [1, 3]
+    assert [clip.UniqueID for clip in project.Lineage.ClipsForSource("A.mov", nested=True)] == [1, 3, 2]
@@ -0,0 +1,32 @@
+# local imports
+from interfaces.MediaDedup import MediaDedup
+
+def _media(tmp_path):
+    files = {"a.mov":b"head" + b"x" * 100 + b"tail", "Copies/a copy.mov":b"head" + b"x" * 100 + b"tail",
+             # same size, head and tail as a.mov, so only the full hash tells them apart
+             "b.mov":b"head" + b"y" * 100 + b"tail", "c.aiff":b"short"}
+    (tmp_path / "Copies").mkdir()
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+    return [str(tmp_path / name) for name in files] + [str(tmp_path / "missing.mov")]
+
+def test_find_duplicates(tmp_path, monkeypatch):
+    monkeypatch.setattr(MediaDedup, "EDGE_BYTES", 4)
+    paths      = _media(tmp_path)
+    duplicates = MediaDedup(catalog_file=None).FindDuplicates(paths)
+    assert duplicates.groups == [[paths[1], paths[0]]] and duplicates.SavedBytes == 108
+    assert duplicates.Canonical(paths[0]) == paths[1] and duplicates.Canonical(paths[2]) == paths[2]
+    assert paths[4] not in duplicates.sizes
+
+def test_catalog_saves_rehashing(tmp_path, monkeypatch):
+    monkeypatch.setattr(MediaDedup, "EDGE_BYTES", 4)
+    paths   = _media(tmp_path)
+    catalog = tmp_path / "hashes.sqlite"
+    dedup   = MediaDedup(catalog_file=catalog)
+    first   = dedup.FindDuplicates(paths)
+    dedup.Close()
+    def _fail(path):
+        raise AssertionError(f"{path} was hashed again")
+    monkeypatch.setattr(MediaDedup, "_edgeDigest", staticmethod(_fail))
+    monkeypatch.setattr(MediaDedup, "_fullDigest", staticmethod(_fail))
+    assert MediaDedup(catalog_file=catalog).FindDuplicates(paths).groups == first.groups
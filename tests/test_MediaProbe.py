@@ -0,0 +1,52 @@
+# builtin imports
+import struct
+from fractions import Fraction
+# local imports
+from conftest import AudioClip, FileClip, Project
+from iMovie.iMovieProj import iMovieProj
+from interfaces.MediaProbe import MediaProbe
+
+def _atom(kind:bytes, body:bytes=b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(body), kind) + body
+
+def _aiff(frames:int, rate:int) -> bytes:
+    # the 80-bit extended float of a whole number rate, exponent first
+    extended = struct.pack(">HQ", 16383 + rate.bit_length() - 1, rate << (64 - rate.bit_length())) if rate else bytes(10)
+    comm = struct.pack(">hIh", 2, frames, 16) + extended
+    return b"FORM" + struct.pack(">I", 4 + 8 + len(comm)) + b"AIFF" + b"COMM" + struct.pack(">I", len(comm)) + comm
+
+def _movie(*track_atoms:bytes, time_scale:int=2997) -> bytes:
+    """A QuickTime file whose one video track holds the given atoms under stbl, after its hdlr and mdhd."""
+    mdhd = _atom(b"mdhd", bytes(12) + struct.pack(">II", time_scale, time_scale * 4))
+    hdlr = _atom(b"hdlr", bytes(8) + b"vide")
+    stbl = _atom(b"stbl", b"".join(track_atoms))
+    return _atom(b"ftyp", b"qt  ") + _atom(b"moov", _atom(b"trak", _atom(b"mdia", hdlr + mdhd + _atom(b"minf", stbl))))
+
+def test_quicktime_video_track(tmp_path):
+    path = tmp_path / "clip.mov"
+    path.write_bytes(_movie(_atom(b"stts", bytes(4) + struct.pack(">III", 1, 120, 100))))
+    info = MediaProbe.ProbeFile(str(path))
+    assert info.error is None and (info.kind, info.frames, info.rate) == ("quicktime", 120, Fraction(30))
+
+def test_truncated_atoms_are_unprobeable(tmp_path):
+    # an mdhd with no body, whose version byte lies past the end of the file
+    empty = tmp_path / "empty.mov"
+    empty.write_bytes(_atom(b"ftyp", b"qt  ") + _atom(b"moov", _atom(b"trak", _atom(b"mdia", _atom(b"mdhd")))))
+    # an stts claiming more entries than it holds
+    short = tmp_path / "short.mov"
+    short.write_bytes(_movie(_atom(b"stts", bytes(4) + struct.pack(">III", 5, 120, 100))))
+    good = tmp_path / "good.aiff"
+    good.write_bytes(_aiff(44_100, 44_100))
+    probed = MediaProbe(cache_file=None).ProbeAll([empty, short, good])
+    assert probed[str(empty)].error is not None and probed[str(short)].error is not None
+    assert probed[str(good)].error is None and probed[str(good)].frames == 44_100 and probed[str(good)].Seconds == 1
+
+def test_zero_rates_are_unprobeable(tmp_path):
+    (tmp_path / "Silent.aiff").write_bytes(_aiff(44_100, 0))
+    (tmp_path / "Still.mov").write_bytes(_movie(_atom(b"stts", bytes(4) + struct.pack(">III", 1, 120, 100)), time_scale=0))
+    (tmp_path / "Clip 01.mov").write_bytes(_movie(_atom(b"stts", bytes(4) + struct.pack(">III", 1, 120, 100))))
+    project = iMovieProj(Project(video=[FileClip(1, out_frame=200), FileClip(2, file="Still.mov")], audio=[AudioClip(3, file="Silent.aiff")]))
+    report  = MediaProbe(cache_file=None).CheckProject(project, clips_path=tmp_path)
+    assert set(report.Unreadable) == {str(tmp_path / "Silent.aiff"), str(tmp_path / "Still.mov")}
+    assert report.checked == 1 and sorted((issue.clip.UniqueID, issue.problem.split(":")[0]) for issue in report.issues) == \
+           [(1, "frames 0-200 fall outside the media's 120 frames"), (2, "media unreadable"), (3, "media unreadable")]
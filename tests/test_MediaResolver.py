@@ -0,0 +1,50 @@
+# builtin imports
+import os
+# local imports
+from conftest import AudioClip, FileClip, Project, VFXClip
+from iMovie.iMovieProj import iMovieProj
+from interfaces.MediaResolver import MediaResolver
+
+def _clips(tmp_path):
+    root = tmp_path / "Media"
+    (root / "Shots" / "Old").mkdir(parents=True)
+    for rel in ("Clip 01.mov", "sound 01.aiff", "Shots/Clip 01.mov", "Shots/Old/Clip 02.dv", "Shots/vid.mov"):
+        (root / rel).write_bytes(b"")
+    return root
+
+def _bumpMtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_lookup_fallbacks(tmp_path):
+    root     = _clips(tmp_path)
+    resolver = MediaResolver(root, persist=False)
+    # the shallower file wins when names collide
+    assert resolver.Resolve("Clip 01.mov") == root / "Clip 01.mov"
+    assert resolver.Resolve("CLIP 02.DV") == root / "Shots" / "Old" / "Clip 02.dv"
+    assert resolver.Resolve("Sound 01.aif") == root / "sound 01.aiff"
+    assert resolver.Resolve("vid/1") == resolver.Resolve("vid.avi") == root / "Shots" / "vid.mov"
+    assert resolver.Resolve("Missing.mov") is None
+    project = iMovieProj(Project(video=[VFXClip(2, FileClip(1, file="vid/1", track=None))], audio=[AudioClip(3, file="Sound 01.aif")]))
+    assert resolver.ResolveProject(project) == {"Effect.mov":None, "vid/1":root / "Shots" / "vid.mov", "Sound 01.aif":root / "sound 01.aiff"}
+
+def test_persisted_index_rescans_only_changed_dirs(tmp_path, monkeypatch):
+    root  = _clips(tmp_path)
+    index = tmp_path / "index.json"
+    MediaResolver(root, index_file=index)
+    scanned = []
+    real_scandir = os.scandir
+    def _scandir(path):
+        scanned.append(os.path.relpath(path, root))
+        return real_scandir(path)
+    monkeypatch.setattr(os, "scandir", _scandir)
+    resolver = MediaResolver(root, index_file=index)
+    assert scanned == [] and resolver.Resolve("Clip 02.dv") is not None
+    (root / "Shots" / "New.mov").write_bytes(b"")
+    (root / "Shots" / "Old" / "Clip 02.dv").unlink()
+    os.rmdir(root / "Shots" / "Old")
+    # mtimes can be too coarse to see changes made this quickly
+    _bumpMtime(root / "Shots")
+    resolver.Refresh()
+    assert scanned == ["Shots"]
+    assert resolver.Resolve("New.mov") == root / "Shots" / "New.mov" and resolver.Resolve("Clip 02.dv") is None
@@ -0,0 +1,47 @@
+# builtin imports
+import os
+from pathlib import Path
+# local imports
+from benchmarks.synthetic_project import SyntheticProject
+from conftest import DeepVFXProject, FileClip, Project
+from interfaces.ProjectCache import ProjectCache
+from iMovie.iMovieProj import iMovieProj
+
+def test_round_trip_and_invalidation(tmp_path:Path):
+    cache = ProjectCache(tmp_path / "cache")
+    path  = SyntheticProject(video_clips=5).Write(tmp_path / "test.iMovieProj")
+    calls = []
+    def loader(file):
+        calls.append(file)
+        return Project(video=[FileClip(len(calls))])
+    assert cache.Load(path, loader) == cache.Load(path, loader) == Project(video=[FileClip(1)])
+    assert len(calls) == 1
+    path.write_text(path.read_text() + "\n")
+    assert cache.Load(path, loader) == Project(video=[FileClip(2)])
+
+def test_corrupt_entry_is_dropped(tmp_path:Path):
+    cache = ProjectCache(tmp_path / "cache")
+    path  = SyntheticProject(video_clips=5).Write(tmp_path / "test.iMovieProj")
+    cache.Put(path, SyntheticProject(video_clips=5).ToDict())
+    entry = cache._entryPath(path)
+    entry.write_bytes(entry.read_bytes()[:10])
+    assert cache.Get(path) is None
+    assert not entry.exists()
+
+def test_entry_evicted_before_touch(tmp_path:Path, monkeypatch):
+    cache = ProjectCache(tmp_path / "cache")
+    path  = SyntheticProject(video_clips=5).Write(tmp_path / "test.iMovieProj")
+    cache.Put(path, SyntheticProject(video_clips=5).ToDict())
+    def evicted(entry, *args, **kwargs):
+        Path(entry).unlink()
+        raise FileNotFoundError(entry)
+    monkeypatch.setattr(os, "utime", evicted)
+    assert cache.Get(path) is None
+
+def test_too_deep_to_marshal_is_skipped(write_project, tmp_path:Path):
+    cache_dir = tmp_path / "cache"
+    path      = write_project(DeepVFXProject(1200))
+    project   = iMovieProj.FromXMLFile(path, backend="expat", cache=ProjectCache(cache_dir))
+    assert project.VideoClips[0].FilterDepth == 1200
+    # nothing was cached, and the temp file was cleaned up
+    assert list(cache_dir.iterdir()) == []
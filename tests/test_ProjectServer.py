@@ -0,0 +1,79 @@
+# builtin imports
+import asyncio
+import threading
+# 3rd-party imports
+import pytest
+# local imports
+from conftest import AudioClip, FileClip, Project, VFXClip
+from interfaces.ProjectCache import ProjectCache
+from interfaces.ProjectClient import ProjectClient, ProjectServerError
+from interfaces.ProjectServer import ProjectServer
+
+@pytest.fixture
+def server(tmp_path):
+    """A ProjectServer listening on a socket in tmp_path, served from its own thread and event loop."""
+    server = ProjectServer(tmp_path / "server.sock", cache=ProjectCache(tmp_path / "cache"))
+    loop   = asyncio.new_event_loop()
+    ready  = threading.Event()
+    async def _serve():
+        started = asyncio.Event()
+        task    = asyncio.ensure_future(server.Serve(started))
+        await started.wait()
+        ready.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    thread = threading.Thread(target=lambda: loop.run_until_complete(_serve()), daemon=True)
+    thread.start()
+    ready.wait(5)
+    yield server
+    loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(loop)])
+    thread.join(5)
+    loop.close()
+
+def test_queries(server, write_project, tmp_path):
+    nested = VFXClip(3, FileClip(2, file="Base.mov", in_frame=0, out_frame=60, track=None), file="Effect.mov")
+    path   = write_project(Project(video=[FileClip(1, out_frame=30), nested], audio=[AudioClip(4, start=10, length=40)]))
+    with ProjectClient(tmp_path / "server.sock", timeout=10) as client:
+        assert client.Ping() == "pong"
+        info = client.Info(path)
+        assert (info["videoClips"], info["audioClips"], info["editLength"]) == (2, 1, 90)
+        assert [clip["uniqueID"] for clip in client.Clips(path, start=1)] == [3]
+        assert sorted(span["clip"]["uniqueID"] for span in client.Range(path, 25, 35)) == [1, 3, 4]
+        lineage = client.Lineage(path, 2)
+        assert lineage["baseFiles"] == ["Base.mov"] and lineage["ancestors"] == [3]
+        assert [clip["uniqueID"] for clip in client.ClipsForSource(path, "Base.mov")] == [3]
+        with pytest.raises(ProjectServerError, match="KeyError"):
+            client.Lineage(path, 99)
+        stats = client.Stats()
+        assert (stats["loads"], stats["hits"]) == (1, 5)
+        assert client.Evict(path) == 1 and client.Stats()["projects"] == {}
+    # every load's lock is dropped once it's done
+    assert server._loading == {}
+
+def test_concurrent_loads_share_one_import(write_project, tmp_path):
+    server = ProjectServer(tmp_path / "server.sock", use_cache=False)
+    path   = write_project(Project(video=[FileClip(uid) for uid in range(1, 50)]))
+    async def _both():
+        return await asyncio.gather(*(server.Project(str(path)) for _ in range(5)))
+    projects = asyncio.run(_both())
+    assert all(project is projects[0] for project in projects) and server._loads == 1 and server._loading == {}
+
+def test_budget_counts_built_clips_and_indexes(write_project, tmp_path):
+    server = ProjectServer(tmp_path / "server.sock", cache=ProjectCache(tmp_path / "cache"))
+    first  = write_project(Project(video=[FileClip(1)]), name="first.iMovieProj")
+    second = write_project(Project(video=[FileClip(uid) for uid in range(1, 200)]), name="second.iMovieProj")
+    async def _requests():
+        await server.Project(str(first))
+        project = await server.Project(str(second))
+        loaded  = server.CachedBytes
+        # room for both as loaded, but not once the second has its clips and IntervalIndex built
+        server._max_bytes = loaded + 1000
+        await server._range({"path":str(second), "start":0, "end":10})
+        return project, loaded
+    project, loaded = asyncio.run(_requests())
+    assert list(server._projects) == [str(second.resolve())]
+    assert server.CachedBytes == ProjectServer.EstimateBytes(project, second.stat().st_size) > loaded
+    # loads went through the cache given, rather than the user's
+    assert len(list((tmp_path / "cache").iterdir())) == 2
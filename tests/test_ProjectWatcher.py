@@ -0,0 +1,43 @@
+# builtin imports
+import os
+# 3rd-party imports
+import pytest
+# local imports
+from conftest import FileClip, PlistText, Project
+from interfaces.ProjectWatcher import ProjectWatcher
+
+def _bump(path, text):
+    stat = os.stat(path)
+    path.write_text(text, encoding="UTF-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_poll_picks_up_changes(write_project):
+    path    = write_project(Project(video=[FileClip(1)]))
+    seen    = []
+    watcher = ProjectWatcher(path, use_cache=False, callback=seen.append)
+    assert watcher.Poll() is None
+    _bump(path, PlistText(Project(video=[FileClip(1), FileClip(2)])))
+    changes = watcher.Poll()
+    assert [clip.UniqueID for clip in changes.sections["videoClips"].added] == [2]
+    assert seen == [changes]
+    assert len(watcher.Project.VideoClips) == 2
+
+@pytest.mark.parametrize("backend", ["fast", "expat", "etree"])
+def test_poll_retries_half_written_file(write_project, backend):
+    path    = write_project(Project(video=[FileClip(1)]))
+    watcher = ProjectWatcher(path, use_cache=False, backend=backend)
+    full    = PlistText(Project(video=[FileClip(1), FileClip(2)]))
+    _bump(path, full[:len(full) // 2])
+    assert watcher.Poll() is None
+    _bump(path, full)
+    assert len(watcher.Poll().sections["videoClips"].added) == 1
+
+def test_poll_lets_bugs_propagate(write_project, monkeypatch):
+    path    = write_project(Project(video=[FileClip(1)]))
+    watcher = ProjectWatcher(path, use_cache=False)
+    def broken(*args, **kwargs):
+        raise AttributeError("bug in the diff")
+    monkeypatch.setattr(watcher.Project, "UpdateFrom", broken)
+    _bump(path, PlistText(Project(video=[FileClip(2)])))
+    with pytest.raises(AttributeError):
+        watcher.Poll()
@@ -0,0 +1,40 @@
+# local imports
+from conftest import AudioClip, FileClip, Project, VFXClip
+from iMovie.RenderPlan import RenderPlan, SourceRange
+from iMovie.TopVideoClip import TopVideoClipFactory
+from iMovie.iMovieProj import iMovieProj
+
+def _transition(uid, outgoing, incoming, before=15, after=15):
+    ret_val = FileClip(uid, file=f"Transition {uid}.mov", out_frame=before + after)
+    ret_val.update({"class":"transition", "framesTakenAfter":after, "framesTakenBefore":before, "pluginIndex":1, "pluginName":"Cross Dissolve",
+                    "pluginType":1, "replacedClips":[outgoing, incoming], "transitionDirection":0, "transitionSpeed":1.0, "type":2})
+    return ret_val
+
+def _project():
+    # A.mov, a dissolve into B.mov, the rest of B.mov, then frames 10-40 of an effect over frames 20-80 of C.mov
+    return iMovieProj(Project(video=[FileClip(1, file="A.mov", out_frame=85),
+                                     _transition(2, FileClip(11, file="A.mov", out_frame=100, track=None), FileClip(12, file="B.mov", track=None)),
+                                     FileClip(3, file="B.mov", in_frame=15),
+                                     VFXClip(4, FileClip(5, file="C.mov", in_frame=20, out_frame=80, track=None), **{"in":10, "out":40})],
+                              audio=[AudioClip(6, start=5, length=40)]))
+
+def test_segments_resolve_to_source_ranges():
+    plan = _project().RenderPlan
+    assert plan.Tracks == [(False, 1), (True, 2)] and len(plan) == 5
+    assert [(segment.start, segment.end, segment.kind, segment.effects, segment.sources) for segment in plan.Track(1)] == [
+        (0, 85, RenderPlan.KIND_FILE, (), (SourceRange("A.mov", 0, 85),)),
+        (85, 115, RenderPlan.KIND_TRANSITION, ("Cross Dissolve",), (SourceRange("A.mov", 85, 100), SourceRange("B.mov", 0, 15))),
+        (115, 200, RenderPlan.KIND_FILE, (), (SourceRange("B.mov", 15, 100),)),
+        (200, 230, RenderPlan.KIND_VFX, ("Sepia Tone",), (SourceRange("C.mov", 30, 60),)),
+    ]
+    audio = plan.Track(2, audio=True)[0]
+    assert (audio.start, audio.end, audio.kind, audio.sources) == (5, 45, RenderPlan.KIND_AUDIO, (SourceRange("Sound 01.aiff", 0, 40),))
+
+def test_at_and_caching():
+    project = _project()
+    plan    = project.RenderPlan
+    assert plan.At(85, 1).Effect == "Cross Dissolve" and plan.At(84, 1).file == "A.mov" and plan.At(230, 1) is None
+    assert plan.At(44, 2, audio=True).clip is project.AudioClips[0] and plan.At(45, 2, audio=True) is None
+    assert project.RenderPlan is plan
+    project.VideoClips.append(TopVideoClipFactory.FromDict(FileClip(9, file="D.mov")))
+    assert project.RenderPlan is not plan and project.RenderPlan.At(230, 1).file == "D.mov"
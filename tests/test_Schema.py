@@ -0,0 +1,37 @@
+# 3rd-party imports
+import pytest
+# local imports
+from conftest import AudioClip, FileClip, Project, VFXClip
+from iMovie.iMovieProj import iMovieProj
+from iMovie.Schema import Schema, SchemaError
+
+def _brokenProject():
+    inner = FileClip(2, track=None)
+    del inner["uniqueID"]
+    pin = {"clipUID":1, "originalClipFrame":-1, "originalClipUID":-1, "videoFrame":12}
+    return Project(video=[FileClip(1), VFXClip(3, inner, duration="long")], audio=[AudioClip(4, pins=[pin])], timelineZoom="big")
+
+def test_violations_in_document_order():
+    violations = Schema.ValidateProject(_brokenProject())
+    assert [violation.path for violation in violations] == ["timelineZoom", "audioClips[0].pushPins[0]", "videoClips[1].duration",
+                                                            "videoClips[1].filteredClips[0]"]
+    assert Schema.ValidateProject(Project(video=[FileClip(1)], audio=[AudioClip(2)])) == []
+
+def test_sections_limit_the_check():
+    assert [violation.path for violation in Schema.ValidateProject(_brokenProject(), sections=["audioClips"])] == ["timelineZoom", "audioClips[0].pushPins[0]"]
+    with pytest.raises(ValueError, match="Unknown schema sections \\['videoClip'\\]"):
+        Schema.ValidateProject(_brokenProject(), sections=["videoClip"])
+
+def test_validating_project_raises_every_violation():
+    with pytest.raises(SchemaError) as raised:
+        iMovieProj(_brokenProject(), validate=True)
+    assert len(raised.value.violations) == 4
+
+def test_trusted_builds_match_checked_ones():
+    xmldict   = Project(video=[FileClip(1), VFXClip(3, FileClip(2, track=None))], audio=[AudioClip(4)])
+    trusted   = iMovieProj(xmldict, validate=True)
+    untrusted = iMovieProj(xmldict)
+    for section in ("VideoClips", "AudioClips"):
+        assert [(type(clip), clip.UniqueID, clip.Duration) for clip in getattr(trusted, section)] == \
+               [(type(clip), clip.UniqueID, clip.Duration) for clip in getattr(untrusted, section)]
+    assert trusted.VideoClips[1].FilteredClips[0].UniqueID == 2
@@ -0,0 +1,21 @@
+# local imports
+from benchmarks.blender_export import CountExportCalls
+from benchmarks.synthetic_project import SyntheticProject
+from iMovie.iMovieProj import iMovieProj
+from iMovie.Schema import Schema
+
+def test_deterministic_per_seed():
+    assert SyntheticProject(video_clips=50, seed=3).ToDict() == SyntheticProject(video_clips=50, seed=3).ToDict()
+    assert SyntheticProject(video_clips=50, seed=3).ToDict() != SyntheticProject(video_clips=50, seed=4).ToDict()
+
+def test_project_is_valid_and_sized_to_config(tmp_path):
+    config  = SyntheticProject(video_clips=60, audio_ratio=0.5, vfx_depth=3, trash_clips=4)
+    xmldict = config.ToDict()
+    assert Schema.ValidateProject(xmldict) == []
+    assert (len(xmldict["videoClips"]), len(xmldict["audioClips"]), len(xmldict["videoTrashClips"])) == (60, 30, 4)
+    project = iMovieProj.FromXMLFile(config.Write(tmp_path / "synthetic.iMovieProj"), use_cache=False)
+    assert len(project.VideoClips) == 60 and len(project.AudioClips) == 30
+
+def test_export_benchmark_runs():
+    fake, strips, _ = CountExportCalls(20)
+    assert strips == 40 and fake.TotalCalls > 0
@@ -0,0 +1,34 @@
+# 3rd-party imports
+import numpy as np
+# local imports
+from conftest import AudioClip, FileClip, Project, VFXClip
+from iMovie.Timeline import Timeline
+from iMovie.iMovieProj import iMovieProj
+
+def _project() -> iMovieProj:
+    return iMovieProj(Project(
+        video=[FileClip(1, file="A.mov", out_frame=100), FileClip(2, file="B.mov", in_frame=50, out_frame=100),
+               VFXClip(4, FileClip(3, file="A.mov", track=None, out_frame=30), file="Effect.mov")],
+        # audio shares track 1 with the video, and overlaps the second video clip
+        audio=[AudioClip(10, start=120, length=80, track=1), AudioClip(11, start=300, length=20, track=1),
+               AudioClip(12, start=310, length=20, track=1)]))
+
+def test_columns():
+    timeline = _project().Timeline
+    assert len(timeline) == 6
+    assert timeline.Starts.tolist() == [0, 100, 150, 120, 300, 310]
+    assert timeline.Ends.tolist() == [100, 150, 180, 200, 320, 330]
+    assert timeline.EditLength() == 330
+    assert timeline.ClipsPerKind() == {"file":2, "VFX":1, "transition":0, "audio":3}
+    assert timeline.ClipsPerFile() == {"A.mov":1, "B.mov":1, "Effect.mov":1, "Sound 01.aiff":3}
+    assert timeline.FramesPerFile()["Sound 01.aiff"] == 120
+    assert np.allclose(timeline.Seconds()[:2], [0, 100 * 1001 / 30000])
+    assert timeline.Clip(3).UniqueID == 10
+
+def test_gaps_and_overlaps_keep_audio_and_video_apart():
+    timeline = _project().Timeline
+    assert timeline.Overlaps(1).tolist() == []
+    assert timeline.Gaps(1).tolist() == []
+    assert timeline.Gaps(1, audio=True).tolist() == [[200, 300]]
+    assert [timeline.Clip(row).UniqueID for row in timeline.Overlaps(1, audio=True)] == [12]
+    assert timeline.Mask(track=1, audio=False).sum() == 3 and timeline.Mask(track=1).sum() == 6
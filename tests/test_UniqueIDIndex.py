@@ -0,0 +1,27 @@
+# local imports
+from conftest import AudioClip, FileClip, Project, VFXClip
+from iMovie.TopVideoClip import TopVideoClipFactory
+from iMovie.iMovieProj import iMovieProj
+
+def _pin(clip_uid, original_uid, frame=0):
+    return {"audioFrame":frame, "clipUID":clip_uid, "originalClipFrame":frame, "originalClipUID":original_uid, "videoFrame":frame}
+
+def test_lookup_and_duplicates():
+    # uniqueID 1 is both a top-level clip and the clip nested in the effect; the top-level one wins
+    project = iMovieProj(Project(video=[FileClip(1), VFXClip(3, FileClip(1, file="Base.mov", track=None))], video_trash=[FileClip(4)]))
+    index   = project.UniqueIDIndex
+    assert len(index) == 3 and 4 in index and 5 not in index
+    assert index.Get(1) is project.VideoClips[0] and project.ClipByUniqueID(4) is project.VideoTrashClips[0]
+    assert index.Duplicates == {1:[project.VideoClips[0], project.VideoClips[1].FilteredClips[0]]}
+    assert index.Get(-1) is None and index.Get(None) is None
+
+def test_push_pins_resolve_through_the_project():
+    nested  = VFXClip(3, FileClip(2, track=None))
+    project = iMovieProj(Project(video=[FileClip(1), nested], audio=[AudioClip(10, pins=[_pin(1, 2), _pin(-1, 99)])]))
+    found, dangling = project.AudioClips[0].PushPins
+    assert found.Clip is project.VideoClips[0] and found.OriginalClip is project.VideoClips[1].FilteredClips[0]
+    assert dangling.Clip is None and dangling.OriginalClip is None
+    assert [(field, unique_id) for pin, field, unique_id in project.UniqueIDIndex.Dangling] == [("originalClipUID", 99)]
+    # the index is rebuilt once the clip lists change, so a pin can find a clip added after the first lookup
+    project.VideoClips.append(TopVideoClipFactory.FromDict(FileClip(99)))
+    assert dangling.OriginalClip is project.VideoClips[2] and project.UniqueIDIndex.Dangling == []
@@ -0,0 +1,51 @@
+# 3rd-party imports
+import numpy as np
+import pytest
+# local imports
+from conftest import AudioClip, Project
+from iMovie.VolumeEnvelope import LevelFromElement, VolumeEnvelopes
+from iMovie.iMovieProj import iMovieProj
+
+def _pin(frame):
+    # shaped like doc/iMovieHD-format-schema.md, which has no level element
+    return {"audioFrame":frame, "clipUID":-1, "originalClipFrame":-1, "originalClipUID":-1, "videoFrame":frame}
+
+# levels supplied by the caller, keyed by (clip uniqueID, audioFrame)
+_LEVELS = {(1, 0):1.0, (1, 40):0.0, (1, 80):1.0, (3, 10):0.0, (3, 20):0.25, (3, 30):0.5, (3, 50):1.0}
+
+def _project():
+    # pins out of order, as iMovie may store them, and a straight ramp whose middle pins add nothing
+    return iMovieProj(Project(audio=[AudioClip(1, start=0, length=90, pins=[_pin(80), _pin(0), _pin(40)]),
+                                     AudioClip(2, start=50, length=40),
+                                     AudioClip(3, start=20, length=60, pins=[_pin(10), _pin(20), _pin(30), _pin(50)])]))
+
+def _level(project):
+    owners = {id(pin):clip.UniqueID for clip in project.AudioClips for pin in clip.PushPins}
+    return lambda pin: _LEVELS[(owners[id(pin)], pin.AudioFrame)]
+
+def test_evaluate_matches_per_clip_interpolation():
+    project   = _project()
+    envelopes = VolumeEnvelopes.FromProject(project, _level(project))
+    frames    = np.arange(-5, 100)
+    gains     = envelopes.Evaluate(frames)
+    assert gains.shape == (3, len(frames))
+    for i, clip in enumerate(envelopes.Clips):
+        points   = envelopes.Points(i)
+        local    = frames - clip.StartFrame
+        expected = np.where((local >= 0) & (local < clip.OutFrame - clip.InFrame), np.interp(local, *points), 0.0)
+        assert np.allclose(gains[i], expected)
+    assert gains[0, frames.tolist().index(20)] == 0.5 and gains[1, frames.tolist().index(60)] == 1.0
+    assert np.allclose(envelopes.Evaluate([60], indices=[2])[0], [0.75])
+
+def test_keyframes_drop_points_on_a_line():
+    project = _project()
+    assert [frames.tolist() for frames, _ in project.VolumeEnvelopes(_level(project)).AllKeyframes()] == [[0, 40, 80], [0], [10, 50]]
+
+def test_levels_have_no_default():
+    project = _project()
+    level   = _level(project)
+    assert project.VolumeEnvelopes(level) is project.VolumeEnvelopes(level)
+    with pytest.raises(KeyError, match="no volume element"):
+        project.VolumeEnvelopes(LevelFromElement("volume"))
+    with pytest.raises(TypeError):
+        VolumeEnvelopes(project.AudioClips)
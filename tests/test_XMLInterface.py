@@ -0,0 +1,47 @@
+# 3rd-party imports
+import pytest
+# local imports
+from conftest import DeepVFXProject, FileClip, Project
+from interfaces.XMLInterface import XMLDict, _ExpatDecoder, _TranscodeDecoder
+from iMovie.iMovieProj import iMovieProj
+
+def test_backends_agree(write_project):
+    project = Project(video=[FileClip(1, name="Tom & Jerry <1>"), FileClip(2, file="")], timelineZoom=0.5)
+    path = write_project(project)
+    fast, expat, etree = (XMLDict.LoadXMLDict(path, backend=backend) for backend in XMLDict.BACKENDS)
+    assert fast == expat == etree
+    assert fast["videoClips"][0]["name"] == "Tom & Jerry <1>"
+    assert fast["videoClips"][1]["file"] == "None"
+    assert fast["relativePlayHeadPosition"] == 0.0 and type(fast["relativePlayHeadPosition"]) is float and fast["timelineZoom"] == 0.5
+
+def test_skip_sections(write_project):
+    path   = write_project(Project(video=[FileClip(1)]))
+    loaded = XMLDict.LoadXMLDict(path, skip={"videoClips"})
+    assert "videoClips" not in loaded and loaded["videoStandard"] == "DV-NTSC"
+
+def test_fast_backend_falls_back_on_deep_nesting(write_project):
+    path = write_project(DeepVFXProject(600))
+    with open(path, encoding="UTF-8") as projfile:
+        assert _TranscodeDecoder.DecodeText(projfile.read()) is None
+    # comparing the dicts whole would recurse as deep as they nest, so compare the clips level by level
+    fast, expat = (XMLDict.LoadXMLDict(path, backend=backend)["videoClips"][0] for backend in ("fast", "expat"))
+    levels = 0
+    while fast is not None:
+        assert {key:val for key, val in fast.items() if key != "filteredClips"} == {key:val for key, val in expat.items() if key != "filteredClips"}
+        fast, expat = (clip["filteredClips"][0] if "filteredClips" in clip else None for clip in (fast, expat))
+        levels += 1
+    assert levels == 601
+    project = iMovieProj.FromXMLFile(path, use_cache=False)
+    assert project.VideoClips[0].FilterDepth == 600
+
+@pytest.mark.parametrize("value", ["<string><![CDATA[x<y & z]]></string>", "<string>p\r\nq</string>", "<string>p\rq</string>",
+                                   "<string>a &amp; b &#233; &#x41;</string>", "<string></string>", "<string/>",
+                                   "<real>1</real>", "<integer> -3 </integer>", "<array/>", "<dict>\n</dict>"])
+def test_fast_backend_matches_expat(value):
+    text = ('<?xml version="1.0" encoding="UTF-8"?>\n<plist version="1.0">\n<dict>\n<key>value</key>\n' + value +
+            '\n<key>videoStandard</key>\n<string>DV-NTSC</string>\n</dict>\n</plist>\n')
+    fast = _TranscodeDecoder.DecodeText(text)
+    if fast is None:
+        fast = _ExpatDecoder().DecodeText(text)
+    assert fast == _ExpatDecoder().DecodeText(text)
+    assert type(fast["value"]) is type(_ExpatDecoder().DecodeText(text)["value"])
@@ -0,0 +1,31 @@
+# local imports
+from batch_import import BatchImporter
+from benchmarks.synthetic_project import SyntheticProject
+from conftest import FileClip, Project
+
+def _archive(write_project, tmp_path):
+    (tmp_path / "Old" / "Older").mkdir(parents=True)
+    small  = SyntheticProject(video_clips=1, audio_ratio=0, trash_clips=0).Write(tmp_path / "Old" / "small.iMovieProj")
+    large  = SyntheticProject(video_clips=19, audio_ratio=1 / 19, trash_clips=0).Write(tmp_path / "Old" / "Older" / "large.iMovieProj")
+    broken = write_project(Project(video=[{"class":"video", "uniqueID":1}]), name="broken.iMovieProj")
+    (tmp_path / "notes.txt").write_text("not a project")
+    return large, small, broken
+
+def test_find_projects_largest_first(write_project, tmp_path):
+    paths = list(_archive(write_project, tmp_path))
+    assert BatchImporter.FindProjects(tmp_path) == paths
+
+def test_import_all_keeps_going_past_failures(write_project, tmp_path):
+    large, small, broken = _archive(write_project, tmp_path)
+    results = BatchImporter.ImportAll([small, broken, large], workers=2)
+    assert [result.path for result in results] == [str(small), str(broken), str(large)]
+    assert [(result.OK, result.video_clips, result.audio_clips) for result in results] == [(True, 1, 0), (False, 0, 0), (True, 19, 1)]
+    assert results[1].error.startswith("ValueError") and results[0].video_standard == "DV-NTSC"
+    summary = BatchImporter.Summary(results).splitlines()
+    assert summary[1].startswith(f"{broken}: FAILED, ValueError") and summary[-1] == "Imported 2 of 3 projects; 20 video clips; 1 audio clips"
+
+def test_schema_checks_only_when_asked(write_project):
+    # the clip classes take a string timeScale, but the schema's type checks don't
+    path = write_project(Project(video=[FileClip(1, timeScale="2997")]))
+    assert BatchImporter.ImportOne(path).OK
+    assert BatchImporter.ImportOne(path, validate=True).error.startswith("SchemaError")
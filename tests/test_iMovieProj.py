@@ -0,0 +1,41 @@
+# builtin imports
+import os
+# 3rd-party imports
+import pytest
+# local imports
+from conftest import AudioClip, FileClip, Project, VFXClip
+from iMovie.iMovieProj import iMovieProj, SectionNotLoadedError
+from interfaces.XMLInterface import XMLDict
+
+def test_streamed_clips_match_loaded_ones(write_project):
+    path    = write_project(Project(video=[FileClip(1), VFXClip(3, FileClip(2, track=None)), FileClip(4, file="Clip 02.mov")],
+                                    audio=[AudioClip(5), AudioClip(6, start=90)], video_trash=[FileClip(7)]))
+    project  = iMovieProj.FromXMLFile(path, use_cache=False)
+    streamed = list(iMovieProj.IterVideoClips(path))
+    assert [(type(clip), clip.UniqueID, clip.FileName) for clip in streamed] == \
+           [(type(clip), clip.UniqueID, clip.FileName) for clip in project.VideoClips]
+    assert streamed[1].FilteredClips[0].UniqueID == 2
+    assert [clip.StartFrame for clip in iMovieProj.IterAudioClips(path)] == [0, 90]
+    assert [clip["uniqueID"] for clip in XMLDict.IterArray(path, "videoTrashClips")] == [7]
+    assert list(XMLDict.IterArray(path, "audioTrashClips")) == []
+
+@pytest.mark.parametrize("backend", XMLDict.BACKENDS)
+def test_skipped_sections_load_on_access(write_project, backend):
+    path    = write_project(Project(video=[FileClip(1), FileClip(2)], audio=[AudioClip(3)]))
+    project = iMovieProj.FromXMLFile(path, backend=backend, use_cache=False, sections=["audioClips"])
+    assert project._loaded == {"audioClips"} and project._videoClips._rawItems() == []
+    assert [clip.UniqueID for clip in project.AudioClips] == [3]
+    assert [clip.UniqueID for clip in project.VideoClips] == [1, 2]
+    assert "videoClips" in project._loaded and project.ClipByUniqueID(2) is project.VideoClips[1]
+
+def test_skipped_sections_without_their_file(write_project):
+    with pytest.raises(SectionNotLoadedError, match="wasn't loaded from a file"):
+        iMovieProj(Project(video=[FileClip(1)]), sections=["audioClips"]).VideoClips
+    path    = write_project(Project(video=[FileClip(1)]))
+    project = iMovieProj.FromXMLFile(path, use_cache=False, sections=["audioClips"])
+    stat    = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    with pytest.raises(SectionNotLoadedError, match="has changed"):
+        project.VideoClips
+    with pytest.raises(ValueError, match="Unknown iMovieProj sections"):
+        iMovieProj(Project(), sections=["videoclips"])